@@ -1,5 +1,4 @@
 from fastapi.responses import JSONResponse
-from datetime import timedelta, datetime
 from typing import Dict, Optional, List
 import os
 import random
@@ -8,14 +7,19 @@ from dotenv import load_dotenv
 from api.db.models.user import User
 from api.input_schema.user_schema import OfficialRegisterSchema
 from api.input_schema.auth_schema import TokenSchema
-from api.core.auth import hash_password, verify_password, create_access_token
+from api.core.auth import create_access_token
+from api.core.passwords import hash_password_async, verify_password_async
+from api.core.otp_store import otp_store, OtpThrottled, OTP_OK, OTP_MISSING, OTP_EXPIRED, OTP_INVALID
 
 # ------------------ ENV & CONFIG ------------------
 load_dotenv()
-OTP_EXPIRY_SECONDS: int = int(os.getenv("OTP_EXPIRY_SECONDS", "300"))
 
-# In-memory OTP store: { phone: {"otp": "123456", "expires_at": datetime} }
-_otp_store: Dict[str, Dict] = {}
+# OTP backend (memory or mongo) is chosen with OTP_STORE; see api/core/otp_store.py
+_OTP_ERRORS = {
+    OTP_MISSING: "No OTP found or expired",
+    OTP_EXPIRED: "OTP expired",
+    OTP_INVALID: "Invalid OTP",
+}
 
 # ------------------ HELPERS ------------------
 def _generate_otp() -> str:
@@ -27,7 +31,9 @@ def _otp_response(
     message: str,
     phone: Optional[str] = None,
     otp: Optional[str] = None,
-    errors: Optional[List[str]] = None
+    errors: Optional[List[str]] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
 ) -> JSONResponse:
     """Standardized OTP response."""
     content = {
@@ -36,7 +42,7 @@ def _otp_response(
         "errors": errors or [],
         "data": {"phone": phone, "otp_debug": otp} if status else {}
     }
-    return JSONResponse(status_code=200, content=content)
+    return JSONResponse(status_code=status_code, content=content, headers=headers)
 
 # ------------------ OFFICIALS ------------------
 async def register_official(data: OfficialRegisterSchema) -> User:
@@ -47,7 +53,7 @@ async def register_official(data: OfficialRegisterSchema) -> User:
     user = User(
         name=data.name.strip(),
         email=data.email.lower().strip(),
-        hashed_password=hash_password(data.password),
+        hashed_password=await hash_password_async(data.password),
         role=data.role.upper(),
         division=data.division
     )
@@ -57,43 +63,45 @@ async def register_official(data: OfficialRegisterSchema) -> User:
 async def login_official(email: str, password: str) -> TokenSchema:
     """Authenticate official and return JWT token."""
     user = await User.find_one(User.email == email.lower().strip())
-    if not user or not verify_password(password, user.hashed_password):
+    if not user:
+        raise ValueError("Invalid credentials")
+    valid, new_hash = await verify_password_async(password, user.hashed_password)
+    if not valid:
         raise ValueError("Invalid credentials")
+    if new_hash:
+        # stored with an older cost factor: upgrade while we have the plain password
+        await User.get_pymongo_collection().update_one(
+            {"_id": user.id, "hashed_password": user.hashed_password},
+            {"$set": {"hashed_password": new_hash}},
+        )
 
     token = create_access_token({"sub": str(user.id), "role": user.role})
     return TokenSchema(access_token=token, role=user.role)
 
 # ------------------ CITIZENS ------------------
-def send_otp(phone: str) -> JSONResponse:
+async def send_otp(phone: str) -> JSONResponse:
     """Generate & store OTP for a citizen."""
     try:
         if not phone:
             return _otp_response(False, "Phone number is required")
 
         otp = _generate_otp()
-        _otp_store[phone] = {
-            "otp": otp,
-            "expires_at": datetime.utcnow() + timedelta(seconds=OTP_EXPIRY_SECONDS),
-        }
+        await otp_store.issue(phone, otp)
         return _otp_response(True, "OTP sent successfully", phone=phone, otp=otp)
 
+    except OtpThrottled as e:
+        return _otp_response(False, str(e), status_code=429, headers={"Retry-After": str(e.retry_after)})
+
     except Exception as e:
         traceback.print_exc()
         return _otp_response(False, f"Error sending OTP: {str(e)}")
 
 async def verify_otp_and_get_token(phone: str, otp: str) -> TokenSchema:
     """Verify OTP and return JWT token for citizen login/registration."""
-    entry = _otp_store.get(phone)
-
-    if not entry:
-        raise ValueError("No OTP found or expired")
-
-    if entry["expires_at"] < datetime.utcnow():
-        _otp_store.pop(phone, None)
-        raise ValueError("OTP expired")
-
-    if entry["otp"] != otp:
-        raise ValueError("Invalid OTP")
+    # consuming up front makes the OTP one-time use even across workers
+    result = await otp_store.consume(phone, otp)
+    if result != OTP_OK:
+        raise ValueError(_OTP_ERRORS[result])
 
     # Get or create citizen user
     user = await User.find_one(User.phone == phone)
@@ -101,8 +109,5 @@ async def verify_otp_and_get_token(phone: str, otp: str) -> TokenSchema:
         user = User(name=f"Citizen-{phone[-4:]}", phone=phone, role="CITIZEN")
         await user.insert()
 
-    # OTP one-time use
-    _otp_store.pop(phone, None)
-
     token = create_access_token({"sub": str(user.id), "role": user.role})
     return TokenSchema(access_token=token, role=user.role)
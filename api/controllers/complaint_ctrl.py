@@ -1,22 +1,31 @@
 # api/controllers/complaint_ctrl.py
-from api.db.models.complaint import Complaint, Assignment, ProofFile, Worker, ComplaintStatus, AssignmentStatus
-from typing import List, Dict, Optional
+from api.db.models.complaint import (
+    Complaint, Assignment, ProofFile, Worker, ComplaintStatus, AssignmentStatus, HELD_ASSIGNMENT_STATUSES,
+    TERMINAL_STATUSES, GeoPoint, lat_lng,
+)
+from typing import Callable, List, Dict, Optional, Tuple
 from fastapi import HTTPException
+from pydantic import BaseModel
 from bson import ObjectId
+from beanie.odm.utils.encoder import Encoder
+from pymongo import UpdateOne, ReturnDocument
+from api.tasks.sla_scheduler import sla_scheduler
+from api.input_schema.complaint_schema import AssignmentSchema, ComplaintResponse, EvidenceFile, ProofFileSchema
+from api.core.uploads import release_blobs, proof_file_hashes
+from api.controllers.stats_ctrl import record_created, record_deleted, record_transition, record_transitions
+from api.core.search_index import ngram_index
+from api.core.dedup import duplicate_index
+from api.core.geohash import encode as encode_geohash
+from api.controllers.map_ctrl import invalidate_map_tiles
+from api.controllers.worker_ctrl import worker_has_capacity
 from datetime import datetime, timedelta
+import base64
+import heapq
+import re
 
-# ------------------ Helpers ------------------
-
+_bson_encoder = Encoder()
 
-async def get_active_assignments_count(worker_id: str) -> int:
-    # Count complaints assigned to this worker that are not closed or escalated
-    active_complaints = await Complaint.find(
-        {
-            "assignments.worker_id": str(worker_id),
-            "status": {"$nin": [ComplaintStatus.CLOSED, ComplaintStatus.ESCALATED]}
-        }
-    ).to_list()
-    return len(active_complaints)
+# ------------------ Helpers ------------------
 
 
 def _to_object_id(id_str: str) -> ObjectId:
@@ -26,15 +35,57 @@ def _to_object_id(id_str: str) -> ObjectId:
         raise HTTPException(status_code=200, detail="Invalid ID format")
 
 
-async def _set_worker_availability(worker_id: str, available: bool = True):
+def _worker_load_update(delta: int, available: Optional[bool] = None) -> List[Dict]:
+    fields = {
+        "active_tasks": {"$max": [0, {"$add": [{"$ifNull": ["$active_tasks", 0]}, delta]}]},
+    }
+    if available is not None:
+        fields["available"] = {"$literal": available}
+    if delta > 0:
+        fields["last_assigned_at"] = {"$literal": datetime.utcnow()}
+    return [{"$set": fields}]
+
+
+async def update_worker_load(worker_id: str, delta: int, available: Optional[bool] = None):
+    """
+    Atomically adjust Worker.active_tasks by delta (never below 0) and
+    optionally set the availability flag, in one update without reading
+    the worker first.
+    """
     try:
-        worker = await Worker.get(ObjectId(worker_id))
-        if worker:
-            worker.available = available  # set availability
-            worker.last_assigned_at = datetime.utcnow()  # track last assignment
-            await worker.save()
+        oid = ObjectId(str(worker_id))
     except Exception:
-        pass
+        return
+    await Worker.get_pymongo_collection().update_one({"_id": oid}, _worker_load_update(delta, available))
+
+
+async def bulk_update_worker_loads(deltas: Dict[str, int], available: Optional[bool] = None):
+    """Apply many update_worker_load calls in one bulk_write ({worker_id: delta})."""
+    ops = []
+    for worker_id, delta in deltas.items():
+        try:
+            oid = ObjectId(str(worker_id))
+        except Exception:
+            continue
+        ops.append(UpdateOne({"_id": oid}, _worker_load_update(delta, available)))
+    if ops:
+        await Worker.get_pymongo_collection().bulk_write(ops, ordered=False)
+
+
+async def _release_worker(assignment: Assignment, was_held: bool):
+    # free the assignee once, only if the assignment was still holding them
+    if assignment.worker_id and was_held:
+        await update_worker_load(assignment.worker_id, -1, available=True)
+
+
+def _held_current(complaint: Complaint) -> Optional[Assignment]:
+    """The current assignment if it still holds its assignee; a new push cancels it."""
+    idx = complaint.current_assignment_index
+    assignments = complaint.assignments or []
+    if idx is None or not 0 <= idx < len(assignments):
+        return None
+    current = assignments[idx]
+    return current if current.status in HELD_ASSIGNMENT_STATUSES else None
 
 
 
@@ -44,48 +95,218 @@ def _get_current_assignment(complaint: Complaint) -> Assignment:
         raise HTTPException(status_code=200, detail="No active assignment found")
     return complaint.assignments[idx]
 
+# Responses are encoded straight to bytes, so response_model does not filter them:
+# dumps name the response schema fields explicitly and internal fields
+# (index copies, geohash, contractor bookkeeping) stay out
+_PROOF_FILE_FIELDS = set(ProofFileSchema.model_fields)
+_ASSIGNMENT_FIELDS = set(AssignmentSchema.model_fields)
+_ASSIGNMENT_INCLUDE = {
+    **{field: True for field in _ASSIGNMENT_FIELDS},
+    "proof_files": {"__all__": _PROOF_FILE_FIELDS},
+}
+# id, current_assignment and user_id are derived below
+_RESPONSE_INCLUDE = {
+    **{field: True for field in ComplaintResponse.model_fields if field not in {"id", "current_assignment", "user_id"}},
+    "assignments": {"__all__": _ASSIGNMENT_INCLUDE},
+    "evidence_files": {"__all__": set(EvidenceFile.model_fields)},
+}
+
+
+def _current_user_id(assignments: List, idx: Optional[int]) -> Optional[str]:
+    current = assignments[idx] if idx is not None and 0 <= idx < len(assignments) else None
+    return current.assigned_user_id if current else None
+
+
 def complaint_to_dict(complaint: Complaint) -> Dict:
-    data = complaint.dict()
+    """
+    Response shape of a full complaint (ComplaintResponse), built in one
+    model_dump pass. Datetimes/enums/ObjectIds are left native for
+    api.core.responses to encode.
+    """
+    data = complaint.model_dump(include=_RESPONSE_INCLUDE)
     data["id"] = str(complaint.id)
-
-    # Convert top-level datetimes
-    for field in ["created_at", "updated_at"]:
-        if getattr(complaint, field, None):
-            data[field] = getattr(complaint, field).isoformat()
-
-    # Convert assignments safely
-    assignments = []
-    for a in complaint.assignments or []:
-        assignment_dict = a.dict()
-        for oid_field in ["worker_id", "assigned_by", "verified_by", "assigned_user_id"]:
-            if assignment_dict.get(oid_field):
-                assignment_dict[oid_field] = str(assignment_dict[oid_field])
-        for dt_field in ["assigned_at", "submitted_at", "verified_at", "sla_deadline"]:
-            if assignment_dict.get(dt_field):
-                assignment_dict[dt_field] = assignment_dict[dt_field].isoformat()
-        assignments.append(assignment_dict)
-    data["assignments"] = assignments
+    data["location"] = lat_lng(data.get("location"))
 
     # Current assignment
-    current_assignment = (
-        assignments[complaint.current_assignment_index]
-        if complaint.current_assignment_index is not None and assignments
-        else None
-    )
-    data["current_assignment"] = current_assignment
-    data["user_id"] = current_assignment.get("assigned_user_id") if current_assignment else None
+    assignments = data.get("assignments") or []
+    idx = complaint.current_assignment_index
+    data["current_assignment"] = assignments[idx] if idx is not None and 0 <= idx < len(assignments) else None
+    data["user_id"] = _current_user_id(complaint.assignments or [], idx)
 
     return data
 
+
+def _public_assignment(assignment: Optional[Dict]) -> Optional[Dict]:
+    """A stored assignment trimmed to AssignmentSchema."""
+    if assignment is None:
+        return None
+    data = {k: v for k, v in assignment.items() if k in _ASSIGNMENT_FIELDS}
+    if data.get("proof_files"):
+        data["proof_files"] = [{k: v for k, v in p.items() if k in _PROOF_FILE_FIELDS} for p in data["proof_files"]]
+    return data
+
+# ------------------ Listing helpers ------------------
+
+LIST_PAGE_MAX = 200
+
+# Fields returned by list endpoints; history (assignments, evidence_files) is left out
+LIST_PROJECTION = {
+    "_id": 1,
+    "full_name": 1,
+    "mobile_number": 1,
+    "complaint_category": 1,
+    "complaint_subject": 1,
+    "detailed_description": 1,
+    "location": 1,
+    "complete_address": 1,
+    "division": 1,
+    "status": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "duplicate_of": 1,
+    "duplicate_count": 1,
+    # null when no assignment exists yet
+    "current_assignment": {"$arrayElemAt": ["$assignments", "$current_assignment_index"]},
+}
+
+
+def _encode_cursor(created_at: datetime, oid: ObjectId) -> str:
+    raw = f"{created_at.isoformat()}|{oid}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, oid = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), ObjectId(oid)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def build_complaint_filter(
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    division: Optional[str] = None,
+    assigned_user_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    within: Optional[Dict] = None,
+    duplicate_of: Optional[str] = None,
+) -> Dict:
+    """
+    Translate list/export query params into a Mongo filter.
+    `within` is a $geoWithin operand ($geometry or $centerSphere) on the location.
+    """
+    query: Dict = {}
+    if status:
+        query["status"] = status
+    if category:
+        query["complaint_category"] = category
+    if division:
+        query["division"] = division
+    if assigned_user_id:
+        query["assignments.assigned_user_id"] = str(assigned_user_id)
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    if within:
+        query["location"] = {"$geoWithin": within}
+    if duplicate_of:
+        query["duplicate_of"] = duplicate_of
+    return query
+
+
+def list_row_to_dict(row: Dict) -> Dict:
+    """Shape a projected list row (see LIST_PROJECTION) for the response."""
+    row["id"] = str(row.pop("_id"))
+    if "location" in row:
+        row["location"] = lat_lng(row["location"])
+    current = row.get("current_assignment")
+    row["user_id"] = current.get("assigned_user_id") if current else None
+    row["current_assignment"] = _public_assignment(current)
+    return row
+
 # ------------------ CRUD Controllers ------------------
 
+async def _link_duplicate(complaint: Complaint):
+    """Point a new report at the open complaint it duplicates, if any."""
+    match = duplicate_index.find_for(complaint)
+    if not match:
+        return
+    parent_id = match[0]
+    # the parent may have closed in another process since it was indexed
+    result = await Complaint.get_pymongo_collection().update_one(
+        {"_id": ObjectId(parent_id), "duplicate_of": None, **OPEN_FILTER},
+        {"$inc": {"duplicate_count": 1}},
+    )
+    if result.matched_count:
+        complaint.duplicate_of = parent_id
+    else:
+        duplicate_index.remove(parent_id)
+
+async def _adjust_duplicate_count(parent_id: Optional[str], delta: int):
+    if parent_id:
+        await Complaint.get_pymongo_collection().update_one(
+            {"_id": ObjectId(parent_id)}, {"$inc": {"duplicate_count": delta}}
+        )
+
 async def create_complaint_controller(data: Complaint) -> Dict:
+    await _link_duplicate(data)
     saved = await data.insert()
+    await record_created([saved])
+    ngram_index.update(saved)
+    duplicate_index.update(saved)
+    invalidate_map_tiles(saved.geohash)
+    if saved.duplicate_of:
+        # the parent may have closed between the link and the insert, missing this report
+        parent = await Complaint.get_pymongo_collection().find_one(
+            {"_id": ObjectId(saved.duplicate_of), "status": {"$in": [s.value for s in TERMINAL_STATUSES]}},
+            {"status": 1},
+        )
+        if parent:
+            closed = await _close_duplicates({saved.duplicate_of: parent["status"]})
+            saved = closed.get(str(saved.id), saved)
     return complaint_to_dict(saved)
 
-async def get_all_complaints_controller() -> List[Dict]:
-    complaints = await Complaint.find_all().to_list()
-    return [complaint_to_dict(c) for c in complaints]
+async def get_all_complaints_controller(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    **filters,
+) -> Dict:
+    """
+    Keyset-paginated listing, newest first, ordered on (created_at, _id).
+    Returns compact rows; the full document is served by the detail route.
+    """
+    limit = max(1, min(limit, LIST_PAGE_MAX))
+    query = build_complaint_filter(**filters)
+
+    if cursor:
+        created_at, oid = _decode_cursor(cursor)
+        keyset = {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": oid}},
+        ]}
+        query = {"$and": [query, keyset]} if query else keyset
+
+    # Fetch one extra row to know whether another page exists
+    rows = await Complaint.aggregate([
+        {"$match": query},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": LIST_PROJECTION},
+    ]).to_list()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(last["created_at"], last["_id"])
+
+    return {"items": [list_row_to_dict(r) for r in rows], "next_cursor": next_cursor}
 
 async def get_complaint_by_id_controller(complaint_id: str) -> Dict:
     complaint = await Complaint.get(_to_object_id(complaint_id))
@@ -93,13 +314,370 @@ async def get_complaint_by_id_controller(complaint_id: str) -> Dict:
         raise HTTPException(status_code=200, detail="Complaint not found")
     return complaint_to_dict(complaint)
 
+
+# ------------------ Search ------------------
+
+SEARCH_PAGE_MAX = 50
+# deepest result reachable by paging; relevance past this point is noise
+SEARCH_RESULTS_MAX = 500
+_OBJECT_ID_RE = re.compile(r"^[0-9a-fA-F]{24}$")
+_PHONE_RE = re.compile(r"^\+?\d[\d\s-]{8,15}\d$")
+
+
+async def _search_page(ids: List[ObjectId]) -> List[Dict]:
+    """Projected list rows for ids, kept in the given (ranked) order."""
+    rows = await Complaint.aggregate([
+        {"$match": {"_id": {"$in": ids}}},
+        {"$project": LIST_PROJECTION},
+    ]).to_list()
+    by_id = {r["_id"]: r for r in rows}
+    return [list_row_to_dict(by_id[oid]) for oid in ids if oid in by_id]
+
+
+async def search_complaints_controller(
+    q: str,
+    page: int = 1,
+    limit: int = 20,
+    **filters,
+) -> Dict:
+    """
+    Find complaints by id, mobile number or text. A complaint id or a phone
+    number is an exact lookup; anything else is ranked by the weighted text
+    index, with the in-process n-gram index adding prefix and misspelled
+    matches among recent open complaints.
+    """
+    q = q.strip()
+    limit = max(1, min(limit, SEARCH_PAGE_MAX))
+    offset = (max(page, 1) - 1) * limit
+    if not q or offset >= SEARCH_RESULTS_MAX:
+        return {"items": [], "page": page, "has_more": False, "match": None}
+    query = build_complaint_filter(**filters)
+    # one extra to know whether another page exists
+    wanted = min(offset + limit + 1, SEARCH_RESULTS_MAX)
+    collection = Complaint.get_pymongo_collection()
+
+    if _OBJECT_ID_RE.match(q):
+        match = "id"
+        ranked = [r["_id"] for r in await collection.find({"_id": ObjectId(q), **query}, {"_id": 1}).to_list()]
+    elif _PHONE_RE.match(q):
+        match = "mobile"
+        digits = re.sub(r"\D", "", q)
+        # stored with or without the country code
+        numbers = list(dict.fromkeys([digits, digits[-10:]]))
+        ranked = [r["_id"] for r in await collection.find(
+            {"mobile_number": {"$in": numbers}, **query}, {"_id": 1}
+        ).sort([("created_at", -1)]).limit(wanted).to_list()]
+    else:
+        match = "text"
+        rows = await Complaint.aggregate([
+            {"$match": {"$text": {"$search": q}, **query}},
+            {"$sort": {"score": {"$meta": "textScore"}}},
+            {"$limit": wanted},
+            {"$project": {"_id": 1}},
+        ]).to_list()
+        ranked = [r["_id"] for r in rows]
+        # n-gram hits the text index missed (prefixes, typos) follow the text hits
+        seen = set(ranked)
+        extra = [ObjectId(doc_id) for doc_id, _ in ngram_index.search(q, limit=wanted)]
+        extra = [oid for oid in extra if oid not in seen]
+        if extra and query:
+            allowed = {r["_id"] for r in await collection.find({"_id": {"$in": extra}, **query}, {"_id": 1}).to_list()}
+            extra = [oid for oid in extra if oid in allowed]
+        ranked = (ranked + extra)[:wanted]
+
+    window = ranked[offset:offset + limit + 1]
+    has_more = len(window) > limit and offset + limit < SEARCH_RESULTS_MAX
+    return {
+        "items": await _search_page(window[:limit]),
+        "page": page,
+        "has_more": has_more,
+        "match": match,
+    }
+
+
+# ------------------ Geo queries ------------------
+
+EARTH_RADIUS_M = 6378100
+OPEN_FILTER = {"status": {"$nin": [s.value for s in TERMINAL_STATUSES]}}
+
+
+def radius_within(lat: float, lng: float, radius_m: float) -> Dict:
+    """$geoWithin operand for a circle of radius_m metres around (lat, lng)."""
+    return {"$centerSphere": [[lng, lat], radius_m / EARTH_RADIUS_M]}
+
+
+POLYGON_MAX_POINTS = 100
+
+
+def parse_polygon(text: str) -> List[Tuple[float, float]]:
+    """
+    Vertices from "lat,lng;lat,lng;..." (at least three, at most
+    POLYGON_MAX_POINTS). A ring closed by repeating the first vertex is
+    accepted; the repeat does not count as a vertex.
+    """
+    try:
+        points = [tuple(float(v) for v in pair.split(",")) for pair in text.split(";") if pair.strip()]
+        for point in points:
+            lat, lng = point
+            GeoPoint.model_validate({"lat": lat, "lng": lng})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="polygon must be lat,lng pairs separated by ';'")
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    if not 3 <= len(points) <= POLYGON_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"polygon needs 3 to {POLYGON_MAX_POINTS} points")
+    return points
+
+
+def polygon_within(points: List[Tuple[float, float]]) -> Dict:
+    """$geoWithin operand for a polygon given as (lat, lng) vertices; the ring is closed here."""
+    ring = [[lng, lat] for lat, lng in points]
+    if ring[0] != ring[-1]:
+        ring.append(ring[0])
+    return {"$geometry": {"type": "Polygon", "coordinates": [ring]}}
+
+
+async def nearby_complaints_controller(
+    lat: float,
+    lng: float,
+    radius_m: Optional[float] = None,
+    open_only: bool = True,
+    limit: int = 50,
+    **filters,
+) -> Dict:
+    """
+    Complaints nearest to (lat, lng) first, each with its distance in metres;
+    optionally only those within radius_m. Open complaints only by default,
+    so a field team gets its local work queue from one indexed $geoNear.
+    """
+    limit = max(1, min(limit, LIST_PAGE_MAX))
+    query = build_complaint_filter(**filters)
+    if open_only and "status" not in query:
+        query.update(OPEN_FILTER)
+    near = {
+        "near": {"type": "Point", "coordinates": [lng, lat]},
+        "key": "location",
+        "distanceField": "distance_m",
+        "spherical": True,
+        "query": query,
+    }
+    if radius_m is not None:
+        near["maxDistance"] = radius_m
+    rows = await Complaint.aggregate([
+        {"$geoNear": near},
+        {"$limit": limit},
+        {"$project": {**LIST_PROJECTION, "distance_m": 1}},
+    ]).to_list()
+    return {"items": [list_row_to_dict(r) for r in rows]}
+
+
+# ------------------ Transition engine ------------------
+# Every workflow step is one conditional find_one_and_update: the filter holds
+# the expected state, an update pipeline applies the change server-side, and
+# the pre-image comes back so the new state is rebuilt without a second read.
+# _apply_in_memory mirrors the pipeline; tests/test_transitions.py runs both
+# for every step and checks they produce the same document.
+
+def _lit(value):
+    return {"$literal": _bson_encoder.encode(value)}
+
+
+def _as_stored(value):
+    """value as Mongo hands it back: datetimes keep only milliseconds."""
+    if isinstance(value, datetime):
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if isinstance(value, BaseModel):
+        return value.model_copy(update={k: _as_stored(getattr(value, k)) for k in type(value).model_fields})
+    if isinstance(value, dict):
+        return {k: _as_stored(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_as_stored(v) for v in value]
+    return value
+
+
+def _current(field: str) -> Dict:
+    """Pipeline expression for a field of the current assignment (null if none)."""
+    return {"$let": {
+        "vars": {"a": {"$arrayElemAt": ["$assignments", "$current_assignment_index"]}},
+        "in": {"$ifNull": [f"$$a.{field}", None]},
+    }}
+
+
+_LAST_INDEX = {"$subtract": [{"$size": {"$ifNull": ["$assignments", []]}}, 1]}
+
+HAS_CURRENT_ASSIGNMENT = {"$and": [
+    {"$gte": ["$current_assignment_index", 0]},
+    {"$lt": ["$current_assignment_index", {"$size": {"$ifNull": ["$assignments", []]}}]},
+]}
+
+# expected-state filters shared by single and batch transitions
+# duplicates are handled through their parent complaint
+ASSIGNABLE = {"status": {"$ne": ComplaintStatus.CLOSED.value}, "duplicate_of": None}
+CLOSABLE = {"status": ComplaintStatus.VERIFIED_BY_JE.value, "$expr": HAS_CURRENT_ASSIGNMENT}
+
+
+def _merge_into_assignment(index_expr, changes: Dict) -> Dict:
+    """Pipeline value for `assignments` with `changes` merged into element index_expr."""
+    return {"$map": {
+        "input": {"$range": [0, {"$size": {"$ifNull": ["$assignments", []]}}]},
+        "as": "i",
+        "in": {"$cond": [
+            {"$eq": ["$$i", index_expr]},
+            {"$mergeObjects": [
+                {"$arrayElemAt": ["$assignments", "$$i"]},
+                {k: _lit(v) for k, v in changes.items()},
+            ]},
+            {"$arrayElemAt": ["$assignments", "$$i"]},
+        ]},
+    }}
+
+
+def _cancel_held_current() -> Dict:
+    """Pipeline value for `assignments` with the current one cancelled if it is still held."""
+    held = [s.value for s in HELD_ASSIGNMENT_STATUSES]
+    return {"$map": {
+        "input": {"$range": [0, {"$size": {"$ifNull": ["$assignments", []]}}]},
+        "as": "i",
+        "in": {"$let": {
+            "vars": {"a": {"$arrayElemAt": ["$assignments", "$$i"]}},
+            "in": {"$cond": [
+                {"$and": [{"$eq": ["$$i", "$current_assignment_index"]}, {"$in": ["$$a.status", held]}]},
+                {"$mergeObjects": ["$$a", {"status": AssignmentStatus.CANCELLED.value}]},
+                "$$a",
+            ]},
+        }},
+    }}
+
+
+def _apply_in_memory(
+    complaint: Complaint,
+    fields: Dict,
+    assignment: Optional[Dict],
+    target: str,
+    push: Optional[Assignment],
+):
+    # mirror of the update pipeline in _transition, same order
+    assignments = complaint.assignments or []
+    if assignment and assignments:
+        idx = complaint.current_assignment_index if target == "current" else len(assignments) - 1
+        if idx is not None and 0 <= idx < len(assignments):
+            for key, value in assignment.items():
+                setattr(assignments[idx], key, value)
+    if push:
+        displaced = _held_current(complaint)
+        if displaced:
+            displaced.status = AssignmentStatus.CANCELLED
+        complaint.assignments = list(assignments) + [push]
+        complaint.current_assignment_index = len(complaint.assignments) - 1
+    for key, value in fields.items():
+        setattr(complaint, key, value)
+    complaint.sync_current_assignment()
+
+
+async def _transition(
+    complaint_id: str,
+    expect: Optional[Dict] = None,
+    fields: Optional[Dict] = None,
+    assignment: Optional[Dict] = None,
+    target: str = "current",
+    push: Optional[Assignment] = None,
+    check: Optional[Callable[[Optional[Complaint]], None]] = None,
+) -> Tuple[Complaint, Complaint]:
+    """
+    Apply one workflow step atomically and return (before, after).
+
+    - expect: extra filter conditions the document must meet (expected state)
+    - fields: top-level fields to set (updated_at is always set)
+    - assignment: fields to set on the current (or, with target="last", the last) assignment
+    - push: a new assignment appended and made current
+    - check: the step's validation in Python; only run when the update matched
+      nothing, to raise the specific error (not found, wrong state, ...)
+    """
+    oid = _to_object_id(complaint_id)
+    # what gets written is exactly what the in-memory copy holds
+    fields = _as_stored({**(fields or {}), "updated_at": datetime.utcnow()})
+    assignment, push = _as_stored(assignment), _as_stored(push)
+    pipeline = _transition_pipeline(fields, assignment, target, push)
+
+    raw = await Complaint.get_pymongo_collection().find_one_and_update(
+        {"_id": oid, **(expect or {})},
+        pipeline,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if raw is None:
+        complaint = await Complaint.get(oid)
+        if check:
+            check(complaint)
+        if not complaint:
+            raise HTTPException(status_code=404, detail="Complaint not found")
+        # the document moved on between the caller's view and this update
+        raise HTTPException(status_code=409, detail="Complaint was updated concurrently, please retry")
+
+    before = Complaint.model_validate(raw)
+    after = before.model_copy(deep=True)
+    _apply_in_memory(after, fields, assignment, target, push)
+    if push:
+        displaced = _held_current(before)
+        if displaced:
+            await _release_worker(displaced, was_held=True)
+    await record_transition(before, after)
+    ngram_index.update(after)
+    duplicate_index.update(after)
+    _invalidate_map(before, after)
+    if _reached_terminal(before, after):
+        await _close_duplicates({str(after.id): after.status})
+    return before, after
+
+
+def _reached_terminal(before: Complaint, after: Complaint) -> bool:
+    return before.status not in TERMINAL_STATUSES and after.status in TERMINAL_STATUSES
+
+
+def _invalidate_map(before: Complaint, after: Complaint):
+    # map tiles only show status counts per place
+    if before.status != after.status or before.geohash != after.geohash:
+        invalidate_map_tiles(before.geohash, after.geohash)
+
+
+def _transition_pipeline(
+    fields: Dict,
+    assignment: Optional[Dict],
+    target: str,
+    push: Optional[Assignment],
+) -> List[Dict]:
+    """Update pipeline for one step; fields must already include updated_at."""
+    pipeline = []
+    if assignment:
+        index_expr = "$current_assignment_index" if target == "current" else _LAST_INDEX
+        pipeline.append({"$set": {"assignments": _merge_into_assignment(index_expr, assignment)}})
+    if push:
+        # the assignment being replaced stops holding its assignee
+        pipeline.append({"$set": {"assignments": _cancel_held_current()}})
+        # both expressions see the array before the append
+        pipeline.append({"$set": {
+            "current_assignment_index": {"$size": {"$ifNull": ["$assignments", []]}},
+            "assignments": {"$concatArrays": [{"$ifNull": ["$assignments", []]}, [_lit(push)]]},
+        }})
+    pipeline.append({"$set": {k: _lit(v) for k, v in fields.items()}})
+    pipeline.append({"$set": {
+        "current_assignment_status": _current("status"),
+        "current_sla_deadline": _current("sla_deadline"),
+    }})
+    return pipeline
+
+# ------------------ CRUD Controllers (update/delete) ------------------
+
 async def update_complaint_controller(complaint_id: str, data: dict) -> Dict:
-    complaint = await Complaint.get(_to_object_id(complaint_id))
-    if not complaint:
-        raise HTTPException(status_code=200, detail="Complaint not found")
-    await complaint.set(data)
-    complaint.updated_at = datetime.utcnow()
-    await complaint.save()
+    def check(complaint):
+        if not complaint:
+            raise HTTPException(status_code=200, detail="Complaint not found")
+
+    if data.get("location") is not None:
+        location = GeoPoint.model_validate(data["location"])
+        lng, lat = location.coordinates
+        data = {**data, "location": location, "geohash": encode_geohash(lat, lng)}
+    _, complaint = await _transition(complaint_id, fields=data, check=check)
+    sla_scheduler.track(complaint)
     return complaint_to_dict(complaint)
 
 async def delete_complaint_controller(complaint_id: str) -> Dict:
@@ -107,10 +685,44 @@ async def delete_complaint_controller(complaint_id: str) -> Dict:
     if not complaint:
         raise HTTPException(status_code=200, detail="Complaint not found")
     await complaint.delete()
+    sla_scheduler.cancel(complaint_id)
+    ngram_index.remove(str(complaint.id))
+    duplicate_index.remove(str(complaint.id))
+    invalidate_map_tiles(complaint.geohash)
+    await _adjust_duplicate_count(complaint.duplicate_of, -1)
+    # its duplicates become complaints of their own again
+    await Complaint.get_pymongo_collection().update_many(
+        {"duplicate_of": str(complaint.id)}, {"$set": {"duplicate_of": None}}
+    )
+    await record_deleted(complaint)
+    await release_blobs(proof_file_hashes(complaint))
     return {"detail": "Complaint deleted successfully"}
 
 # ------------------ Workflow Controllers ------------------
 
+def _check_exists(complaint):
+    if not complaint:
+        raise HTTPException(status_code=200, detail="Complaint not found")
+
+
+def _check_assignable(complaint):
+    _check_exists(complaint)
+    if complaint.status == ComplaintStatus.CLOSED:
+        raise HTTPException(status_code=400, detail="Cannot assign a closed complaint")
+    if complaint.duplicate_of:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Complaint is a duplicate of {complaint.duplicate_of}; assign that complaint instead",
+        )
+
+
+def _check_closable(complaint):
+    _check_exists(complaint)
+    if complaint.status != ComplaintStatus.VERIFIED_BY_JE:
+        raise HTTPException(status_code=200, detail="Complaint not verified by JE for closure")
+    _get_current_assignment(complaint)
+
+
 async def assign_complaint_controller(
     complaint_id: str,
     group: Optional[str] = None,
@@ -118,12 +730,6 @@ async def assign_complaint_controller(
     assigned_by: Optional[str] = None,
     sla_minutes: int = 240
 ) -> Dict:
-    complaint = await Complaint.get(_to_object_id(complaint_id))
-    if not complaint:
-        raise HTTPException(status_code=200, detail="Complaint not found")
-    if complaint.status == ComplaintStatus.CLOSED:
-        raise HTTPException(status_code=400, detail="Cannot assign a closed complaint")
-
     worker = None
     if worker_user_id:
         worker = await Worker.find_one(Worker.id == _to_object_id(worker_user_id))
@@ -131,6 +737,8 @@ async def assign_complaint_controller(
             raise HTTPException(status_code=200, detail="Worker not found")
         if not worker.available:
             raise HTTPException(status_code=400, detail="Worker not available")
+        if not worker_has_capacity(worker):
+            raise HTTPException(status_code=409, detail="Worker has no capacity left")
 
     sla_deadline = datetime.utcnow() + timedelta(minutes=sla_minutes)
     assignment = Assignment(
@@ -144,129 +752,165 @@ async def assign_complaint_controller(
         retries=0,
     )
 
-    complaint.assignments = complaint.assignments or []
-    complaint.assignments.append(assignment)
-    complaint.current_assignment_index = len(complaint.assignments) - 1
-    complaint.status = ComplaintStatus.ASSIGNED
-    complaint.updated_at = datetime.utcnow()
+    _, complaint = await _transition(
+        complaint_id,
+        expect=ASSIGNABLE,
+        fields={"status": ComplaintStatus.ASSIGNED},
+        push=assignment,
+        check=_check_assignable,
+    )
 
     if worker:
-       await _set_worker_availability(str(worker.id))
+       await update_worker_load(str(worker.id), 1)
 
-
-    await complaint.save()
+    sla_scheduler.track(complaint)
     return complaint_to_dict(complaint)
 
 
-async def submit_proof_controller(
-    complaint_id: str,
-    submitter_id: str,
-    proof_files: List[ProofFile],
-    role: str
-) -> Dict:
-    complaint = await Complaint.get(_to_object_id(complaint_id))
-    if not complaint:
-        raise HTTPException(status_code=404, detail="Complaint not found")
-
-    current = _get_current_assignment(complaint)
-    if not current:
-        raise HTTPException(status_code=404, detail="No active assignment found")
-    
-    if current.status != AssignmentStatus.ASSIGNED_TO_CONTRACTOR:
-        raise HTTPException(status_code=403, detail="Complaint not in valid state for submission")
-
-    if role == "Contractor":
-        if str(current.worker_id) != str(submitter_id):
-            raise HTTPException(status_code=403, detail="Contractor not assigned to this complaint")
-    elif role != "JE":
-        raise HTTPException(status_code=403, detail="Unauthorized role for proof submission")
-
-    current.proof_files = proof_files
-    current.status = AssignmentStatus.SUBMITTED_BY_CM
-    current.submitted_at = datetime.utcnow()
-    complaint.status = ComplaintStatus.SUBMITTED_BY_CM
-    complaint.updated_at = datetime.utcnow()
-    await complaint.save()
-
-    return complaint_to_dict(complaint)
-
 async def verify_proof_controller(complaint_id: str, je_id: str, action: str, note: Optional[str] = None) -> Dict:
-    complaint = await Complaint.get(_to_object_id(complaint_id))
-    if not complaint:
-        raise HTTPException(status_code=200, detail="Complaint not found")
-
-    current = _get_current_assignment(complaint)
-    if current.status != AssignmentStatus.SUBMITTED_BY_CM:
-        raise HTTPException(status_code=200, detail="No proof submitted by CM to verify")
-
     if action == "approve":
-        current.status = AssignmentStatus.VERIFIED_BY_JE
-        current.verified_by = str(je_id)
-        current.verified_at = datetime.utcnow()
-        complaint.status = ComplaintStatus.VERIFIED_BY_JE
+        assignment = {
+            "status": AssignmentStatus.VERIFIED_BY_JE,
+            "verified_by": str(je_id),
+            "verified_at": datetime.utcnow(),
+        }
+        status = ComplaintStatus.VERIFIED_BY_JE
 
     elif action == "reject":
-        current.status = AssignmentStatus.ESCALATED
-        current.escalate_reason = note or "Rejected by JE"
-        complaint.status = ComplaintStatus.ESCALATED
+        assignment = {"status": AssignmentStatus.ESCALATED, "escalate_reason": note or "Rejected by JE"}
+        status = ComplaintStatus.ESCALATED
     else:
         raise HTTPException(status_code=200, detail="Invalid action")
 
-    if current.worker_id:
-        await _set_worker_availability(current.worker_id, available=True)
+    def check(complaint):
+        if not complaint:
+            raise HTTPException(status_code=200, detail="Complaint not found")
+        current = _get_current_assignment(complaint)
+        if current.status != AssignmentStatus.SUBMITTED_BY_CM:
+            raise HTTPException(status_code=200, detail="No proof submitted by CM to verify")
+
+    before, complaint = await _transition(
+        complaint_id,
+        expect={"$expr": {"$eq": [_current("status"), AssignmentStatus.SUBMITTED_BY_CM.value]}},
+        fields={"status": status},
+        assignment=assignment,
+        check=check,
+    )
 
-    complaint.updated_at = datetime.utcnow()
-    await complaint.save()
+    await _release_worker(_get_current_assignment(before), was_held=True)
+    sla_scheduler.track(complaint)
     return complaint_to_dict(complaint)
 
 
-async def manager_approve_close_controller(complaint_id: str, manager_id: str, final_note: Optional[str] = None) -> Dict:
-    complaint = await Complaint.get(_to_object_id(complaint_id))
-    if not complaint:
-        raise HTTPException(status_code=200, detail="Complaint not found")
-    if complaint.status != ComplaintStatus.VERIFIED_BY_JE:
-        raise HTTPException(status_code=200, detail="Complaint not verified by JE for closure")
+def _close_step(manager_id: str, final_note: Optional[str]) -> Dict:
+    return {
+        "expect": CLOSABLE,
+        "fields": {"status": ComplaintStatus.CLOSED},
+        "assignment": {
+            "status": AssignmentStatus.VERIFIED_BY_GM,
+            "verified_by": str(manager_id),
+            "verified_at": datetime.utcnow(),
+            "final_note": final_note,
+        },
+    }
 
-    current = _get_current_assignment(complaint)
-    current.status = AssignmentStatus.VERIFIED_BY_GM
-    current.verified_by = manager_id
-    current.verified_at = datetime.utcnow()
-    current.final_note = final_note
 
-    complaint.status = ComplaintStatus.CLOSED
-    complaint.updated_at = datetime.utcnow()
-    await complaint.save()
+async def manager_approve_close_controller(complaint_id: str, manager_id: str, final_note: Optional[str] = None) -> Dict:
+    _, complaint = await _transition(complaint_id, check=_check_closable, **_close_step(manager_id, final_note))
+    sla_scheduler.track(complaint)
     return complaint_to_dict(complaint)
 
 
+def _escalate_step(reason: str) -> Dict:
+    return {
+        "fields": {"status": ComplaintStatus.ESCALATED},
+        "assignment": {"status": AssignmentStatus.ESCALATED, "escalate_reason": reason},
+        "target": "last",
+    }
+
+
 async def escalate_complaint_controller(complaint_id: str, reason: str) -> Dict:
-    complaint = await Complaint.get(_to_object_id(complaint_id))
-    if not complaint:
-        raise HTTPException(status_code=200, detail="Complaint not found")
+    before, complaint = await _transition(complaint_id, check=_check_exists, **_escalate_step(reason))
 
-    complaint.status = ComplaintStatus.ESCALATED
-    if complaint.assignments:
-        last = complaint.assignments[-1]
-        last.status = AssignmentStatus.ESCALATED
-        last.escalate_reason = reason
-        if last.worker_id:
-            await _set_worker_availability(last.worker_id, available=True)
+    if before.assignments:
+        last = before.assignments[-1]
+        await _release_worker(last, last.status in HELD_ASSIGNMENT_STATUSES)
 
-    complaint.updated_at = datetime.utcnow()
-    await complaint.save()
+    sla_scheduler.track(complaint)
     return complaint_to_dict(complaint)
 
 
+# ------------------ Duplicates ------------------
+async def unlink_duplicate_controller(complaint_id: str) -> Dict:
+    """Undo a wrong duplicate match: the report becomes a complaint of its own."""
+    def check(complaint):
+        _check_exists(complaint)
+        if not complaint.duplicate_of:
+            raise HTTPException(status_code=400, detail="Complaint is not marked as a duplicate")
+
+    before, complaint = await _transition(
+        complaint_id,
+        expect={"duplicate_of": {"$type": "string"}},
+        fields={"duplicate_of": None},
+        check=check,
+    )
+    await _adjust_duplicate_count(before.duplicate_of, -1)
+    return complaint_to_dict(complaint)
+
+
+async def _close_duplicates(parents: Dict[str, ComplaintStatus]) -> Dict[str, Complaint]:
+    """
+    Carry each parent's terminal status (closed/rejected) over to its open
+    duplicates, which cannot be worked on their own. duplicate_of is kept
+    so the link stays visible. Returns the updated duplicates by id.
+    """
+    by_status: Dict[ComplaintStatus, List[str]] = {}
+    for parent_id, status in parents.items():
+        by_status.setdefault(ComplaintStatus(status), []).append(parent_id)
+
+    collection = Complaint.get_pymongo_collection()
+    now = datetime.utcnow()
+    # Mongo keeps milliseconds; the stamp tells our writes apart from a concurrent unlink
+    stamp = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+    pairs = []
+    for status, parent_ids in by_status.items():
+        query = {"duplicate_of": {"$in": parent_ids}, **OPEN_FILTER}
+        children = await Complaint.find(query).to_list()
+        if not children:
+            continue
+        ids = [c.id for c in children]
+        result = await collection.update_many(
+            {"_id": {"$in": ids}, **query},
+            {"$set": {"status": status.value, "updated_at": stamp}},
+        )
+        applied = set(ids)
+        if result.modified_count < len(ids):
+            rows = await collection.find({"_id": {"$in": ids}, "updated_at": stamp}, {"_id": 1}).to_list()
+            applied = {r["_id"] for r in rows}
+        for before in children:
+            if before.id in applied:
+                after = before.model_copy(deep=True)
+                after.status = status
+                after.updated_at = stamp
+                pairs.append((before, after))
+
+    for before, after in pairs:
+        ngram_index.update(after)
+        duplicate_index.update(after)
+        _invalidate_map(before, after)
+    await record_transitions(pairs)
+    return {str(after.id): after for _, after in pairs}
 
 
 # ------------------ Forward complaint to JE ------------------
 async def forward_to_je_controller(complaint_id: str, cm_id: str, je_id: str) -> Dict:
-    complaint = await Complaint.get(_to_object_id(complaint_id))
-    if not complaint:
-        raise HTTPException(status_code=404, detail="Complaint not found")
-    if complaint.status != ComplaintStatus.ASSIGNED:
-        raise HTTPException(status_code=400, detail="Only assigned complaints can be forwarded")
-    
+    def check(complaint):
+        if not complaint:
+            raise HTTPException(status_code=404, detail="Complaint not found")
+        if complaint.status != ComplaintStatus.ASSIGNED:
+            raise HTTPException(status_code=400, detail="Only assigned complaints can be forwarded")
+
     # Add forward assignment
     assignment = Assignment(
         group="JE",
@@ -275,12 +919,14 @@ async def forward_to_je_controller(complaint_id: str, cm_id: str, je_id: str) ->
         assigned_at=datetime.utcnow(),
         status=AssignmentStatus.ASSIGNED
     )
-    complaint.assignments = complaint.assignments or []
-    complaint.assignments.append(assignment)
-    complaint.current_assignment_index = len(complaint.assignments) - 1
-    complaint.status = ComplaintStatus.FORWARDED_TO_JE
-    complaint.updated_at = datetime.utcnow()
-    await complaint.save()
+    _, complaint = await _transition(
+        complaint_id,
+        expect={"status": ComplaintStatus.ASSIGNED.value},
+        fields={"status": ComplaintStatus.FORWARDED_TO_JE},
+        push=assignment,
+        check=check,
+    )
+    sla_scheduler.track(complaint)
     return complaint_to_dict(complaint)
 
 # ------------------ JE creates contractor ------------------
@@ -314,15 +960,16 @@ async def create_contractor_controller(je_id: str, contractor_data: dict) -> Dic
 async def assign_contractor_controller(
     complaint_id: str, contractor_id: str, je_id: str, sla_minutes: int = 240
 ) -> Dict:
-    complaint = await Complaint.get(_to_object_id(complaint_id))
     contractor = await Worker.get(_to_object_id(contractor_id))
-
-    if not complaint or not contractor:
+    if not contractor:
         raise HTTPException(status_code=404, detail="Complaint or contractor not found")
 
     if str(getattr(contractor, "created_by_je", None)) != str(je_id):
         raise HTTPException(status_code=403, detail="JE can only assign contractors they created")
 
+    def check(complaint):
+        if not complaint:
+            raise HTTPException(status_code=404, detail="Complaint or contractor not found")
 
     assignment = Assignment(
         group="Contractor",
@@ -334,16 +981,25 @@ async def assign_contractor_controller(
         sla_deadline=datetime.utcnow() + timedelta(minutes=sla_minutes)
     )
 
-    complaint.assignments = complaint.assignments or []
-    complaint.assignments.append(assignment)
-    complaint.current_assignment_index = len(complaint.assignments) - 1
-    complaint.status = ComplaintStatus.ASSIGNED
-    complaint.updated_at = datetime.utcnow()
-    await _set_worker_availability(contractor.id, available=False)
-    await complaint.save()
+    _, complaint = await _transition(
+        complaint_id,
+        fields={"status": ComplaintStatus.ASSIGNED},
+        push=assignment,
+        check=check,
+    )
+    await update_worker_load(str(contractor.id), 1, available=False)
+    sla_scheduler.track(complaint)
     return complaint_to_dict(complaint)
 
 # ------------------ Contractor submits proof ------------------
+# role -> (assignment group it may submit for, new assignment status, new complaint status, error)
+_PROOF_SUBMITTERS = {
+    "CM": ("Worker", AssignmentStatus.SUBMITTED_BY_CM, ComplaintStatus.SUBMITTED_BY_CM,
+           "CM can only submit proof for Worker"),
+    "JE": ("Contractor", AssignmentStatus.SUBMITTED_BY_JE, ComplaintStatus.SUBMITTED_BY_JE,
+           "JE can only submit proof for Contractor"),
+}
+
 async def submit_proof_controller(
     complaint_id: str,
     submitter_id: str,
@@ -355,36 +1011,33 @@ async def submit_proof_controller(
     - CM submits proof for Worker assignments
     - JE submits proof for Contractor assignments
     """
-
-    complaint = await Complaint.get(_to_object_id(complaint_id))
-    if not complaint:
-        raise HTTPException(status_code=404, detail="Complaint not found")
-
-    current = _get_current_assignment(complaint)
-    if not current:
-        raise HTTPException(status_code=404, detail="No active assignment found")
-
-    # Role-specific checks
-    if role == "CM":
-        if current.group != "Worker":
-            raise HTTPException(status_code=403, detail="CM can only submit proof for Worker")
-        current.status = AssignmentStatus.SUBMITTED_BY_CM
-        complaint.status = ComplaintStatus.SUBMITTED_BY_CM
-
-    elif role == "JE":
-        if current.group != "Contractor":
-            raise HTTPException(status_code=403, detail="JE can only submit proof for Contractor")
-        current.status = AssignmentStatus.SUBMITTED_BY_JE
-        complaint.status = ComplaintStatus.SUBMITTED_BY_JE
-
-    else:
+    if role not in _PROOF_SUBMITTERS:
         raise HTTPException(status_code=403, detail="Unauthorized role for proof submission")
-
-    current.proof_files = proof_files
-    current.submitted_at = datetime.utcnow()
-    complaint.updated_at = datetime.utcnow()
-    await complaint.save()
-
+    group, assignment_status, complaint_status, group_error = _PROOF_SUBMITTERS[role]
+    proof_files = [ProofFile(**p) if isinstance(p, dict) else p for p in proof_files]
+
+    def check(complaint):
+        if not complaint:
+            raise HTTPException(status_code=404, detail="Complaint not found")
+        current = _get_current_assignment(complaint)
+        if current.group != group:
+            raise HTTPException(status_code=403, detail=group_error)
+
+    before, complaint = await _transition(
+        complaint_id,
+        expect={"$expr": {"$eq": [_current("group"), group]}},
+        fields={"status": complaint_status},
+        assignment={
+            "status": assignment_status,
+            "proof_files": proof_files,
+            "submitted_at": datetime.utcnow(),
+        },
+        check=check,
+    )
+    # a resubmission replaces the earlier proof; drop its blob references
+    replaced = _get_current_assignment(before).proof_files or []
+    await release_blobs(f.sha256 for f in replaced)
+    sla_scheduler.track(complaint)
     return complaint_to_dict(complaint)
 
 
@@ -395,33 +1048,225 @@ async def je_verify_contractor_controller(
     action: str,
     note: Optional[str] = None
 ) -> Dict:
-    complaint = await Complaint.get(_to_object_id(complaint_id))
-    if not complaint:
-        raise HTTPException(status_code=404, detail="Complaint not found")
-
-    current = _get_current_assignment(complaint)
-
     # ✅ JE is allowed to verify directly (no CM or contractor proof check)
-    if not current:
-        raise HTTPException(status_code=400, detail="No active assignment found for this complaint")
-
     if action == "approve":
-        current.status = AssignmentStatus.VERIFIED_BY_JE
-        current.verified_by = str(je_id)
-        current.verified_at = datetime.utcnow()
-        complaint.status = ComplaintStatus.VERIFIED_BY_JE
+        assignment = {
+            "status": AssignmentStatus.VERIFIED_BY_JE,
+            "verified_by": str(je_id),
+            "verified_at": datetime.utcnow(),
+        }
+        status = ComplaintStatus.VERIFIED_BY_JE
     elif action == "reject":
-        current.status = AssignmentStatus.ESCALATED
-        current.escalate_reason = note or "Rejected by JE"
-        complaint.status = ComplaintStatus.ESCALATED
+        assignment = {"status": AssignmentStatus.ESCALATED, "escalate_reason": note or "Rejected by JE"}
+        status = ComplaintStatus.ESCALATED
     else:
         raise HTTPException(status_code=400, detail="Invalid action")
 
-    if current.worker_id:
-        await _set_worker_availability(current.worker_id, True)
+    def check(complaint):
+        if not complaint:
+            raise HTTPException(status_code=404, detail="Complaint not found")
+        _get_current_assignment(complaint)
+
+    before, complaint = await _transition(
+        complaint_id,
+        expect={"$expr": HAS_CURRENT_ASSIGNMENT},
+        fields={"status": status},
+        assignment=assignment,
+        check=check,
+    )
 
-    complaint.updated_at = datetime.utcnow()
-    await complaint.save()
+    current = _get_current_assignment(before)
+    await _release_worker(current, current.status in HELD_ASSIGNMENT_STATUSES)
+    sla_scheduler.track(complaint)
     return complaint_to_dict(complaint)
 
 
+# ------------------ Batch workflow ------------------
+# The same steps as the single controllers, for many complaints at once: one
+# read of all targets, the checks in Python, one unordered bulk_write of the
+# conditional updates, then the side effects (worker loads, SLA timers) in bulk.
+
+BATCH_MAX = 1000
+
+
+def _batch_error(complaint_id: str, exc: HTTPException) -> Dict:
+    return {"id": complaint_id, "ok": False, "status_code": exc.status_code, "detail": exc.detail}
+
+
+async def _batch_transition(
+    complaint_ids: List[str],
+    plan: Callable[[Complaint], Dict],
+) -> Tuple[List[Dict], List[Tuple[Complaint, Complaint]]]:
+    """
+    Apply one step per complaint. `plan` validates a complaint (raising
+    HTTPException like the single checks) and returns the _transition
+    arguments (expect/fields/assignment/target/push) for it.
+
+    Returns per-item results in input order and (before, after) pairs of
+    the complaints that were updated.
+    """
+    if len(complaint_ids) > BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX} complaints per batch")
+
+    results: Dict[str, Dict] = {}
+    oids: Dict[str, ObjectId] = {}
+    for cid in complaint_ids:
+        if cid in oids or cid in results:
+            continue  # repeated ids are applied once and reported once
+        if ObjectId.is_valid(cid):
+            oids[cid] = ObjectId(cid)
+        else:
+            results[cid] = _batch_error(cid, HTTPException(status_code=400, detail="Invalid ID format"))
+
+    found = await Complaint.find({"_id": {"$in": list(oids.values())}}).to_list()
+    by_id = {str(c.id): c for c in found}
+
+    # one stamp for the whole batch, at Mongo's millisecond precision, so the
+    # updates that matched can be told apart from the ones that lost a race
+    now = datetime.utcnow()
+    stamp = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+    ops, planned = [], {}
+    for cid, oid in oids.items():
+        complaint = by_id.get(cid)
+        try:
+            if complaint is None:
+                raise HTTPException(status_code=404, detail="Complaint not found")
+            step = plan(complaint)
+        except HTTPException as exc:
+            results[cid] = _batch_error(cid, exc)
+            continue
+        fields = _as_stored({**step.get("fields", {}), "updated_at": stamp})
+        step = {**step, "assignment": _as_stored(step.get("assignment")), "push": _as_stored(step.get("push"))}
+        target = step.get("target", "current")
+        pipeline = _transition_pipeline(fields, step.get("assignment"), target, step.get("push"))
+        ops.append(UpdateOne({"_id": oid, **(step.get("expect") or {})}, pipeline))
+        planned[cid] = (complaint, fields, step, target)
+
+    applied = set(planned)
+    if ops:
+        result = await Complaint.get_pymongo_collection().bulk_write(ops, ordered=False)
+        if result.matched_count < len(ops):
+            rows = await Complaint.get_pymongo_collection().find(
+                {"_id": {"$in": [oids[cid] for cid in planned]}, "updated_at": stamp}, {"_id": 1}
+            ).to_list()
+            applied = {str(r["_id"]) for r in rows}
+
+    pairs = []
+    terminal: Dict[str, ComplaintStatus] = {}
+    releases: Dict[str, int] = {}  # assignees of held assignments replaced by a push
+    for cid, (before, fields, step, target) in planned.items():
+        if cid not in applied:
+            results[cid] = _batch_error(
+                cid, HTTPException(status_code=409, detail="Complaint was updated concurrently, please retry")
+            )
+            continue
+        after = before.model_copy(deep=True)
+        _apply_in_memory(after, fields, step.get("assignment"), target, step.get("push"))
+        displaced = _held_current(before) if step.get("push") else None
+        if displaced and displaced.worker_id:
+            releases[displaced.worker_id] = releases.get(displaced.worker_id, 0) - 1
+        sla_scheduler.track(after)
+        ngram_index.update(after)
+        duplicate_index.update(after)
+        _invalidate_map(before, after)
+        pairs.append((before, after))
+        if _reached_terminal(before, after):
+            terminal[str(after.id)] = after.status
+        results[cid] = {"id": cid, "ok": True, "status": after.status}
+
+    await bulk_update_worker_loads(releases, available=True)
+    await record_transitions(pairs)
+    await _close_duplicates(terminal)
+    ordered = [results[cid] for cid in dict.fromkeys(complaint_ids)]
+    return ordered, pairs
+
+
+def _batch_summary(results: List[Dict]) -> Dict:
+    succeeded = sum(1 for r in results if r["ok"])
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
+async def batch_assign_complaints_controller(
+    complaint_ids: List[str],
+    assigned_by: str,
+    worker_user_ids: Optional[List[str]] = None,
+    group: Optional[str] = None,
+    sla_minutes: int = 240,
+) -> Dict:
+    """
+    Assign many complaints, spreading them over the least busy workers
+    (the given ones, or every available worker of `group`) without taking
+    any worker past max_tasks. Complaints left over once every worker is
+    full are reported as failed.
+    """
+    if worker_user_ids:
+        worker_oids = [_to_object_id(w) for w in worker_user_ids]
+        workers = await Worker.find({"_id": {"$in": worker_oids}, "available": True}).to_list()
+    else:
+        workers = await Worker.find({"group": group or "Worker", "available": True}).to_list()
+
+    # (load, tie-breaker, worker); max_tasks None means no cap
+    heap = [(w.active_tasks, i, w) for i, w in enumerate(workers)
+            if w.max_tasks is None or w.active_tasks < w.max_tasks]
+    heapq.heapify(heap)
+    sla_deadline = datetime.utcnow() + timedelta(minutes=sla_minutes)
+
+    def plan(complaint: Complaint) -> Dict:
+        _check_assignable(complaint)
+        if not heap:
+            raise HTTPException(status_code=409, detail="No worker capacity left")
+        load, i, worker = heapq.heappop(heap)
+        if worker.max_tasks is None or load + 1 < worker.max_tasks:
+            heapq.heappush(heap, (load + 1, i, worker))
+        return {
+            "expect": ASSIGNABLE,
+            "fields": {"status": ComplaintStatus.ASSIGNED},
+            "push": Assignment(
+                group="Worker",
+                worker_id=str(worker.id),
+                assigned_by=str(assigned_by),
+                assigned_user_id=str(worker.id),
+                assigned_at=datetime.utcnow(),
+                status=AssignmentStatus.ASSIGNED,
+                sla_deadline=sla_deadline,
+                retries=0,
+            ),
+        }
+
+    results, pairs = await _batch_transition(complaint_ids, plan)
+
+    deltas: Dict[str, int] = {}
+    for _, after in pairs:
+        worker_id = after.assignments[-1].worker_id
+        deltas[worker_id] = deltas.get(worker_id, 0) + 1
+    await bulk_update_worker_loads(deltas)
+    return _batch_summary(results)
+
+
+async def batch_escalate_complaints_controller(complaint_ids: List[str], reason: str) -> Dict:
+    def plan(complaint: Complaint) -> Dict:
+        _check_exists(complaint)
+        return _escalate_step(reason)
+
+    results, pairs = await _batch_transition(complaint_ids, plan)
+
+    releases: Dict[str, int] = {}
+    for before, _ in pairs:
+        if before.assignments:
+            last = before.assignments[-1]
+            if last.worker_id and last.status in HELD_ASSIGNMENT_STATUSES:
+                releases[last.worker_id] = releases.get(last.worker_id, 0) - 1
+    await bulk_update_worker_loads(releases, available=True)
+    return _batch_summary(results)
+
+
+async def batch_close_complaints_controller(complaint_ids: List[str], manager_id: str, final_note: Optional[str] = None) -> Dict:
+    step = _close_step(manager_id, final_note)
+
+    def plan(complaint: Complaint) -> Dict:
+        _check_closable(complaint)
+        return step
+
+    results, _ = await _batch_transition(complaint_ids, plan)
+    return _batch_summary(results)
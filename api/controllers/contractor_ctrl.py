@@ -1,7 +1,6 @@
 # api/controllers/contractor_ctrl.py
 from fastapi import HTTPException
-from api.db.models.worker import Worker
-from api.controllers.complaint_ctrl import get_active_assignments_count
+from api.db.models.complaint import Worker
 from typing import Dict
 
 async def create_contractor_controller(je_user, payload: Dict):
@@ -27,13 +26,12 @@ async def get_my_contractors_controller(je_user):
     contractors = await Worker.find({"created_by_je": str(je_user.id), "group": "Contractor"}).to_list()
     out = []
     for c in contractors:
-        active_count = await get_active_assignments_count(str(c.id))
         out.append({
             "id": str(c.id),
             "name": getattr(c, "full_name", ""),
             "email": getattr(c, "email", None),
             "available": getattr(c, "available", True),
             "max_tasks": getattr(c, "max_tasks", 3),
-            "active_tasks": active_count
+            "active_tasks": c.active_tasks
         })
     return out
@@ -0,0 +1,129 @@
+# api/controllers/export_ctrl.py
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from api.controllers.complaint_ctrl import build_complaint_filter
+from api.core.responses import dumps
+from api.db.models.complaint import Complaint
+
+EXPORT_FORMATS = ("ndjson", "csv")
+# rows encoded per chunk handed to the response; bounds memory and send overhead
+EXPORT_CHUNK_ROWS = 500
+EXPORT_CURSOR_BATCH = 1000
+
+# export column -> aggregation expression; current_assignment.* are read from
+# the current assignment ($$ca, bound once per row)
+EXPORT_COLUMNS: Dict[str, object] = {
+    "id": "$_id",
+    "full_name": "$full_name",
+    "mobile_number": "$mobile_number",
+    "email": "$email",
+    "complaint_category": "$complaint_category",
+    "complaint_subject": "$complaint_subject",
+    "detailed_description": "$detailed_description",
+    "complete_address": "$complete_address",
+    "division": "$division",
+    # GeoJSON order is [lng, lat]
+    "location.lat": {"$arrayElemAt": ["$location.coordinates", 1]},
+    "location.lng": {"$arrayElemAt": ["$location.coordinates", 0]},
+    "status": "$status",
+    "duplicate_of": "$duplicate_of",
+    "created_at": "$created_at",
+    "updated_at": "$updated_at",
+    "current_assignment.group": "$$ca.group",
+    "current_assignment.status": "$$ca.status",
+    "current_assignment.worker_id": "$$ca.worker_id",
+    "current_assignment.assigned_user_id": "$$ca.assigned_user_id",
+    "current_assignment.assigned_by": "$$ca.assigned_by",
+    "current_assignment.assigned_at": "$$ca.assigned_at",
+    "current_assignment.sla_deadline": "$$ca.sla_deadline",
+    "current_assignment.submitted_at": "$$ca.submitted_at",
+    "current_assignment.verified_by": "$$ca.verified_by",
+    "current_assignment.verified_at": "$$ca.verified_at",
+    "current_assignment.escalate_reason": "$$ca.escalate_reason",
+}
+
+
+def parse_export_fields(fields: Optional[str]) -> List[str]:
+    """Comma-separated column list (default: every column), validated against EXPORT_COLUMNS."""
+    if not fields:
+        return list(EXPORT_COLUMNS)
+    columns = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown or not columns:
+        raise HTTPException(status_code=400, detail=f"Unknown export fields: {', '.join(unknown) or '(none)'}")
+    return list(dict.fromkeys(columns))
+
+
+def _pipeline(query: Dict, columns: List[str]) -> List[Dict]:
+    # flat output keys: dots are not allowed in projected field names
+    projected = {f"c{i}": {"$ifNull": [EXPORT_COLUMNS[c], None]} for i, c in enumerate(columns)}
+    return [
+        {"$match": query},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$project": {"_id": 0, "row": {"$let": {
+            "vars": {"ca": {"$arrayElemAt": ["$assignments", "$current_assignment_index"]}},
+            "in": projected,
+        }}}},
+    ]
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def export_complaints(fmt: str = "ndjson", columns: Optional[List[str]] = None, **filters) -> AsyncIterator[bytes]:
+    """
+    Yield the matching complaints, newest first, as NDJSON lines or CSV rows
+    with the current assignment flattened into columns. Rows come straight
+    off a server-side cursor, so memory does not grow with the export.
+    """
+    columns = columns or list(EXPORT_COLUMNS)
+    keys = [f"c{i}" for i in range(len(columns))]
+    cursor = await Complaint.get_pymongo_collection().aggregate(
+        _pipeline(build_complaint_filter(**filters), columns),
+        batchSize=EXPORT_CURSOR_BATCH,
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    chunk: List[bytes] = []
+    pending = 0
+    if fmt == "csv":
+        writer.writerow(columns)
+
+    try:
+        async for doc in cursor:
+            row = doc["row"]
+            if fmt == "csv":
+                writer.writerow([_csv_value(row.get(k)) for k in keys])
+            else:
+                chunk.append(dumps({c: row.get(k) for c, k in zip(columns, keys)}))
+                chunk.append(b"\n")
+            pending += 1
+            if pending >= EXPORT_CHUNK_ROWS:
+                yield _take(chunk, buffer)
+                pending = 0
+        yield _take(chunk, buffer)
+    finally:
+        # client went away mid-export: release the server-side cursor now
+        await cursor.close()
+
+
+def _take(chunk: List[bytes], buffer: io.StringIO) -> bytes:
+    data = b"".join(chunk) + buffer.getvalue().encode()
+    chunk.clear()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
@@ -0,0 +1,244 @@
+# api/controllers/import_ctrl.py
+import codecs
+import csv
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from api.controllers.stats_ctrl import record_created
+from api.controllers.map_ctrl import invalidate_map_tiles
+from api.db.models.complaint import Complaint
+from api.input_schema.complaint_schema import ComplaintCreate
+
+IMPORT_BATCH_SIZE = 1000
+# the report keeps at most this many failed rows; the counts stay exact
+IMPORT_MAX_ERRORS = 1000
+IMPORT_FORMATS = ("ndjson", "csv")
+# longest NDJSON line or CSV row (quoted newlines included) held in memory; longer ones become row errors
+IMPORT_MAX_RECORD_CHARS = 64 * 1024
+
+# CSV columns that map onto nested ComplaintCreate fields
+_CSV_LOCATION_COLUMNS = {"lat": "lat", "lng": "lng", "location.lat": "lat", "location.lng": "lng"}
+
+
+async def _text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+    """
+    Split a byte stream into text lines without holding more than one chunk.
+    A line longer than IMPORT_MAX_RECORD_CHARS is yielded as None and its
+    text dropped, so a stream without newlines can't pile up in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending, skipping = "", False
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            if skipping:
+                skipping = False  # the tail of an oversize line
+                continue
+            yield line if len(line) <= IMPORT_MAX_RECORD_CHARS else None
+        if len(pending) > IMPORT_MAX_RECORD_CHARS:
+            if not skipping:
+                yield None
+                skipping = True
+            pending = ""
+    pending += decoder.decode(b"", final=True)
+    if pending and not skipping:
+        yield pending if len(pending) <= IMPORT_MAX_RECORD_CHARS else None
+
+
+def _quote_open_after(line: str, in_quotes: bool) -> bool:
+    """
+    Whether a quoted field is still open at the end of `line`, by the csv
+    module's default dialect: a quote starts a quoted field only at the
+    start of a field, and inside one a doubled quote is a literal quote.
+    """
+    i = 0
+    while True:
+        j = line.find('"', i)
+        if j < 0:
+            return in_quotes
+        if in_quotes:
+            if line.startswith('"', j + 1):
+                i = j + 2
+                continue
+            in_quotes = False
+        elif j == 0 or line[j - 1] == ",":
+            in_quotes = True
+        i = j + 1
+
+
+async def _csv_records(lines: AsyncIterator[Optional[str]]) -> AsyncIterator[Tuple[List[str], Optional[str]]]:
+    """
+    Group lines into CSV records (a quoted field may span lines) and yield
+    (lines, error). An oversize record is dropped with an error; its
+    remaining lines are only scanned for the end of the quoted field.
+    """
+    too_long = f"row exceeds {IMPORT_MAX_RECORD_CHARS} characters"
+    record: List[str] = []
+    size, in_quotes, dropping = 0, False, False
+    async for line in lines:
+        if line is None:
+            # the line's text is gone, so its quotes are unknown: resume at the next line
+            if not dropping:
+                yield [], too_long
+            record, size, in_quotes, dropping = [], 0, False, False
+            continue
+        in_quotes = _quote_open_after(line, in_quotes)
+        if dropping:
+            dropping = in_quotes
+            continue
+        if size + len(line) > IMPORT_MAX_RECORD_CHARS:
+            yield [], too_long
+            record, size, dropping = [], 0, in_quotes
+            continue
+        record.append(line)
+        size += len(line) + 1
+        if not in_quotes:
+            yield record, None
+            record, size = [], 0
+    if record:
+        yield [], "unterminated quoted field"
+
+
+def _csv_row_to_dict(header: List[str], values: List[str]) -> Dict:
+    if len(values) != len(header):
+        raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+    row, location = {}, {}
+    for column, value in zip(header, values):
+        value = value.strip()
+        if value == "":
+            continue  # empty cell -> field default
+        if column in _CSV_LOCATION_COLUMNS:
+            location[_CSV_LOCATION_COLUMNS[column]] = value
+        else:
+            row[column] = value
+    if location:
+        row["location"] = location
+    return row
+
+
+async def _rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Yield (row number, parsed row or None, parse error or None); blank lines are skipped."""
+    lines = _text_lines(chunks)
+    if fmt == "ndjson":
+        number = 0
+        async for line in lines:
+            if line is None:
+                number += 1
+                yield number, None, f"line exceeds {IMPORT_MAX_RECORD_CHARS} characters"
+                continue
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                row = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                yield number, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield number, None, "expected a JSON object"
+                continue
+            yield number, row, None
+        return
+
+    header = None
+    number = 0
+    async for record, error in _csv_records(lines):
+        if error is None and not any(line.strip() for line in record):
+            continue
+        if header is None and error:
+            # nothing can be read without the column names
+            yield 0, None, f"header: {error}"
+            return
+        values = next(csv.reader([line + "\n" for line in record])) if error is None else None
+        if header is None:
+            header = [c.strip() for c in values]
+            continue
+        number += 1
+        if error:
+            yield number, None, error
+            continue
+        try:
+            yield number, _csv_row_to_dict(header, values), None
+        except ValueError as e:
+            yield number, None, str(e)
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()]
+
+
+class ImportReport:
+    def __init__(self):
+        self.total = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict] = []
+
+    def fail(self, row: int, messages: List[str]):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "errors": messages})
+
+    def to_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["row"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def _flush(batch: List[Tuple[int, Complaint]], report: ImportReport):
+    if not batch:
+        return
+    failed = set()
+    try:
+        result = await Complaint.insert_many([c for _, c in batch], ordered=False)
+        report.inserted += len(result.inserted_ids)
+    except BulkWriteError as e:
+        # unordered: everything except the reported indexes was written
+        details = e.details or {}
+        write_errors = details.get("writeErrors", [])
+        report.inserted += details.get("nInserted", len(batch) - len(write_errors))
+        for err in write_errors:
+            failed.add(err["index"])
+            report.fail(batch[err["index"]][0], [err.get("errmsg", "write failed")])
+    created = [c for i, (_, c) in enumerate(batch) if i not in failed]
+    await record_created(created)
+    invalidate_map_tiles(*(c.geohash for c in created))
+    batch.clear()
+
+
+async def import_complaints(chunks: AsyncIterator[bytes], fmt: str = "ndjson", batch_size: int = IMPORT_BATCH_SIZE) -> Dict:
+    """
+    Create complaints from an NDJSON or CSV byte stream. Each row is validated
+    with ComplaintCreate (CSV: one column per field, `lat`/`lng` for the
+    location) and valid rows are written with unordered insert_many batches.
+    Memory is bounded by one batch plus the capped error list.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    report = ImportReport()
+    batch: List[Tuple[int, Complaint]] = []
+    async for number, row, error in _rows(chunks, fmt):
+        report.total += 1
+        if error:
+            report.fail(number, [error])
+            continue
+        try:
+            payload = ComplaintCreate.model_validate(row)
+        except ValidationError as e:
+            report.fail(number, _validation_messages(e))
+            continue
+        batch.append((number, Complaint(**payload.model_dump())))
+        if len(batch) >= batch_size:
+            await _flush(batch, report)
+    await _flush(batch, report)
+    return report.to_dict()
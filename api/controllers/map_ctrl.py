@@ -0,0 +1,131 @@
+# api/controllers/map_ctrl.py
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from api.core import geohash
+from api.core.cache import TTLCache
+from api.db.models.complaint import Complaint
+
+# finest cluster cells served (~38 m x 19 m); zoomed in further, pins come from the list endpoints
+MAP_MAX_PRECISION = 8
+# tiles are this many geohash characters coarser than the cells they hold
+TILE_LEVELS = 2
+# upper bound on cells per response, whatever the bbox and complaint volume
+MAP_MAX_CELLS = int(os.getenv("MAP_MAX_CELLS", "1024"))
+
+# tile geohash -> {(precision, category, division): [cell, ...]}. Transitions
+# handled by this process drop the tiles they touch; other workers' writes
+# show up once the TTL runs out.
+tile_cache = TTLCache(
+    maxsize=int(os.getenv("MAP_TILE_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("MAP_TILE_TTL_SECONDS", "60")),
+)
+_generation = 0
+
+
+def invalidate_map_tiles(*hashes: Optional[str]):
+    """Drop cached tiles containing any of these complaint geohashes (None is ignored)."""
+    global _generation
+    _generation += 1
+    for value in hashes:
+        for n in range(1, MAP_MAX_PRECISION - TILE_LEVELS + 1):
+            if value:
+                tile_cache.pop(value[:n])
+
+
+def zoom_precision(zoom: int, south: float, west: float, north: float, east: float) -> int:
+    """Cluster precision for a web-map zoom level: about 16 cells across the viewport, capped by MAP_MAX_CELLS."""
+    precision = max(1, min(MAP_MAX_PRECISION, round(2 * (zoom + 2) / 5)))
+    while precision > 1 and geohash.cover_count(south, west, north, east, precision) > MAP_MAX_CELLS:
+        precision -= 1
+    return precision
+
+
+def _cell(value: str) -> Dict:
+    lat, lng = geohash.center(value)
+    return {"geohash": value, "lat": lat, "lng": lng, "count": 0, "by_status": {}}
+
+
+async def _load_tiles(tiles: List[str], precision: int, category: Optional[str], division: Optional[str]) -> Dict[str, List[Dict]]:
+    """Cluster cells for each tile, from one $group over geohash prefix ranges."""
+    query: Dict = {"geohash": {"$in": [re.compile(f"^{tile}") for tile in tiles]}}
+    if category:
+        query["complaint_category"] = category
+    if division:
+        query["division"] = division
+    rows = await Complaint.aggregate([
+        {"$match": query},
+        {"$group": {
+            "_id": {"cell": {"$substrBytes": ["$geohash", 0, precision]}, "status": "$status"},
+            "count": {"$sum": 1},
+        }},
+    ]).to_list()
+
+    cells: Dict[str, Dict] = {}
+    for row in rows:
+        value = row["_id"]["cell"]
+        cell = cells.get(value)
+        if cell is None:
+            cell = cells[value] = _cell(value)
+        cell["by_status"][row["_id"]["status"]] = row["count"]
+        cell["count"] += row["count"]
+
+    by_tile: Dict[str, List[Dict]] = {tile: [] for tile in tiles}
+    tile_precision = len(tiles[0])
+    for value, cell in cells.items():
+        by_tile[value[:tile_precision]].append(cell)
+    return by_tile
+
+
+def _intersects(value: str, box: Tuple[float, float, float, float]) -> bool:
+    south, west, north, east = geohash.bounds(value)
+    return south <= box[2] and north >= box[0] and west <= box[3] and east >= box[1]
+
+
+async def get_map_clusters_controller(
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    zoom: int,
+    category: Optional[str] = None,
+    division: Optional[str] = None,
+) -> Dict:
+    """
+    Complaint counts by status per geohash cell inside the box. Cells are
+    served from cached tiles; only tiles missing from the cache are
+    aggregated, all in one query.
+    """
+    if south > north or west > east:
+        raise HTTPException(status_code=400, detail="Bounding box must have south <= north and west <= east")
+    precision = zoom_precision(zoom, south, west, north, east)
+    tile_precision = max(1, precision - TILE_LEVELS)
+    variant = (precision, category, division)
+
+    tiles = geohash.cover(south, west, north, east, tile_precision)
+    found: Dict[str, List[Dict]] = {}
+    missing = []
+    for tile in tiles:
+        entry = tile_cache.get(tile)
+        if entry is not None and variant in entry:
+            found[tile] = entry[variant]
+        else:
+            missing.append(tile)
+
+    if missing:
+        generation = _generation
+        loaded = await _load_tiles(missing, precision, category, division)
+        found.update(loaded)
+        # a transition landed while aggregating: serve the result, but do not cache it
+        if generation == _generation:
+            for tile, cells in loaded.items():
+                entry = tile_cache.get(tile) or {}
+                entry[variant] = cells
+                tile_cache.set(tile, entry)
+
+    box = (south, west, north, east)
+    cells = [cell for tile in tiles for cell in found[tile] if _intersects(cell["geohash"], box)]
+    return {"precision": precision, "total": sum(c["count"] for c in cells), "cells": cells}
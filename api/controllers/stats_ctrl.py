@@ -0,0 +1,164 @@
+# api/controllers/stats_ctrl.py
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from api.db.models.complaint import Complaint, ComplaintStatus, SLA_BREACH_REASON
+from api.db.models.complaint_stat import ComplaintStat
+
+
+def _status(value) -> Optional[str]:
+    return getattr(value, "value", value)
+
+
+def stat_bucket(created_at: datetime, division: Optional[str], category: str) -> Dict:
+    return {"day": created_at.strftime("%Y-%m-%d"), "division": division, "category": category}
+
+
+def _bucket(complaint: Complaint) -> Dict:
+    return stat_bucket(complaint.created_at, complaint.division, complaint.complaint_category)
+
+
+def _close_seconds(complaint: Complaint) -> float:
+    # closed at the manager's verification of the current assignment
+    idx = complaint.current_assignment_index
+    assignments = complaint.assignments or []
+    current = assignments[idx] if idx is not None and 0 <= idx < len(assignments) else None
+    closed_at = (current.verified_at if current else None) or complaint.updated_at
+    return (closed_at - complaint.created_at).total_seconds()
+
+
+def _breaches(complaint: Complaint) -> int:
+    return sum(1 for a in complaint.assignments or [] if a.escalate_reason == SLA_BREACH_REASON)
+
+
+def _add(inc: Dict, complaint: Complaint, sign: int):
+    """Add (sign=1) or remove (sign=-1) one complaint's contribution to its bucket."""
+    key = f"statuses.{_status(complaint.status)}"
+    inc[key] = inc.get(key, 0) + sign
+    if complaint.status == ComplaintStatus.CLOSED:
+        inc["closed"] = inc.get("closed", 0) + sign
+        inc["close_seconds"] = inc.get("close_seconds", 0) + sign * _close_seconds(complaint)
+    breaches = _breaches(complaint)
+    if breaches:
+        inc["sla_breaches"] = inc.get("sla_breaches", 0) + sign * breaches
+
+
+async def _apply(ops: List[UpdateOne]):
+    if ops:
+        await ComplaintStat.get_pymongo_collection().bulk_write(ops, ordered=False)
+
+
+async def record_created(complaints: Iterable[Complaint]):
+    # one $inc per bucket, however many complaints land in it
+    incs: Dict[Tuple, Dict] = defaultdict(dict)
+    for complaint in complaints:
+        bucket = _bucket(complaint)
+        _add(incs[tuple(bucket.values())], complaint, 1)
+    await _apply([
+        UpdateOne(dict(zip(("day", "division", "category"), key)), {"$inc": inc}, upsert=True)
+        for key, inc in incs.items()
+    ])
+
+
+async def record_deleted(complaint: Complaint):
+    inc: Dict = {}
+    _add(inc, complaint, -1)
+    await _apply([UpdateOne(_bucket(complaint), {"$inc": inc}, upsert=True)])
+
+
+async def record_transitions(pairs: Iterable[Tuple[Complaint, Complaint]]):
+    """Move each complaint's contribution from its before-state to its after-state."""
+    ops = []
+    for before, after in pairs:
+        old_bucket, new_bucket = _bucket(before), _bucket(after)
+        if old_bucket == new_bucket:
+            inc: Dict = {}
+            _add(inc, before, -1)
+            _add(inc, after, 1)
+            incs = [(new_bucket, {k: v for k, v in inc.items() if v})]
+        else:
+            # e.g. the category was edited: move the complaint between buckets
+            removed, added = {}, {}
+            _add(removed, before, -1)
+            _add(added, after, 1)
+            incs = [(old_bucket, removed), (new_bucket, added)]
+        ops.extend(UpdateOne(bucket, {"$inc": inc}, upsert=True) for bucket, inc in incs if inc)
+    await _apply(ops)
+
+
+async def record_transition(before: Complaint, after: Complaint):
+    await record_transitions([(before, after)])
+
+
+async def record_sla_breaches(rows: Iterable[Dict]):
+    """
+    SLA escalations done with raw updates; rows carry status (before),
+    created_at, division and complaint_category.
+    """
+    escalated = ComplaintStatus.ESCALATED.value
+    ops = []
+    for row in rows:
+        inc = {"sla_breaches": 1}
+        if row["status"] != escalated:
+            inc[f"statuses.{row['status']}"] = -1
+            inc[f"statuses.{escalated}"] = 1
+        bucket = stat_bucket(row["created_at"], row.get("division"), row["complaint_category"])
+        ops.append(UpdateOne(bucket, {"$inc": inc}, upsert=True))
+    await _apply(ops)
+
+
+async def get_stats_controller(
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    division: Optional[str] = None,
+    category: Optional[str] = None,
+) -> Dict:
+    """
+    Dashboard counts read from the rollup only, so the cost follows the
+    number of (day, division, category) buckets, not complaints.
+    day_from/day_to are inclusive creation days.
+    """
+    query: Dict = {}
+    if day_from or day_to:
+        query["day"] = {}
+        if day_from:
+            query["day"]["$gte"] = day_from.isoformat()
+        if day_to:
+            query["day"]["$lte"] = day_to.isoformat()
+    if division:
+        query["division"] = division
+    if category:
+        query["category"] = category
+
+    by_status: Dict[str, int] = defaultdict(int)
+    by_category: Dict[str, int] = defaultdict(int)
+    by_division: Dict[str, int] = defaultdict(int)
+    by_day: Dict[str, int] = defaultdict(int)
+    sla_breaches = closed = 0
+    close_seconds = 0.0
+
+    async for row in ComplaintStat.get_pymongo_collection().find(query, {"_id": 0}):
+        total = 0
+        for status, count in (row.get("statuses") or {}).items():
+            by_status[status] += count
+            total += count
+        by_category[row["category"]] += total
+        by_division[row.get("division") or "unassigned"] += total
+        by_day[row["day"]] += total
+        sla_breaches += row.get("sla_breaches", 0)
+        closed += row.get("closed", 0)
+        close_seconds += row.get("close_seconds", 0.0)
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": {k: v for k, v in by_status.items() if v},
+        "by_category": dict(by_category),
+        "by_division": dict(by_division),
+        "by_day": [{"day": d, "count": by_day[d]} for d in sorted(by_day)],
+        "sla_breaches": sla_breaches,
+        "closed": closed,
+        "mean_time_to_close_seconds": close_seconds / closed if closed else None,
+    }
@@ -2,9 +2,9 @@ from typing import List, Optional
 from fastapi import HTTPException, status
 from api.db.models.user import User
 from api.input_schema.user_schema import OfficialRegisterSchema
-from api.core.auth import hash_password
-from api.core.permissions import has_permission
-from api.db.models.role_permission import RolePermission
+from api.core.passwords import hash_password_async
+from api.core.permissions import permission_cache
+from api.core.deps import invalidate_principal
 
 
 # ----------------- HELPERS -----------------
@@ -54,7 +54,8 @@ async def create_user_by_gm(data: OfficialRegisterSchema, gm_user: User) -> User
 
     try:
         # 1) Check if GM has base permission to create users
-        if not await has_permission(gm_user, "user", "create"):
+        gm_rp = await permission_cache.get(gm_user.role)
+        if not gm_rp or not gm_rp.allows("user", "create"):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You are not allowed to create users"
@@ -64,11 +65,7 @@ async def create_user_by_gm(data: OfficialRegisterSchema, gm_user: User) -> User
         target_role = data.role.upper().strip()
         
 
-        gm_rp = await RolePermission.find_one(RolePermission.role == str(gm_user.role).upper())
-        if not gm_rp:
-            raise HTTPException(status_code=403, detail="GM role not configured")
-
-        if "*" not in [r.upper() for r in gm_rp.assignable_roles] and target_role not in [r.upper() for r in gm_rp.assignable_roles]:
+        if not gm_rp.can_assign(target_role):
             raise HTTPException(
                 status_code=403,
                 detail=f"You cannot assign role: {target_role}"
@@ -87,7 +84,7 @@ async def create_user_by_gm(data: OfficialRegisterSchema, gm_user: User) -> User
         new_user = User(
             name=data.name.strip(),
             email=email,
-            hashed_password=hash_password(data.password),
+            hashed_password=await hash_password_async(data.password),
             role=target_role,
             division=data.division or gm_user.division,  # default to GM's division
             status="active"
@@ -119,6 +116,7 @@ async def update_user(user_id: str, patch: dict) -> User:
                 setattr(user, key, patch[key])
         
         await user.save()
+        await invalidate_principal(user_id)
         return user
 
     except HTTPException:
@@ -132,6 +130,7 @@ async def delete_user(user_id: str) -> bool:
     try:
         user = await get_user_or_404(user_id)
         await user.delete()
+        await invalidate_principal(user_id)
         return True
 
     except HTTPException:
@@ -4,13 +4,19 @@ from fastapi import HTTPException
 from typing import List, Dict
 from datetime import datetime
 
-def worker_to_dict(worker: Worker, active_tasks: int = 0) -> dict:
+def worker_has_capacity(worker: Worker) -> bool:
+    if not worker.available:
+        return False
+    return worker.max_tasks is None or worker.active_tasks < worker.max_tasks
+
+
+def worker_to_dict(worker: Worker) -> dict:
     return {
         "id": str(worker.id),
         "full_name": worker.full_name,
         "role": worker.role,
-        "available": True,  # always true, no max limit
-        "active_tasks": active_tasks,
+        "available": worker_has_capacity(worker),
+        "active_tasks": worker.active_tasks,
         "last_assigned_at": worker.last_assigned_at.isoformat() if worker.last_assigned_at else None,
         "created_at": worker.created_at.isoformat() if worker.created_at else None,
     }
@@ -0,0 +1,263 @@
+# api/core/dedup.py
+import math
+import os
+import random
+import re
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from api.db.models.complaint import Complaint, TERMINAL_STATUSES
+
+DEDUP_MAX_DOCS = int(os.getenv("DEDUP_MAX_DOCS", "50000"))
+# estimated Jaccard similarity of the shingle sets above which a report is a duplicate
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.6"))
+# only reports this close to each other can be duplicates (when both have a location)
+DEDUP_RADIUS_M = float(os.getenv("DEDUP_RADIUS_M", "300"))
+# LSH buckets are per grid cell of this many degrees (~550 m); a lookup covers the cells within the radius
+CELL_DEG = 0.005
+
+SHINGLE_SIZE = 4
+# long descriptions add cost, not signal
+DESCRIPTION_PREFIX_CHARS = 500
+BANDS, ROWS = 8, 4  # 32 slots; candidates start sharing a band around 0.6 similarity
+SLOTS = BANDS * ROWS
+_MASK = (1 << 61) - 1
+_EMPTY = _MASK + 1
+# per-process: signatures never leave the process, so a random salt is fine
+_SALT = random.getrandbits(61)
+EARTH_RADIUS_M = 6371000
+_RADIUS_DEG = math.degrees(DEDUP_RADIUS_M / EARTH_RADIUS_M)
+
+_FIELDS = {"complaint_category", "complaint_subject", "detailed_description", "complete_address", "location"}
+_WORD_RE = re.compile(r"[0-9a-zऀ-ॿ]+")
+
+
+def shingles(*texts: Optional[str]) -> Set[str]:
+    """
+    Character 4-grams of the distinct words, padded so word starts and ends
+    count: robust to typos and word order, and repeated words cost nothing.
+    """
+    words = set(_WORD_RE.findall(" ".join(t or "" for t in texts).lower()))
+    return {padded[i:i + SHINGLE_SIZE] for padded in (f" {w} " for w in words) for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+
+def signature(items: Set[str]) -> Tuple[int, ...]:
+    """
+    One-permutation MinHash: each shingle is hashed once and kept if it is
+    the smallest in its slot, so the cost is one hash per shingle instead of
+    one per shingle and slot. Empty slots borrow from the next filled one.
+    """
+    mins = [_EMPTY] * SLOTS
+    for item in items:
+        h = (hash(item) ^ _SALT) & _MASK
+        slot = h % SLOTS
+        if h < mins[slot]:
+            mins[slot] = h
+    if all(m == _EMPTY for m in mins):
+        return tuple(mins)
+    for i in range(SLOTS):
+        j = i
+        while mins[j % SLOTS] == _EMPTY:
+            j += 1
+        if j != i:
+            mins[i] = mins[j % SLOTS] + (j - i)
+    return tuple(mins)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / SLOTS
+
+
+def distance_m(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Haversine distance between (lat, lng) points."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def _point(location) -> Optional[Tuple[float, float]]:
+    """(lat, lng) of a GeoPoint or stored GeoJSON dict."""
+    if location is None:
+        return None
+    coordinates = location["coordinates"] if isinstance(location, Mapping) else location.coordinates
+    return coordinates[1], coordinates[0]
+
+
+def _cell(point: Tuple[float, float]) -> Tuple[int, int]:
+    return math.floor(point[0] / CELL_DEG), math.floor(point[1] / CELL_DEG)
+
+
+def _cells_around(point: Optional[Tuple[float, float]]) -> List[Optional[Tuple[int, int]]]:
+    """The grid cell of point and every neighbour within DEDUP_RADIUS_M of it."""
+    if point is None:
+        return [None]
+    y, x = _cell(point)
+    ny = math.ceil(_RADIUS_DEG / CELL_DEG)
+    nx = math.ceil(_RADIUS_DEG / (CELL_DEG * max(math.cos(math.radians(point[0])), 0.01)))
+    return [(y + dy, x + dx) for dy in range(-ny, ny + 1) for dx in range(-nx, nx + 1)]
+
+
+def _report_signature(subject: Optional[str], description: Optional[str], address: Optional[str]) -> Tuple[int, ...]:
+    return signature(shingles(subject, (description or "")[:DESCRIPTION_PREFIX_CHARS], address))
+
+
+class _Entry:
+    __slots__ = ("point", "cell", "signature", "keys")
+
+    def __init__(self, point, cell, signature: Tuple[int, ...], keys: List[Tuple]):
+        self.point = point
+        self.cell = cell
+        self.signature = signature
+        self.keys = keys
+
+
+class DuplicateIndex:
+    """
+    MinHash signatures of open complaints in LSH buckets keyed by
+    (category, band) and then grid cell, so a new report is compared only
+    with the few nearby complaints of its category that share a band with it.
+    Reports without a location are only compared with each other. Only
+    parent complaints are indexed (duplicates point at them); holds at most
+    `max_docs`, dropping the least recently added. Like the search index,
+    each worker process keeps its own copy, filled on startup, updated by
+    this process's writes and reloaded periodically.
+    """
+
+    def __init__(self, max_docs: int = DEDUP_MAX_DOCS):
+        self.max_docs = max_docs
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # (category, band, band values) -> grid cell -> complaint ids
+        self._buckets: Dict[Tuple, Dict[Optional[Tuple[int, int]], Set[str]]] = {}
+        # while a reload builds its replacement, this process's writes are noted here and replayed on it
+        self._journal: Optional[List[Tuple[str, Optional[Mapping]]]] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _keys(category: str, sig: Tuple[int, ...]) -> List[Tuple]:
+        return [(category, band, sig[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+    def find(
+        self,
+        category: str,
+        location,
+        subject: Optional[str],
+        description: Optional[str],
+        address: Optional[str],
+    ) -> Optional[Tuple[str, float]]:
+        """Best matching open complaint as (id, similarity), or None."""
+        sig = _report_signature(subject, description, address)
+        point = _point(location)
+        around = None
+        candidates: Set[str] = set()
+        for key in self._keys(category, sig):
+            cells = self._buckets.get(key)
+            if not cells:
+                continue  # the usual case: no complaint shares this band
+            around = around or _cells_around(point)
+            for cell in around:
+                ids = cells.get(cell)
+                if ids:
+                    candidates.update(ids)
+        best = None
+        for doc_id in candidates:
+            entry = self._entries[doc_id]
+            if point and distance_m(point, entry.point) > DEDUP_RADIUS_M:
+                continue
+            score = similarity(sig, entry.signature)
+            if score >= DEDUP_THRESHOLD and (best is None or score > best[1]):
+                best = (doc_id, score)
+        return best
+
+    def find_for(self, complaint: Complaint) -> Optional[Tuple[str, float]]:
+        return self.find(
+            complaint.complaint_category,
+            complaint.location,
+            complaint.complaint_subject,
+            complaint.detailed_description,
+            complaint.complete_address,
+        )
+
+    def update(self, complaint: Complaint):
+        """Index a created or changed complaint; closed ones and duplicates drop out."""
+        if complaint.status in TERMINAL_STATUSES or complaint.duplicate_of:
+            self.remove(str(complaint.id))
+        else:
+            self.add(str(complaint.id), complaint.model_dump(include=_FIELDS))
+
+    def add(self, doc_id: str, fields: Mapping):
+        if self._journal is not None:
+            self._journal.append((doc_id, fields))
+        self._remove(doc_id)
+        sig = _report_signature(
+            fields.get("complaint_subject"), fields.get("detailed_description"), fields.get("complete_address")
+        )
+        point = _point(fields.get("location"))
+        cell = _cell(point) if point else None
+        keys = self._keys(fields["complaint_category"], sig)
+        self._entries[doc_id] = _Entry(point, cell, sig, keys)
+        for key in keys:
+            self._buckets.setdefault(key, {}).setdefault(cell, set()).add(doc_id)
+        while len(self._entries) > self.max_docs:
+            self._remove(next(iter(self._entries)))
+
+    def remove(self, doc_id: str):
+        if self._journal is not None:
+            self._journal.append((doc_id, None))
+        self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        entry = self._entries.pop(doc_id, None)
+        for key in entry.keys if entry else ():
+            cells = self._buckets.get(key)
+            ids = cells.get(entry.cell) if cells else None
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del cells[entry.cell]
+                    if not cells:
+                        del self._buckets[key]
+
+
+duplicate_index = DuplicateIndex()
+
+
+def _build_index(rows: List[Mapping], max_docs: int) -> DuplicateIndex:
+    fresh = DuplicateIndex(max_docs)
+    # oldest first, so eviction order matches recency
+    for row in reversed(rows):
+        fresh.add(str(row["_id"]), row)
+    return fresh
+
+
+async def load_duplicate_index(limit: Optional[int] = None) -> int:
+    """
+    (Re)fill the index with the most recent open parent complaints; returns
+    how many. Signatures are computed in the thread pool and the fresh index
+    is swapped in at the end, with writes made meanwhile replayed onto it.
+    """
+    if duplicate_index._journal is not None:
+        return len(duplicate_index)  # a reload is already running
+    limit = limit or duplicate_index.max_docs
+    duplicate_index._journal = []
+    try:
+        rows = await Complaint.get_pymongo_collection().find(
+            {
+                "status": {"$nin": [s.value for s in TERMINAL_STATUSES]},
+                "duplicate_of": None,
+            },
+            {f: 1 for f in _FIELDS},
+        ).sort([("created_at", -1), ("_id", -1)]).limit(limit).to_list()
+        fresh = await run_in_threadpool(_build_index, rows, duplicate_index.max_docs)
+        for doc_id, fields in duplicate_index._journal:
+            if fields is None:
+                fresh.remove(doc_id)
+            else:
+                fresh.add(doc_id, fields)
+        duplicate_index._entries, duplicate_index._buckets = fresh._entries, fresh._buckets
+    finally:
+        duplicate_index._journal = None
+    return len(duplicate_index)
@@ -1,14 +1,71 @@
 # api/core/deps.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from typing import List
+from typing import List, Optional
 from jose import JWTError
+import os
+import time
 from api.core.auth import decode_access_token
+from api.core.cache import TTLCache
+from api.db.models.cache_version import CacheVersion
 from api.db.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+PRINCIPAL_CACHE_KEY = "principals"
+# how often a process asks Mongo whether any user changed (one tiny read per interval)
+PRINCIPAL_CACHE_CHECK_SECONDS = float(os.getenv("PRINCIPAL_CACHE_CHECK_SECONDS", "5"))
+
+# Authenticated users by token subject. update_user/delete_user bump the shared
+# CacheVersion stamp and every worker empties its cache when it sees the stamp
+# move, so role/status changes apply everywhere within PRINCIPAL_CACHE_CHECK_SECONDS.
+principal_cache = TTLCache(
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30")),
+)
+_principal_version: Optional[int] = None
+_principal_checked_at = 0.0
+
+
+async def invalidate_principal(user_id: str):
+    """Call after changing or deleting a user."""
+    await CacheVersion.bump(PRINCIPAL_CACHE_KEY)
+    principal_cache.pop(str(user_id))
+
+
+async def _sync_principal_cache():
+    global _principal_version, _principal_checked_at
+    if (
+        _principal_version is not None
+        and time.monotonic() - _principal_checked_at < PRINCIPAL_CACHE_CHECK_SECONDS
+    ):
+        return
+    # read the stamp before any user: a concurrent edit then shows up as a newer stamp next time
+    version = await CacheVersion.current(PRINCIPAL_CACHE_KEY)
+    if version != _principal_version:
+        principal_cache.clear()
+        _principal_version = version
+    _principal_checked_at = time.monotonic()
+
+
+async def _load_principal(user_id: str) -> User:
+    await _sync_principal_cache()
+    user = principal_cache.get(user_id)
+    if user is None:
+        user = await User.get(user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        principal_cache.set(user_id, user)
+    # hand out a copy so a route mutating its user cannot change the cached one
+    return user.model_copy()
+
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)) -> User:
+    # per-request memo: role checks and the route share one resolution
+    memo = getattr(request.state, "principal", None)
+    if memo is not None and memo[0] == token:
+        return memo[1]
+
     try:
         payload = decode_access_token(token)
         user_id: str = payload.get("sub")
@@ -17,11 +74,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = await User.get(user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user = await _load_principal(user_id)
     if user.status != "active":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User inactive")
+    request.state.principal = (token, user)
     return user
 
 
@@ -34,4 +90,3 @@ def roles_required(allowed_roles: List[str]):
             )
         return user
     return role_checker
-
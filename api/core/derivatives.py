@@ -0,0 +1,103 @@
+# api/core/derivatives.py
+import asyncio
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from api.core.uploads import (
+    DERIVATIVE_SIZES,
+    IMAGE_CONTENT_TYPES,
+    blob_path,
+    derivative_path,
+)
+from api.db.models.complaint import ProofFile
+
+DERIVATIVE_WORKERS = int(os.getenv("DERIVATIVE_WORKERS", str(min(2, os.cpu_count() or 1))))
+DERIVATIVE_JPEG_QUALITY = 82
+
+_pool: Optional[ProcessPoolExecutor] = None
+# one render per blob at a time; later callers await the running one
+_inflight: Dict[str, asyncio.Future] = {}
+_background: set = set()
+
+
+def _render(source: str, sha256: str, variants: List[str]) -> List[str]:
+    """Runs in a worker process: write the requested variants of one image."""
+    from PIL import Image, ImageOps
+
+    done = []
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        for variant in variants:
+            edge = DERIVATIVE_SIZES[variant]
+            copy = image.copy()
+            copy.thumbnail((edge, edge))
+            target = derivative_path(sha256, variant)
+            tmp = f"{target}.{uuid.uuid4().hex}.part"
+            copy.save(tmp, "JPEG", quality=DERIVATIVE_JPEG_QUALITY, optimize=True)
+            os.replace(tmp, target)
+            done.append(variant)
+    return done
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=DERIVATIVE_WORKERS)
+    return _pool
+
+
+def _missing_variants(sha256: str, variants: Iterable[str]) -> List[str]:
+    return [v for v in variants if not os.path.exists(derivative_path(sha256, v))]
+
+
+async def ensure_derivatives(sha256: str, variants: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Render whichever variants of a stored image are missing, in the process
+    pool. Returns the variants rendered by this call (empty if all existed).
+    """
+    variants = list(variants or DERIVATIVE_SIZES)
+    running = _inflight.get(sha256)
+    if running is not None:
+        await asyncio.shield(running)
+
+    # a couple of stat calls; kept inline so no other caller slips in before _inflight is set
+    missing = _missing_variants(sha256, variants)
+    if not missing:
+        return []
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_get_pool(), _render, blob_path(sha256), sha256, missing)
+    _inflight[sha256] = future
+    try:
+        return await asyncio.shield(future)
+    finally:
+        if _inflight.get(sha256) is future:
+            del _inflight[sha256]
+
+
+async def _render_quietly(sha256: str):
+    try:
+        await ensure_derivatives(sha256)
+    except Exception as e:
+        # a broken image keeps its original; the delivery route falls back to it
+        print(f"⚠️ Could not render derivatives for {sha256}: {e}")
+
+
+def schedule_derivatives(proof_files: Iterable[ProofFile]):
+    """Queue background renders for freshly stored image uploads."""
+    for proof in proof_files:
+        if proof.sha256 and proof.file_type in IMAGE_CONTENT_TYPES:
+            task = asyncio.create_task(_render_quietly(proof.sha256))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+
+
+def shutdown_derivative_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
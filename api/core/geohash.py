@@ -0,0 +1,83 @@
+# api/core/geohash.py
+from typing import List, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+# stored on each complaint (~5 m cells); map tiles and clusters use prefixes of it
+GEOHASH_PRECISION = 9
+
+
+def encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi, lng_lo, lng_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            bit = lng >= mid
+            lng_lo, lng_hi = (mid, lng_hi) if bit else (lng_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            bit = lat >= mid
+            lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+        value = (value << 1) | bit
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of a geohash cell."""
+    lat_lo, lat_hi, lng_lo, lng_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                lng_lo, lng_hi = (mid, lng_hi) if bit else (lng_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lng_lo, lat_hi, lng_hi
+
+
+def center(geohash: str) -> Tuple[float, float]:
+    south, west, north, east = bounds(geohash)
+    return (south + north) / 2, (west + east) / 2
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(lat degrees, lng degrees) spanned by one cell at this precision."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def cover_count(south: float, west: float, north: float, east: float, precision: int) -> int:
+    """Upper bound on the number of cells `cover` returns for the box."""
+    lat_step, lng_step = cell_size(precision)
+    return (int((north - south) / lat_step) + 2) * (int((east - west) / lng_step) + 2)
+
+
+def cover(south: float, west: float, north: float, east: float, precision: int) -> List[str]:
+    """Geohash cells at `precision` that together cover the box."""
+    lat_step, lng_step = cell_size(precision)
+    cells = []
+    lat = south
+    while True:
+        lng = west
+        while True:
+            cells.append(encode(min(lat, 90.0), min(lng, 180.0), precision))
+            if lng >= east:
+                break
+            lng = min(lng + lng_step, east)
+        if lat >= north:
+            break
+        lat = min(lat + lat_step, north)
+    return list(dict.fromkeys(cells))
@@ -0,0 +1,251 @@
+# api/core/otp_store.py
+import asyncio
+import heapq
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from api.db.models.otp import OtpCode
+
+load_dotenv()
+
+OTP_EXPIRY_SECONDS = int(os.getenv("OTP_EXPIRY_SECONDS", "300"))
+# send throttling per phone: a minimum gap between sends and a cap per window
+OTP_RESEND_COOLDOWN_SECONDS = int(os.getenv("OTP_RESEND_COOLDOWN_SECONDS", "30"))
+OTP_MAX_SENDS_PER_WINDOW = int(os.getenv("OTP_MAX_SENDS_PER_WINDOW", "5"))
+OTP_SEND_WINDOW_SECONDS = int(os.getenv("OTP_SEND_WINDOW_SECONDS", "900"))
+# memory backend only
+OTP_MEMORY_MAX_ENTRIES = int(os.getenv("OTP_MEMORY_MAX_ENTRIES", "100000"))
+OTP_SWEEP_SECONDS = float(os.getenv("OTP_SWEEP_SECONDS", "30"))
+
+# consume() outcomes
+OTP_OK = "ok"
+OTP_MISSING = "missing"
+OTP_EXPIRED = "expired"
+OTP_INVALID = "invalid"
+
+
+class OtpThrottled(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Too many OTP requests, try again in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+@dataclass
+class OtpEntry:
+    otp: Optional[str]
+    expires_at: Optional[datetime]
+    sent_at: datetime
+    window_started: datetime
+    sends: int
+
+    @property
+    def purge_at(self) -> datetime:
+        # keep the record while either the OTP or the throttle window is live
+        window_end = self.window_started + timedelta(seconds=OTP_SEND_WINDOW_SECONDS)
+        return max(self.expires_at or window_end, window_end)
+
+
+def _next_entry(previous: Optional[OtpEntry], otp: str, now: datetime) -> OtpEntry:
+    """Throttle decision shared by both backends; raises OtpThrottled."""
+    expires_at = now + timedelta(seconds=OTP_EXPIRY_SECONDS)
+    if previous is None or previous.purge_at <= now:
+        return OtpEntry(otp, expires_at, now, now, 1)
+
+    cooldown_ends = previous.sent_at + timedelta(seconds=OTP_RESEND_COOLDOWN_SECONDS)
+    if now < cooldown_ends:
+        raise OtpThrottled(int((cooldown_ends - now).total_seconds()) + 1)
+
+    window_end = previous.window_started + timedelta(seconds=OTP_SEND_WINDOW_SECONDS)
+    if now >= window_end:
+        return OtpEntry(otp, expires_at, now, now, 1)
+    if previous.sends >= OTP_MAX_SENDS_PER_WINDOW:
+        raise OtpThrottled(int((window_end - now).total_seconds()) + 1)
+    return OtpEntry(otp, expires_at, now, previous.window_started, previous.sends + 1)
+
+
+def _classify(entry: Optional[OtpEntry], otp: str, now: datetime) -> str:
+    if entry is None or entry.otp is None:
+        return OTP_MISSING
+    if entry.expires_at < now:
+        return OTP_EXPIRED
+    if entry.otp != otp:
+        return OTP_INVALID
+    return OTP_OK
+
+
+class OtpStore(ABC):
+    """
+    Where citizen OTPs live between send-otp and verify-otp.
+    issue() stores a new code or raises OtpThrottled; consume() checks a code
+    and makes it unusable on success.
+    """
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def issue(self, phone: str, otp: str) -> None:
+        ...
+
+    @abstractmethod
+    async def consume(self, phone: str, otp: str) -> str:
+        ...
+
+
+class MemoryOtpStore(OtpStore):
+    """
+    Single-process store for development and one-worker deployments.
+    Expiry is tracked in a heap (stale heap items are skipped when popped);
+    a background task sweeps expired records and the store never holds more
+    than `max_entries` phones, evicting the soonest-to-expire first.
+    """
+
+    def __init__(self, max_entries: int = OTP_MEMORY_MAX_ENTRIES, sweep_seconds: float = OTP_SWEEP_SECONDS):
+        self.max_entries = max_entries
+        self.sweep_seconds = sweep_seconds
+        self._entries: Dict[str, OtpEntry] = {}
+        self._heap: List[Tuple[datetime, str]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_seconds)
+            self.sweep()
+
+    def _is_current(self, purge_at: datetime, phone: str) -> bool:
+        entry = self._entries.get(phone)
+        return entry is not None and entry.purge_at == purge_at
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """Drop records whose OTP and throttle window have both lapsed."""
+        now = now or datetime.utcnow()
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            purge_at, phone = heapq.heappop(self._heap)
+            if self._is_current(purge_at, phone):
+                del self._entries[phone]
+                removed += 1
+        # superseded heap items only go away when popped; rebuild if they pile up
+        if len(self._heap) > 2 * len(self._entries) + 1024:
+            self._heap = [(e.purge_at, p) for p, e in self._entries.items()]
+            heapq.heapify(self._heap)
+        return removed
+
+    def _evict_to_fit(self):
+        while len(self._entries) >= self.max_entries and self._heap:
+            purge_at, phone = heapq.heappop(self._heap)
+            if self._is_current(purge_at, phone):
+                del self._entries[phone]
+
+    async def issue(self, phone: str, otp: str) -> None:
+        now = datetime.utcnow()
+        entry = _next_entry(self._entries.get(phone), otp, now)
+        if phone not in self._entries:
+            self.sweep(now)
+            self._evict_to_fit()
+        self._entries[phone] = entry
+        heapq.heappush(self._heap, (entry.purge_at, phone))
+
+    async def consume(self, phone: str, otp: str) -> str:
+        entry = self._entries.get(phone)
+        result = _classify(entry, otp, datetime.utcnow())
+        if result in (OTP_OK, OTP_EXPIRED):
+            # one-time use; the throttle state stays until its window ends
+            purge_at = entry.purge_at
+            entry.otp = None
+            entry.expires_at = None
+            if entry.purge_at != purge_at:
+                heapq.heappush(self._heap, (entry.purge_at, phone))
+        return result
+
+
+class MongoOtpStore(OtpStore):
+    """Shared by all uvicorn workers; expired documents are removed by a TTL index."""
+
+    @staticmethod
+    def _entry(doc: Optional[dict]) -> Optional[OtpEntry]:
+        if not doc:
+            return None
+        return OtpEntry(doc.get("otp"), doc.get("expires_at"), doc["sent_at"], doc["window_started"], doc["sends"])
+
+    async def issue(self, phone: str, otp: str) -> None:
+        collection = OtpCode.get_pymongo_collection()
+        now = datetime.utcnow()
+        doc = await collection.find_one({"phone": phone})
+        entry = _next_entry(self._entry(doc), otp, now)
+        fields = {
+            "phone": phone,
+            "otp": entry.otp,
+            "expires_at": entry.expires_at,
+            "sent_at": entry.sent_at,
+            "window_started": entry.window_started,
+            "sends": entry.sends,
+            "purge_at": entry.purge_at,
+        }
+        try:
+            if doc is None:
+                await collection.insert_one(fields)
+                return
+            # only replace what we based the throttle decision on
+            result = await collection.replace_one({"_id": doc["_id"], "sent_at": doc["sent_at"]}, fields)
+            if result.matched_count:
+                return
+        except DuplicateKeyError:
+            pass
+        # another worker sent a code for this phone in the meantime
+        raise OtpThrottled(OTP_RESEND_COOLDOWN_SECONDS)
+
+    async def consume(self, phone: str, otp: str) -> str:
+        collection = OtpCode.get_pymongo_collection()
+        now = datetime.utcnow()
+        used = await collection.find_one_and_update(
+            {"phone": phone, "otp": otp, "expires_at": {"$gte": now}},
+            {"$set": {"otp": None, "expires_at": None}},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if used:
+            return OTP_OK
+        doc = await collection.find_one({"phone": phone})
+        result = _classify(self._entry(doc), otp, now)
+        if result == OTP_EXPIRED:
+            await collection.update_one({"_id": doc["_id"], "otp": doc["otp"]}, {"$set": {"otp": None, "expires_at": None}})
+        # a matching code that disappeared meanwhile was used by a concurrent request
+        return OTP_MISSING if result == OTP_OK else result
+
+
+def _build_store() -> OtpStore:
+    backend = os.getenv("OTP_STORE", "mongo").lower()
+    if backend == "memory":
+        return MemoryOtpStore()
+    if backend == "mongo":
+        return MongoOtpStore()
+    raise ValueError(f"Unknown OTP_STORE backend: {backend}")
+
+
+otp_store = _build_store()
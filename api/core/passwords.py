@@ -0,0 +1,66 @@
+# api/core/passwords.py
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from api.core.auth import hash_password, verify_and_update_password
+
+# bcrypt releases the GIL, so threads already hash on several cores; the process
+# pool is for deployments where the GIL-bound parts still show up under load
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_USE_PROCESSES = os.getenv("PASSWORD_USE_PROCESSES", "0") == "1"
+# password jobs running or waiting; beyond this, callers get 503 instead of queueing
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", "64"))
+
+_executor: Optional[Executor] = None
+_pending = 0
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if PASSWORD_USE_PROCESSES:
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="bcrypt")
+    return _executor
+
+
+async def _submit(fn, *args):
+    global _pending
+    if _pending >= PASSWORD_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _submit(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, new_hash); new_hash is set when the stored hash should be replaced."""
+    if not hashed_password:
+        return False, None
+    return await _submit(verify_and_update_password, password, hashed_password)
+
+
+def password_queue_depth() -> int:
+    return _pending
+
+
+def shutdown_password_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -2,37 +2,108 @@ from fastapi import Depends, HTTPException, status
 from api.core.deps import get_current_user
 from api.db.models.user import User
 from api.db.models.role_permission import RolePermission
-from typing import List
+from api.db.models.cache_version import CacheVersion
+from typing import Dict, List, Optional
+import asyncio
+import os
+import time
 
-# has_permission (already updated earlier)
-async def has_permission(user: User, resource: str, action: str, target: str = None) -> bool:
-    if not user or not getattr(user, "role", None):
-        return False
+ROLE_CACHE_KEY = "role_permissions"
+# how often a process asks Mongo whether roles changed (one tiny read per interval)
+PERMISSION_CACHE_CHECK_SECONDS = float(os.getenv("PERMISSION_CACHE_CHECK_SECONDS", "5"))
+
+
+class CompiledRole:
+    """A RolePermission flattened into sets for O(1) lookups."""
 
-    role_name = str(user.role).upper()
-    rp = await RolePermission.find_one(RolePermission.role == role_name)
-    if not rp:
+    def __init__(self, rp: RolePermission):
+        self.role = rp.role.upper()
+        self.pairs = set()        # (resource, action) granted for some or all targets
+        self.untargeted = set()   # (resource, action) granted for every target
+        self.targeted = set()     # (resource, action, TARGET)
+        for p in rp.permissions:
+            pair = (p.resource.lower(), p.action.lower())
+            self.pairs.add(pair)
+            if p.target:
+                self.targeted.add(pair + (p.target.upper(),))
+            else:
+                self.untargeted.add(pair)
+        self.assignable_roles = {r.upper() for r in rp.assignable_roles}
+
+    def allows(self, resource: str, action: str, target: Optional[str] = None) -> bool:
+        resource = (resource or "").lower()
+        action = (action or "").lower()
+        target = target.upper() if target else None
+        for res in (resource, "*"):
+            for act in (action, "*"):
+                if target is None:
+                    if (res, act) in self.pairs:
+                        return True
+                elif (res, act) in self.untargeted or (res, act, target) in self.targeted:
+                    return True
         return False
 
-    resource = (resource or "").lower()
-    action = (action or "").lower()
-    target = (target or "").upper() if target else None
+    def can_assign(self, role: str) -> bool:
+        return "*" in self.assignable_roles or role.upper() in self.assignable_roles
+
+
+class PermissionCache:
+    """
+    Compiled roles for this process. Reloaded (all roles, one query) when the
+    shared CacheVersion stamp moves, so role edits made through another
+    uvicorn worker are picked up within PERMISSION_CACHE_CHECK_SECONDS.
+    """
+
+    def __init__(self):
+        self._roles: Dict[str, CompiledRole] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return (
+            self._version is not None
+            and time.monotonic() - self._checked_at < PERMISSION_CACHE_CHECK_SECONDS
+        )
+
+    async def get(self, role_name: str) -> Optional[CompiledRole]:
+        if not self._fresh():
+            async with self._lock:
+                if not self._fresh():
+                    await self._reload_if_changed()
+        return self._roles.get(str(role_name).upper())
 
-    for p in rp.permissions:
-        res = p.resource.lower()
-        act = p.action.lower()
-        tgt = p.target.upper() if p.target else None
+    async def _reload_if_changed(self):
+        # read the stamp before the roles: a concurrent edit then shows up as a newer stamp next time
+        version = await CacheVersion.current(ROLE_CACHE_KEY)
+        if version != self._version:
+            rows = await RolePermission.find_all().to_list()
+            self._roles = {rp.role.upper(): CompiledRole(rp) for rp in rows}
+            self._version = version
+        self._checked_at = time.monotonic()
 
-        res_match = (res == "*" or res == resource)
-        act_match = (act == "*" or act == action)
-        tgt_match = True
-        if target and tgt:
-            tgt_match = (tgt == target)
+    def invalidate(self):
+        self._version = None
 
-        if res_match and act_match and tgt_match:
-            return True
 
-    return False
+permission_cache = PermissionCache()
+
+
+async def invalidate_permissions():
+    """Call after creating/updating a RolePermission."""
+    await CacheVersion.bump(ROLE_CACHE_KEY)
+    permission_cache.invalidate()
+
+
+# has_permission (already updated earlier)
+async def has_permission(user: User, resource: str, action: str, target: str = None) -> bool:
+    if not user or not getattr(user, "role", None):
+        return False
+
+    compiled = await permission_cache.get(user.role)
+    if not compiled:
+        return False
+    return compiled.allows(resource, action, target)
 
 
 # 🔑 permission_required dependency for routes
@@ -45,4 +116,3 @@ def permission_required(resource: str, action: str):
             )
         return user   # return user if you need user object in route
     return wrapper
-
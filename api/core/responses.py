@@ -0,0 +1,30 @@
+# api/core/responses.py
+from typing import Any
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response
+
+
+def _default(obj: Any):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    """orjson encode; datetimes and enums natively, ObjectId as str."""
+    return orjson.dumps(data, default=_default)
+
+
+class JSONBytesResponse(Response):
+    """
+    JSON response rendered in one orjson pass.
+    Returning it from a route skips FastAPI's response_model validation and
+    jsonable_encoder; response_model is still used for the OpenAPI schema.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
@@ -0,0 +1,156 @@
+# api/core/search_index.py
+import heapq
+import math
+import os
+import re
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from api.db.models.complaint import Complaint, TERMINAL_STATUSES
+
+SEARCH_NGRAM_MAX_DOCS = int(os.getenv("SEARCH_NGRAM_MAX_DOCS", "50000"))
+# share of the query's trigrams a complaint must contain to count as a match
+SEARCH_NGRAM_MIN_SCORE = float(os.getenv("SEARCH_NGRAM_MIN_SCORE", "0.45"))
+# only the start of the description is indexed; subjects carry most of the signal
+DESCRIPTION_PREFIX_CHARS = 200
+MAX_QUERY_GRAMS = 48
+# bounds the work per query when every query gram is common
+MAX_CANDIDATES = 2000
+
+_TOKEN_RE = re.compile(r"[0-9a-zऀ-ॿ]+")
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Character trigrams of each word, padded at the front so a query that is
+    a word prefix ("pip") shares its leading grams with the word ("pipe").
+    """
+    grams: Set[str] = set()
+    for token in _TOKEN_RE.findall(text.lower()):
+        padded = f"  {token}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+INDEXED_FIELDS = ("complaint_subject", "full_name", "complete_address", "detailed_description")
+
+
+def _document_text(fields: Mapping) -> str:
+    return " ".join(filter(None, (
+        fields.get("complaint_subject"),
+        fields.get("full_name"),
+        fields.get("complete_address"),
+        (fields.get("detailed_description") or "")[:DESCRIPTION_PREFIX_CHARS],
+    )))
+
+
+class NgramIndex:
+    """
+    In-process trigram index of recent open complaints, for prefix and
+    typo-tolerant lookups the Mongo text index cannot do. Holds at most
+    `max_docs` complaints, dropping the least recently added. Each worker
+    process keeps its own copy: it is filled on startup, updated by this
+    process's writes and reloaded periodically to pick up the others'.
+    """
+
+    def __init__(self, max_docs: int = SEARCH_NGRAM_MAX_DOCS):
+        self.max_docs = max_docs
+        self._docs: "OrderedDict[str, Set[str]]" = OrderedDict()
+        self._postings: Dict[str, Set[str]] = {}
+        # while a reload builds its replacement, this process's writes are noted here and replayed on it
+        self._journal: Optional[List[Tuple[str, Optional[Mapping]]]] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def update(self, complaint: Complaint):
+        """Index a created or changed complaint; closed and rejected ones drop out."""
+        if complaint.status in TERMINAL_STATUSES:
+            self.remove(str(complaint.id))
+        else:
+            self.add(str(complaint.id), {f: getattr(complaint, f) for f in INDEXED_FIELDS})
+
+    def add(self, doc_id: str, fields: Mapping):
+        if self._journal is not None:
+            self._journal.append((doc_id, fields))
+        self._remove(doc_id)
+        grams = trigrams(_document_text(fields))
+        self._docs[doc_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(doc_id)
+        while len(self._docs) > self.max_docs:
+            self._remove(next(iter(self._docs)))
+
+    def remove(self, doc_id: str):
+        if self._journal is not None:
+            self._journal.append((doc_id, None))
+        self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        grams = self._docs.pop(doc_id, None)
+        for gram in grams or ():
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def search(self, query: str, limit: int = 20, min_score: float = SEARCH_NGRAM_MIN_SCORE) -> List[Tuple[str, float]]:
+        """(complaint id, score in 0..1) best first; score is the share of query trigrams matched."""
+        grams = sorted(trigrams(query), key=lambda g: len(self._postings.get(g, ())))[:MAX_QUERY_GRAMS]
+        if not grams:
+            return []
+        needed = max(1, math.ceil(min_score * len(grams)))
+        # a complaint holding `needed` of the grams holds at least one of the
+        # rarest len - needed + 1, so candidates only come from those postings
+        candidates: Set[str] = set()
+        for gram in grams[:len(grams) - needed + 1]:
+            candidates.update(islice(self._postings.get(gram, ()), MAX_CANDIDATES - len(candidates)))
+            if len(candidates) >= MAX_CANDIDATES:
+                break  # query made of very common grams; the text index covers it
+        wanted = set(grams)
+        scored = ((doc_id, len(self._docs[doc_id] & wanted)) for doc_id in candidates)
+        best = heapq.nlargest(limit, (item for item in scored if item[1] >= needed), key=lambda item: item[1])
+        return [(doc_id, n / len(grams)) for doc_id, n in best]
+
+ngram_index = NgramIndex()
+
+
+def _build_index(rows: List[Mapping], max_docs: int) -> NgramIndex:
+    fresh = NgramIndex(max_docs)
+    # oldest first, so eviction order matches recency
+    for row in reversed(rows):
+        fresh.add(str(row["_id"]), row)
+    return fresh
+
+
+async def load_ngram_index(limit: Optional[int] = None) -> int:
+    """
+    (Re)fill the index with the most recent open complaints; returns how many.
+    Tokenizing runs in the thread pool so requests keep being served; the
+    fresh index is swapped in at the end, so searches never see a
+    half-filled one, and writes made meanwhile are replayed onto it.
+    """
+    if ngram_index._journal is not None:
+        return len(ngram_index)  # a reload is already running
+    limit = limit or ngram_index.max_docs
+    projection = {f: 1 for f in INDEXED_FIELDS}
+    projection["detailed_description"] = {"$substrCP": ["$detailed_description", 0, DESCRIPTION_PREFIX_CHARS]}
+    ngram_index._journal = []
+    try:
+        rows = await Complaint.get_pymongo_collection().find(
+            {"status": {"$nin": [s.value for s in TERMINAL_STATUSES]}}, projection
+        ).sort([("created_at", -1), ("_id", -1)]).limit(limit).to_list()
+        fresh = await run_in_threadpool(_build_index, rows, ngram_index.max_docs)
+        for doc_id, fields in ngram_index._journal:
+            if fields is None:
+                fresh.remove(doc_id)
+            else:
+                fresh.add(doc_id, fields)
+        ngram_index._docs, ngram_index._postings = fresh._docs, fresh._postings
+    finally:
+        ngram_index._journal = None
+    return len(ngram_index)
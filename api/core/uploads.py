@@ -0,0 +1,316 @@
+# api/core/uploads.py
+import asyncio
+import fcntl
+import hashlib
+import os
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.responses import JSONResponse
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from api.db.models.blob import Blob
+from api.db.models.complaint import ProofFile
+
+UPLOAD_ROOT = os.getenv("UPLOAD_DIR", "uploads")
+# content-addressed store: blobs/<2 hex>/<2 hex>/<sha256>, shared by all complaints
+BLOB_ROOT = os.path.join(UPLOAD_ROOT, "blobs")
+BLOB_TMP_DIR = os.path.join(BLOB_ROOT, "tmp")
+BLOB_LOCK_DIR = os.path.join(BLOB_ROOT, "locks")
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_FILE_BYTES = int(os.getenv("MAX_UPLOAD_FILE_BYTES", str(20 * 1024 * 1024)))
+MAX_UPLOAD_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_REQUEST_BYTES", str(50 * 1024 * 1024)))
+PROOF_CONTENT_TYPES = {"image/jpeg", "image/png", "application/pdf"}
+# downscaled JPEG variants kept next to image blobs: variant -> longest edge in px
+IMAGE_CONTENT_TYPES = {"image/jpeg", "image/png"}
+DERIVATIVE_SIZES = {"thumb": 256, "web": 1600}
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+
+def _write_chunk(fh, digest, chunk: bytes):
+    # runs in the thread pool; hashlib releases the GIL for large buffers
+    digest.update(chunk)
+    fh.write(chunk)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def blob_path(sha256: str) -> str:
+    """Sharded location of a blob: blobs/ab/cd/abcd..."""
+    return os.path.join(BLOB_ROOT, sha256[:2], sha256[2:4], sha256)
+
+
+def derivative_path(sha256: str, variant: str) -> str:
+    return f"{blob_path(sha256)}.{variant}.jpg"
+
+
+def _remove_blob_files(sha256: str):
+    _remove_quietly(blob_path(sha256))
+    for variant in DERIVATIVE_SIZES:
+        _remove_quietly(derivative_path(sha256, variant))
+
+
+# one lock per leading hex pair: in-process for coroutines, flock across worker processes
+_local_blob_locks = {f"{i:02x}": asyncio.Lock() for i in range(256)}
+
+
+def _open_lock_file(shard: str) -> int:
+    os.makedirs(BLOB_LOCK_DIR, exist_ok=True)
+    fd = os.open(os.path.join(BLOB_LOCK_DIR, f"{shard}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _close_lock_file(fd: int):
+    try:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+@asynccontextmanager
+async def _blob_lock(sha256: str):
+    """
+    Serialize reference changes and file placement/removal for a hash, so
+    a release that drops the last reference cannot unlink a file another
+    upload has just retained and placed again.
+    """
+    shard = sha256[:2].lower()
+    async with _local_blob_locks[shard]:
+        fd = await run_in_threadpool(_open_lock_file, shard)
+        try:
+            yield
+        finally:
+            await run_in_threadpool(_close_lock_file, fd)
+
+
+def _place_blob(tmp_path: str, sha256: str):
+    path = blob_path(sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # identical content may already be there; replacing it is a cheap rename
+    os.replace(tmp_path, path)
+
+
+async def _stream_to_temp(file: UploadFile, request_budget: List[int]) -> Tuple[str, int, str]:
+    """Copy one upload to a temp file chunk by chunk, returning (path, size, sha256 hex)."""
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = os.path.join(BLOB_TMP_DIR, f"{uuid.uuid4().hex}.part")
+    fh = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            request_budget[0] -= len(chunk)
+            if size > MAX_UPLOAD_FILE_BYTES:
+                raise _too_large(f"{file.filename} exceeds {MAX_UPLOAD_FILE_BYTES} bytes")
+            if request_budget[0] < 0:
+                raise _too_large(f"Upload exceeds {MAX_UPLOAD_REQUEST_BYTES} bytes per request")
+            await run_in_threadpool(_write_chunk, fh, digest, chunk)
+    except BaseException:
+        await run_in_threadpool(fh.close)
+        await run_in_threadpool(_remove_quietly, tmp_path)
+        raise
+    await run_in_threadpool(fh.close)
+    return tmp_path, size, digest.hexdigest()
+
+
+async def retain_blob(sha256: str, size: int, content_type: Optional[str]) -> int:
+    """Add one reference to a blob record, creating it on first use."""
+    update = {
+        "$inc": {"refcount": 1},
+        "$setOnInsert": {"size": size, "content_type": content_type, "created_at": datetime.utcnow()},
+    }
+    collection = Blob.get_pymongo_collection()
+    try:
+        doc = await collection.find_one_and_update(
+            {"sha256": sha256}, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # lost a concurrent upsert of the same hash; the record exists now
+        doc = await collection.find_one_and_update(
+            {"sha256": sha256}, update, return_document=ReturnDocument.AFTER
+        )
+    return doc["refcount"]
+
+
+async def release_blobs(hashes: Iterable[Optional[str]]) -> int:
+    """
+    Drop one reference per hash (None entries are legacy files and ignored).
+    Blobs left without references lose their record and file. Returns the
+    number of files removed.
+    """
+    collection = Blob.get_pymongo_collection()
+    removed = 0
+    for sha256 in hashes:
+        if not sha256:
+            continue
+        async with _blob_lock(sha256):
+            doc = await collection.find_one_and_update(
+                {"sha256": sha256, "refcount": {"$gt": 0}},
+                {"$inc": {"refcount": -1}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if not doc or doc["refcount"] > 0:
+                continue
+            # only the caller that deletes the record removes the file; an upload
+            # retaining the hash waits on the lock and places the file again after
+            result = await collection.delete_one({"sha256": sha256, "refcount": {"$lte": 0}})
+            if result.deleted_count:
+                await run_in_threadpool(_remove_blob_files, sha256)
+                removed += 1
+    return removed
+
+
+def proof_file_hashes(complaint) -> List[str]:
+    """Hashes of every stored file a complaint references, one per reference."""
+    files = list(complaint.evidence_files or [])
+    for assignment in complaint.assignments or []:
+        files.extend(assignment.proof_files or [])
+    return [f.sha256 for f in files if f.sha256]
+
+
+async def save_uploads(
+    files: Iterable[UploadFile],
+    complaint_id: str,
+    allowed_types: Optional[set] = None,
+) -> List[ProofFile]:
+    """
+    Store uploaded files in the content-addressed blob store without
+    blocking the event loop, enforcing the per-file and per-request caps
+    while copying and hashing in the same pass. Each returned ProofFile
+    holds one blob reference; pass their hashes to release_blobs if they
+    end up not being attached to the complaint.
+    """
+    files = list(files)
+    if allowed_types is not None:
+        for file in files:
+            if file.content_type not in allowed_types:
+                raise HTTPException(status_code=400, detail="Invalid file type")
+
+    await run_in_threadpool(os.makedirs, BLOB_TMP_DIR, exist_ok=True)
+
+    request_budget = [MAX_UPLOAD_REQUEST_BYTES]
+    proof_files: List[ProofFile] = []
+    try:
+        for file in files:
+            tmp_path, size, sha256 = await _stream_to_temp(file, request_budget)
+            retained = False
+            try:
+                async with _blob_lock(sha256):
+                    await retain_blob(sha256, size, file.content_type)
+                    retained = True
+                    await run_in_threadpool(_place_blob, tmp_path, sha256)
+            except BaseException:
+                await run_in_threadpool(_remove_quietly, tmp_path)
+                if retained:
+                    await release_blobs([sha256])
+                raise
+            file_url = f"/uploads/{complaint_id}/{sha256}"
+            is_image = file.content_type in IMAGE_CONTENT_TYPES
+            proof_files.append(ProofFile(
+                file_name=os.path.basename(file.filename or "upload"),
+                file_url=file_url,
+                file_type=file.content_type,
+                size=size,
+                sha256=sha256,
+                # rendered in the background; the delivery route fills in missing ones
+                thumbnail_url=f"{file_url}?variant=thumb" if is_image else None,
+                web_url=f"{file_url}?variant=web" if is_image else None,
+                uploaded_at=datetime.utcnow(),
+            ))
+    except BaseException:
+        await release_blobs(f.sha256 for f in proof_files)
+        raise
+    return proof_files
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Cap multipart request bodies at the request limit. A declared
+    Content-Length over the cap is rejected before anything is read;
+    otherwise the body is counted as it is received (chunked uploads, or
+    a length that understates the body) and the request is cut off with
+    413 as soon as the count passes the cap, before Starlette spools the
+    rest of it to disk.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = MAX_UPLOAD_REQUEST_BYTES):
+        self.app = app
+        # multipart framing adds a little on top of the file bytes
+        self.max_bytes = max_bytes + 64 * 1024
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        started = rejected = False
+
+        async def counting_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    if not started and not rejected:
+                        rejected = True
+                        await self._reject(scope, receive, send)
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal started
+            if rejected:
+                return  # the 413 already went out; drop whatever the app answers to the aborted body
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, tracking_send)
+        except _BodyTooLarge:
+            if not rejected:
+                raise
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send):
+        response = JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={"detail": f"Upload exceeds {MAX_UPLOAD_REQUEST_BYTES} bytes per request"},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,67 @@
+# api/db/indexes.py
+from typing import Dict, List, Type
+from beanie import Document
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+
+def _declared_indexes(model: Type[Document]) -> Dict[str, IndexModel]:
+    """Indexes listed in the model's Settings, keyed by name."""
+    declared = getattr(model.Settings, "indexes", None) or []
+    return {ix.document["name"]: ix for ix in declared}
+
+
+def _normalize(spec: Dict) -> tuple:
+    """Comparable shape for a declared (IndexModel.document) or live (index_information) spec."""
+    key = spec["key"]
+    key = list(key.items()) if hasattr(key, "items") else list(key)
+    if "weights" in spec:
+        # text indexes report internal _fts/_ftsx keys once built; compare the weights instead
+        key = sorted(spec["weights"].items())
+    return (
+        tuple((field, direction) for field, direction in key),
+        bool(spec.get("unique", False)),
+        spec.get("partialFilterExpression"),
+    )
+
+
+async def ensure_indexes(models: List[Type[Document]]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Build missing declared indexes and report drift against the live collections.
+
+    Returns {collection: {"created": [...], "changed": [...], "undeclared": [...], "failed": [...]}}.
+    Indexes whose definition changed or that exist only in the database are
+    reported, never dropped: dropping on startup could stall production writes.
+    """
+    report: Dict[str, Dict[str, List[str]]] = {}
+    for model in models:
+        collection = model.get_pymongo_collection()
+        declared = _declared_indexes(model)
+        live = await collection.index_information()
+        entry = {"created": [], "changed": [], "undeclared": [], "failed": []}
+
+        for name, index in declared.items():
+            if name not in live:
+                try:
+                    await collection.create_indexes([index])
+                    entry["created"].append(name)
+                except OperationFailure as e:
+                    entry["failed"].append(f"{name}: {e}")
+            elif _normalize(live[name]) != _normalize(index.document):
+                entry["changed"].append(name)
+
+        entry["undeclared"] = [n for n in live if n != "_id_" and n not in declared]
+        report[model.get_collection_name()] = entry
+    return report
+
+
+def print_index_report(report: Dict[str, Dict[str, List[str]]]) -> None:
+    for collection, entry in report.items():
+        if entry["created"]:
+            print(f"🛠️  {collection}: created indexes {entry['created']}")
+        if entry["changed"]:
+            print(f"⚠️  {collection}: live definition differs from declared {entry['changed']}")
+        if entry["undeclared"]:
+            print(f"⚠️  {collection}: undeclared live indexes {entry['undeclared']}")
+        for failure in entry["failed"]:
+            print(f"❌ {collection}: could not build index {failure}")
@@ -0,0 +1,26 @@
+# api/db/models/blob.py
+from datetime import datetime
+from typing import Optional
+
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+
+
+class Blob(Document):
+    """
+    One stored upload, keyed by the SHA-256 of its content. `refcount` is the
+    number of ProofFile entries pointing at it; the file is removed when it
+    drops to zero.
+    """
+    sha256: str
+    size: int
+    content_type: Optional[str] = None
+    refcount: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "blobs"
+        indexes = [
+            IndexModel([("sha256", ASCENDING)], name="sha256_unique", unique=True),
+        ]
@@ -0,0 +1,34 @@
+# api/db/models/cache_version.py
+from beanie import Document
+from pymongo import IndexModel, ASCENDING, ReturnDocument
+
+
+class CacheVersion(Document):
+    """
+    Version stamp shared by all app processes for an in-process cache.
+    Writers bump it after changing the source data; readers compare it to
+    the version they loaded to detect stale entries.
+    """
+    key: str
+    version: int = 0
+
+    class Settings:
+        name = "cache_versions"
+        indexes = [
+            IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+        ]
+
+    @classmethod
+    async def current(cls, key: str) -> int:
+        doc = await cls.get_pymongo_collection().find_one({"key": key}, {"version": 1})
+        return doc["version"] if doc else 0
+
+    @classmethod
+    async def bump(cls, key: str) -> int:
+        doc = await cls.get_pymongo_collection().find_one_and_update(
+            {"key": key},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["version"]
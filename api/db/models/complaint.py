@@ -1,8 +1,10 @@
 from enum import Enum
-from beanie import Document
-from pydantic import BaseModel
-from typing import Optional, List, Any
+from beanie import Document, before_event, Insert, Replace, Save
+from pydantic import BaseModel, Field, field_validator, model_validator
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT, GEOSPHERE
+from typing import Optional, List, Any, Dict, Literal, Mapping
 from datetime import datetime
+from api.core.geohash import encode as encode_geohash
 
 # ------------------ Status Enums ------------------ #
 class ComplaintStatus(str, Enum):
@@ -31,12 +33,64 @@ class AssignmentStatus(str, Enum):
     ESCALATED = "escalated"
     CANCELLED = "cancelled"
 
+# Assignment states in which the assignee still holds the task (counted in Worker.active_tasks)
+HELD_ASSIGNMENT_STATUSES = [
+    AssignmentStatus.ASSIGNED,
+    AssignmentStatus.ASSIGNED_TO_CONTRACTOR,
+    AssignmentStatus.SUBMITTED_BY_CM,
+    AssignmentStatus.SUBMITTED_BY_JE,
+    AssignmentStatus.SUBMITTED_BY_CONTRACTOR,
+]
+
+# complaints in these states are finished: not searchable, not matched as duplicates
+TERMINAL_STATUSES = [ComplaintStatus.CLOSED, ComplaintStatus.REJECTED]
+
+# escalate_reason written by the SLA monitor; also how the stats rollup counts breaches
+SLA_BREACH_REASON = "SLA breached"
+
 # ------------------ Submodels ------------------ #
+class GeoPoint(BaseModel):
+    """GeoJSON Point as the 2dsphere index expects it: coordinates are [lng, lat]."""
+    type: Literal["Point"] = "Point"
+    coordinates: List[float]
+
+    @model_validator(mode="before")
+    @classmethod
+    def _from_lat_lng(cls, value):
+        # API payloads (and documents stored before the GeoJSON migration) carry {lat, lng}
+        if isinstance(value, Mapping) and "lat" in value and "lng" in value:
+            return {"type": "Point", "coordinates": [float(value["lng"]), float(value["lat"])]}
+        return value
+
+    @field_validator("coordinates")
+    @classmethod
+    def _check_range(cls, coordinates: List[float]) -> List[float]:
+        if len(coordinates) != 2:
+            raise ValueError("a point has exactly two coordinates [lng, lat]")
+        lng, lat = coordinates
+        if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+            raise ValueError("coordinates out of range")
+        return coordinates
+
+
+def lat_lng(location: Optional[Mapping]) -> Optional[Dict]:
+    """{lat, lng} for a stored location (GeoJSON or legacy), as the API returns it."""
+    if not location:
+        return None
+    if "coordinates" in location:
+        lng, lat = location["coordinates"]
+        return {"lat": lat, "lng": lng}
+    return {"lat": location.get("lat"), "lng": location.get("lng")}
+
 class ProofFile(BaseModel):
     file_name: str
     file_url: Optional[str] = None
-    file_type: Optional[str] = None
-    uploaded_at: datetime = datetime.utcnow()
+    file_type: Optional[str] = None  # content type as uploaded
+    size: Optional[int] = None       # bytes
+    sha256: Optional[str] = None     # hex digest computed while storing
+    thumbnail_url: Optional[str] = None  # image uploads only
+    web_url: Optional[str] = None
+    uploaded_at: datetime = Field(default_factory=datetime.utcnow)
 
 class Assignment(BaseModel):
     group: Optional[str] = None
@@ -62,11 +116,16 @@ class Worker(Document):
     last_assigned_at: Optional[datetime] = None
     created_at: datetime = datetime.utcnow()
     max_tasks: Optional[int] = 3
+    active_tasks: int = 0  # held assignments; maintained with $inc by workflow transitions
     group: str = "Worker"
     created_by_je: Optional[str] = None
 
     class Settings:
         name = "workers"
+        indexes = [
+            IndexModel([("created_by_je", ASCENDING), ("group", ASCENDING)], name="je_group"),
+            IndexModel([("group", ASCENDING), ("available", ASCENDING)], name="group_available"),
+        ]
 
 # ------------------ Complaint Model ------------------ #
 class Complaint(Document):
@@ -76,14 +135,22 @@ class Complaint(Document):
     complaint_category: str
     complaint_subject: str
     detailed_description: str
-    location: Optional[dict] = None
+    location: Optional[GeoPoint] = None
+    geohash: Optional[str] = None  # of location; prefixes drive the map clusters
+    # set at intake when the report matches an open complaint; crews are dispatched to the parent only
+    duplicate_of: Optional[str] = None
+    duplicate_count: int = 0  # reports linked to this one
     complete_address: str
+    division: Optional[str] = None
     evidence_files: Optional[List[ProofFile]] = []
     status: ComplaintStatus = ComplaintStatus.PENDING
     assignments: Optional[List[Assignment]] = []
     current_assignment_index: Optional[int] = None
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
+    # copies of the current assignment's status/deadline so the SLA scan can use an index
+    current_assignment_status: Optional[AssignmentStatus] = None
+    current_sla_deadline: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     user_id: Optional[str] = None  # stores assigned worker's user_id
     forwarded_to_je: Optional[str] = None
     # ------------------ Contractor fields ------------------ #
@@ -95,3 +162,57 @@ class Complaint(Document):
 
     class Settings:
         name = "complaints"
+        indexes = [
+            # list endpoint: keyset pagination, optionally narrowed by one filter
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_desc"),
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="status_created"),
+            IndexModel([("complaint_category", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="category_created"),
+            IndexModel([("division", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="division_created"),
+            IndexModel([("assignments.assigned_user_id", ASCENDING), ("created_at", DESCENDING)], name="assigned_user_created"),
+            # worker workload: assignments.worker_id + complaint status
+            IndexModel(
+                [("assignments.worker_id", ASCENDING), ("status", ASCENDING)],
+                name="worker_status",
+                partialFilterExpression={"assignments.worker_id": {"$type": "string"}},
+            ),
+            # SLA scan: only complaints whose current assignment still waits on the assignee
+            IndexModel(
+                [("current_sla_deadline", ASCENDING)],
+                name="sla_due",
+                partialFilterExpression={"current_assignment_status": AssignmentStatus.ASSIGNED.value},
+            ),
+            # search: weighted full-text, plus exact lookups by phone number
+            IndexModel(
+                [("complaint_subject", TEXT), ("full_name", TEXT), ("complete_address", TEXT), ("detailed_description", TEXT)],
+                name="search_text",
+                weights={"complaint_subject": 10, "full_name": 5, "complete_address": 3, "detailed_description": 2},
+            ),
+            IndexModel([("mobile_number", ASCENDING), ("created_at", DESCENDING)], name="mobile_created"),
+            # radius / polygon / nearest queries, usually narrowed by status
+            IndexModel([("location", GEOSPHERE), ("status", ASCENDING)], name="location_status"),
+            # map clusters: prefix ranges on geohash, grouped by status without fetching documents
+            IndexModel([("geohash", ASCENDING), ("status", ASCENDING)], name="geohash_status"),
+            IndexModel(
+                [("duplicate_of", ASCENDING)],
+                name="duplicate_of",
+                partialFilterExpression={"duplicate_of": {"$type": "string"}},
+            ),
+        ]
+
+    @model_validator(mode="after")
+    def _sync_geohash(self):
+        if self.location is not None and self.geohash is None:
+            lng, lat = self.location.coordinates
+            self.geohash = encode_geohash(lat, lng)
+        return self
+
+    @before_event(Insert, Replace, Save)
+    def sync_current_assignment(self):
+        idx = self.current_assignment_index
+        current = (
+            self.assignments[idx]
+            if idx is not None and 0 <= idx < len(self.assignments or [])
+            else None
+        )
+        self.current_assignment_status = current.status if current else None
+        self.current_sla_deadline = current.sla_deadline if current else None
@@ -0,0 +1,32 @@
+# api/db/models/complaint_stat.py
+from typing import Dict, Optional
+
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+
+
+class ComplaintStat(Document):
+    """
+    Dashboard rollup: one row per (creation day, division, category).
+    `statuses` counts that bucket's complaints by current status; closed /
+    close_seconds give the mean time-to-close. Kept current by the workflow
+    transitions and rebuilt from scratch by api.tasks.stats_rollup.
+    """
+    day: str  # YYYY-MM-DD (UTC) of created_at
+    division: Optional[str] = None
+    category: str
+    statuses: Dict[str, int] = Field(default_factory=dict)
+    sla_breaches: int = 0
+    closed: int = 0
+    close_seconds: float = 0.0
+
+    class Settings:
+        name = "complaint_stats"
+        indexes = [
+            IndexModel(
+                [("day", ASCENDING), ("division", ASCENDING), ("category", ASCENDING)],
+                name="bucket_unique",
+                unique=True,
+            ),
+        ]
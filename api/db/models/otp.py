@@ -0,0 +1,28 @@
+# api/db/models/otp.py
+from datetime import datetime
+from typing import Optional
+
+from beanie import Document
+from pymongo import IndexModel, ASCENDING
+
+
+class OtpCode(Document):
+    """
+    Citizen OTP and its send-throttle state, one document per phone.
+    Mongo's TTL monitor removes the document at `purge_at`, which is kept
+    past the OTP expiry while the throttle window is still open.
+    """
+    phone: str
+    otp: Optional[str] = None
+    expires_at: Optional[datetime] = None
+    sent_at: datetime
+    window_started: datetime
+    sends: int = 1
+    purge_at: datetime
+
+    class Settings:
+        name = "otp_codes"
+        indexes = [
+            IndexModel([("phone", ASCENDING)], name="phone_unique", unique=True),
+            IndexModel([("purge_at", ASCENDING)], name="purge_ttl", expireAfterSeconds=0),
+        ]
@@ -1,6 +1,7 @@
 from beanie import Document
 from pydantic import BaseModel
 from typing import List, Optional
+from pymongo import IndexModel, ASCENDING
 
 class Permission(BaseModel):
     resource: str   # "user", "complaint", "worker", "role", or "*"
@@ -14,3 +15,6 @@ class RolePermission(Document):
 
     class Settings:
         name = "role_permissions"
+        indexes = [
+            IndexModel([("role", ASCENDING)], name="role_unique", unique=True),
+        ]
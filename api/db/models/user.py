@@ -3,6 +3,7 @@ from beanie import Document
 from pydantic import EmailStr
 from typing import Optional
 from datetime import datetime
+from pymongo import IndexModel, ASCENDING
 
 class User(Document):
     name: str
@@ -16,3 +17,15 @@ class User(Document):
 
     class Settings:
         name = "users"
+        indexes = [
+            # officials have no phone and citizens no email, so unique only where set
+            IndexModel(
+                [("email", ASCENDING)], name="email_unique", unique=True,
+                partialFilterExpression={"email": {"$type": "string"}},
+            ),
+            IndexModel(
+                [("phone", ASCENDING)], name="phone_unique", unique=True,
+                partialFilterExpression={"phone": {"$type": "string"}},
+            ),
+            IndexModel([("role", ASCENDING), ("division", ASCENDING)], name="role_division"),
+        ]
@@ -1,10 +1,15 @@
 # api/db.py
-import motor.motor_asyncio
+from pymongo import AsyncMongoClient
 from beanie import init_beanie
 from api.routes import index
 from api.db.models.user import User
 from api.db.models.complaint import Complaint, Worker
 from api.db.models.role_permission import RolePermission 
+from api.db.models.cache_version import CacheVersion
+from api.db.models.blob import Blob
+from api.db.models.otp import OtpCode
+from api.db.models.complaint_stat import ComplaintStat
+from api.db.indexes import ensure_indexes, print_index_report
 import os
 from dotenv import load_dotenv
 
@@ -13,8 +18,14 @@ load_dotenv()  # load .env
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("MONGO_DB", "grievance")
 
+DOCUMENT_MODELS = [User, Complaint, Worker, RolePermission, CacheVersion, Blob, OtpCode, ComplaintStat]
+
 async def init_db():
-    client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
+    client = AsyncMongoClient(MONGO_URI)
     db = client[DB_NAME]
-    await init_beanie(database=db, document_models=[User, Complaint, Worker, RolePermission])
+    # indexes are built by ensure_indexes so drift is reported instead of failing startup
+    await init_beanie(database=db, document_models=DOCUMENT_MODELS, skip_indexes=True)
     print("✅ Beanie initialized with MongoDB")
+
+    report = await ensure_indexes(DOCUMENT_MODELS)
+    print_index_report(report)
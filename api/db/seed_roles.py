@@ -1,4 +1,5 @@
 from api.db.models.role_permission import RolePermission, Permission
+from api.core.permissions import invalidate_permissions
 
 async def seed_roles():
     # GM permissions
@@ -34,3 +35,5 @@ async def seed_roles():
         admin_role.permissions = admin_permissions
         admin_role.assignable_roles = ["*"]
         await admin_role.save()
+
+    await invalidate_permissions()
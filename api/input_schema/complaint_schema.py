@@ -1,11 +1,11 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from typing import Literal
 
 class Location(BaseModel):
-    lat: float
-    lng: float
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
 
 class EvidenceFile(BaseModel):
     file_name: str
@@ -17,6 +17,10 @@ class ProofFileSchema(BaseModel):
     file_name: str
     file_url: Optional[str] = None
     file_type: Optional[str] = None
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    web_url: Optional[str] = None
 
 class AssignmentSchema(BaseModel):
     group: Optional[str] = None
@@ -56,6 +60,7 @@ class ComplaintCreate(BaseModel):
     detailed_description: str
     location: Optional[Location] = None
     complete_address: str
+    division: Optional[str] = None
     evidence_files: Optional[List[EvidenceFile]] = []
 
 class ComplaintUpdate(BaseModel):
@@ -78,13 +83,76 @@ class ComplaintResponse(BaseModel):
     detailed_description: str
     location: Optional[Location] = None
     complete_address: str
+    division: Optional[str] = None
     evidence_files: Optional[List[EvidenceFile]] = []
     status: str
     user_id: Optional[str] = None
     created_at: datetime
     assignments: Optional[List[AssignmentSchema]] = []
     current_assignment: Optional[AssignmentSchema] = None
+    duplicate_of: Optional[str] = None  # parent complaint when this report is a duplicate
+    duplicate_count: int = 0
+
+# Compact row for list endpoints: no assignment history, no evidence files
+class ComplaintListItem(BaseModel):
+    id: str
+    full_name: str
+    mobile_number: str
+    complaint_category: str
+    complaint_subject: str
+    detailed_description: str
+    location: Optional[Location] = None
+    complete_address: str
+    division: Optional[str] = None
+    status: str
+    user_id: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    current_assignment: Optional[AssignmentSchema] = None
+    duplicate_of: Optional[str] = None
+    duplicate_count: int = 0
+
+class ComplaintPage(BaseModel):
+    items: List[ComplaintListItem] = []
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to fetch the next page
+
+class NearbyComplaint(ComplaintListItem):
+    distance_m: float
+
+class NearbyComplaints(BaseModel):
+    items: List[NearbyComplaint] = []  # nearest first
+
+class MapCell(BaseModel):
+    geohash: str
+    lat: float  # cell centre
+    lng: float
+    count: int
+    by_status: Dict[str, int] = {}
+
+class MapClusters(BaseModel):
+    precision: int  # geohash length of the cells
+    total: int
+    cells: List[MapCell] = []
+
+class ComplaintSearchPage(BaseModel):
+    items: List[ComplaintListItem] = []
+    page: int
+    has_more: bool = False
+    match: Optional[str] = None  # "id", "mobile" or "text": how the query was interpreted
 
+class DayCount(BaseModel):
+    day: str
+    count: int
+
+class ComplaintStats(BaseModel):
+    total: int
+    by_status: Dict[str, int] = {}
+    by_category: Dict[str, int] = {}
+    by_division: Dict[str, int] = {}
+    by_day: List[DayCount] = []
+    sla_breaches: int = 0
+    closed: int = 0
+    mean_time_to_close_seconds: Optional[float] = None
 
 
 
@@ -92,7 +160,7 @@ class AssignRequest(BaseModel):
     group: Optional[str] = None         # e.g., "AM", "Worker", "Contractor"
     worker_user_id: Optional[str] = None      # assigned worker/contractor id
     remarks: Optional[str] = None
-    sla_minutes: Optional[int] = 240 
+    sla_minutes: int = Field(240, gt=0)
 
 # ------------------ Assign Request Schema ------------------ #
 class SubmitProofRequest(BaseModel):
@@ -112,6 +180,38 @@ class EscalateRequest(BaseModel):
     reason: str
 
 
+# ------------------ Batch workflow ------------------ #
+class BatchAssignRequest(BaseModel):
+    complaint_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    worker_user_ids: Optional[List[str]] = None  # default: every available worker of `group`
+    group: Optional[str] = None
+    sla_minutes: int = Field(240, gt=0)
+
+
+class BatchEscalateRequest(BaseModel):
+    complaint_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    reason: str
+
+
+class BatchCloseRequest(BaseModel):
+    complaint_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    note: Optional[str] = None
+
+
+class BatchItemResult(BaseModel):
+    id: str
+    ok: bool
+    status: Optional[str] = None       # new complaint status when ok
+    status_code: Optional[int] = None  # error code when not ok
+    detail: Optional[str] = None
+
+
+class BatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+
 class ForwardToJeRequest(BaseModel):
     je_id: str
     reason: Optional[str] = None
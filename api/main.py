@@ -3,8 +3,16 @@ from fastapi import FastAPI
 from api.db.mongo import init_db 
 from api.routes.index import router
 from api.db.seed_roles import seed_roles
+from api.tasks.sla_monitor import start_scheduler, escalate_if_due
+from api.tasks.sla_scheduler import sla_scheduler
 
 from fastapi.middleware.cors import CORSMiddleware
+from api.core.uploads import UploadSizeLimitMiddleware
+from api.core.derivatives import shutdown_derivative_pool
+from api.core.passwords import shutdown_password_pool
+from api.core.otp_store import otp_store
+from api.core.search_index import load_ngram_index
+from api.core.dedup import load_duplicate_index
 
 app = FastAPI(title="EazzGrievance API")
 
@@ -17,6 +25,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# reject oversized uploads before their body is read
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # include routes
 app.include_router(router)
 
@@ -25,6 +36,21 @@ app.include_router(router)
 async def on_startup():
     await init_db()
     await seed_roles()
+    await otp_store.start()
+    await load_ngram_index()
+    await load_duplicate_index()
+    # exact-time SLA escalation, with the periodic sweep as a safety net
+    await sla_scheduler.load()
+    sla_scheduler.start(escalate_if_due)
+    app.state.scheduler = start_scheduler()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await sla_scheduler.stop()
+    await otp_store.stop()
+    app.state.scheduler.shutdown(wait=False)
+    shutdown_derivative_pool()
+    shutdown_password_pool()
 
 @app.get("/")
 def root():
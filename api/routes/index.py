@@ -8,6 +8,7 @@ from api.routes.v1 import (
      complaint as v1_complaint,
      worker as v1_worker,
      roles as v1_roles,
+     uploads as v1_uploads,
 )
 
 router = APIRouter()
@@ -19,6 +20,8 @@ router.include_router(v1_user.router, prefix=API_VERSION)
 router.include_router(v1_complaint.router, prefix=API_VERSION)
 router.include_router(v1_worker.router, prefix=API_VERSION)
 router.include_router(v1_roles.router, prefix=API_VERSION)
+# unversioned: these paths are stored in ProofFile.file_url
+router.include_router(v1_uploads.router)
 
 
 
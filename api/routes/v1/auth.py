@@ -38,11 +38,11 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 
 # -------------------- Citizen OTP --------------------
 @router.post("/citizen/send-otp")
-def citizen_send_otp(payload: CitizenSendOTPSchema):
+async def citizen_send_otp(payload: CitizenSendOTPSchema):
     """
     Send mock OTP (6-digit) to a given phone number.
     """
-    otp_data = send_otp(payload.phone)
+    otp_data = await send_otp(payload.phone)
     return otp_data  # Keep verbose JSONResponse for send-otp
 
 @router.post("/citizen/verify-otp", response_model=TokenSchema)
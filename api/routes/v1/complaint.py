@@ -1,10 +1,11 @@
 from api.input_schema.worker_schema import ContractorCreate
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from typing import List
-import os, shutil, uuid
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from datetime import date, datetime
 
 from api.db.models.user import User
-from api.db.models.complaint import Complaint, ProofFile, Worker
+from api.db.models.complaint import Complaint, Worker, ComplaintStatus
 from api.controllers.complaint_ctrl import (
     assign_contractor_controller,
     # contractor_submit_proof_controller,
@@ -12,20 +13,38 @@ from api.controllers.complaint_ctrl import (
     create_contractor_controller,
     forward_to_je_controller,
     get_all_complaints_controller,
+    get_complaint_by_id_controller,
+    search_complaints_controller,
+    nearby_complaints_controller,
+    parse_polygon,
+    polygon_within,
     assign_complaint_controller,
     je_verify_contractor_controller,
     submit_proof_controller,
     verify_proof_controller,
     manager_approve_close_controller,
     escalate_complaint_controller,
-    get_active_assignments_count
+    unlink_duplicate_controller,
+    batch_assign_complaints_controller,
+    batch_escalate_complaints_controller,
+    batch_close_complaints_controller,
 )
+from api.controllers.worker_ctrl import worker_has_capacity
+from api.controllers.import_ctrl import import_complaints, IMPORT_FORMATS
+from api.controllers.export_ctrl import export_complaints, parse_export_fields, EXPORT_FORMATS
+from api.controllers.stats_ctrl import get_stats_controller
+from api.controllers.map_ctrl import get_map_clusters_controller
 from api.input_schema.complaint_schema import (
-    ComplaintCreate, ComplaintResponse, AssignRequest, SubmitProofRequest,
-    VerifyActionRequest, ManagerApproveRequest, EscalateRequest
+    ComplaintCreate, ComplaintResponse, ComplaintPage, ComplaintSearchPage, NearbyComplaints, MapClusters, AssignRequest, SubmitProofRequest,
+    VerifyActionRequest, ManagerApproveRequest, EscalateRequest,
+    BatchAssignRequest, BatchEscalateRequest, BatchCloseRequest, BatchResult, ComplaintStats
 )
 from api.core.deps import get_current_user
+from api.core.responses import JSONBytesResponse
+from api.core.uploads import save_uploads, release_blobs, PROOF_CONTENT_TYPES
+from api.core.derivatives import schedule_derivatives
 from api.core.roles import roles_required
+from api.core.permissions import permission_required
 
 router = APIRouter(prefix="/complaint", tags=["Complaints"])
 
@@ -38,16 +57,239 @@ async def create_complaint(payload: ComplaintCreate):
     Any user can submit a complaint (no authentication required).
     """
     complaint = Complaint(**payload.dict())  # Remove created_by if you don't have a user
-    return await create_complaint_controller(complaint)
+    return JSONBytesResponse(await create_complaint_controller(complaint))
 
 
 
+# =======================
+# 1b) Bulk import (NDJSON / CSV request body)
+# =======================
+@router.post("/import", dependencies=[Depends(permission_required("complaint", "import"))])
+async def import_complaints_route(request: Request, format: Optional[str] = Query(None)):
+    """
+    Stream complaints in the request body, one per NDJSON line or CSV row
+    (header row with ComplaintCreate field names, `lat`/`lng` for location).
+    The format defaults from Content-Type (text/csv, else NDJSON).
+    Returns counts and the rows that were rejected.
+    """
+    fmt = format or ("csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson")
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(IMPORT_FORMATS)}")
+    return JSONBytesResponse(await import_complaints(request.stream(), fmt))
+
+
 # =======================
 # 2) Get all complaints
 # =======================
-@router.get("/", response_model=List[ComplaintResponse])
-async def get_all_complaints():
-    return await get_all_complaints_controller()
+@router.get("/", response_model=ComplaintPage)
+async def get_all_complaints(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[ComplaintStatus] = None,
+    category: Optional[str] = None,
+    division: Optional[str] = None,
+    assigned_user_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    duplicate_of: Optional[str] = None,
+):
+    """
+    Newest first, one page at a time. Pass `next_cursor` back as `cursor`
+    to fetch the following page. Rows are compact; use GET /{complaint_id}
+    for the full complaint with its assignment history. `duplicate_of`
+    lists the reports linked to one complaint.
+    """
+    return JSONBytesResponse(await get_all_complaints_controller(
+        limit=limit,
+        cursor=cursor,
+        status=status.value if status else None,
+        category=category,
+        division=division,
+        assigned_user_id=assigned_user_id,
+        created_from=created_from,
+        created_to=created_to,
+        duplicate_of=duplicate_of,
+    ))
+
+# =======================
+# 2b) Search
+# =======================
+@router.get("/search", response_model=ComplaintSearchPage)
+async def search_complaints(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=50),
+    status: Optional[ComplaintStatus] = None,
+    category: Optional[str] = None,
+    division: Optional[str] = None,
+):
+    """
+    Search by complaint id, mobile number, or words from the subject, name,
+    address and description (best matches first). Word searches also match
+    prefixes and small typos among recent open complaints.
+    """
+    return JSONBytesResponse(await search_complaints_controller(
+        q,
+        page=page,
+        limit=limit,
+        status=status.value if status else None,
+        category=category,
+        division=division,
+    ))
+
+# =======================
+# 2d) Geo: nearest to a point, inside a polygon
+# =======================
+@router.get("/nearby", response_model=NearbyComplaints)
+async def get_nearby_complaints(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_m: Optional[float] = Query(None, gt=0, le=100_000),
+    open_only: bool = True,
+    limit: int = Query(50, ge=1, le=200),
+    status: Optional[ComplaintStatus] = None,
+    category: Optional[str] = None,
+    division: Optional[str] = None,
+):
+    """
+    Complaints nearest to the point first, with their distance in metres.
+    Limit to a circle with radius_m; open complaints only unless open_only=false
+    or a status is given.
+    """
+    return JSONBytesResponse(await nearby_complaints_controller(
+        lat,
+        lng,
+        radius_m=radius_m,
+        open_only=open_only,
+        limit=limit,
+        status=status.value if status else None,
+        category=category,
+        division=division,
+    ))
+
+@router.get("/within", response_model=ComplaintPage)
+async def get_complaints_within(
+    polygon: str = Query(..., description="lat,lng;lat,lng;... (3 or more vertices)"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[ComplaintStatus] = None,
+    category: Optional[str] = None,
+    division: Optional[str] = None,
+):
+    """Complaints located inside the polygon, newest first, paged like GET /."""
+    return JSONBytesResponse(await get_all_complaints_controller(
+        limit=limit,
+        cursor=cursor,
+        status=status.value if status else None,
+        category=category,
+        division=division,
+        within=polygon_within(parse_polygon(polygon)),
+    ))
+
+# =======================
+# 2e) Map clusters (counts by status per geohash cell)
+# =======================
+@router.get("/map", response_model=MapClusters)
+async def get_map_clusters(
+    south: float = Query(..., ge=-90, le=90),
+    west: float = Query(..., ge=-180, le=180),
+    north: float = Query(..., ge=-90, le=90),
+    east: float = Query(..., ge=-180, le=180),
+    zoom: int = Query(..., ge=0, le=22),
+    category: Optional[str] = None,
+    division: Optional[str] = None,
+):
+    """
+    Clustered complaint counts for the visible map area. Cells get finer as
+    the zoom grows; the number of cells returned is capped whatever the
+    complaint volume.
+    """
+    return JSONBytesResponse(await get_map_clusters_controller(south, west, north, east, zoom, category, division))
+
+# =======================
+# 2c) Dashboard statistics (from the rollup, not the complaints)
+# =======================
+@router.get("/stats", response_model=ComplaintStats)
+async def get_complaint_stats(
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    division: Optional[str] = None,
+    category: Optional[str] = None,
+):
+    """
+    Counts by status, category, division and creation day, SLA breaches and
+    mean time-to-close for complaints created between day_from and day_to
+    (inclusive, UTC).
+    """
+    return JSONBytesResponse(await get_stats_controller(day_from, day_to, division, category))
+
+# =======================
+# 2a) Export (streamed NDJSON / CSV)
+# =======================
+@router.get("/export", dependencies=[Depends(permission_required("complaint", "export"))])
+async def export_complaints_route(
+    format: str = Query("ndjson"),
+    fields: Optional[str] = Query(None, description="comma-separated columns, e.g. id,status,current_assignment.status"),
+    status: Optional[ComplaintStatus] = None,
+    category: Optional[str] = None,
+    division: Optional[str] = None,
+    assigned_user_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """
+    Every matching complaint, newest first, streamed as it is read. Takes the
+    same filters as the list endpoint; the current assignment is flattened
+    into current_assignment.* columns.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    rows = export_complaints(
+        format,
+        parse_export_fields(fields),
+        status=status.value if status else None,
+        category=category,
+        division=division,
+        assigned_user_id=assigned_user_id,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"complaints-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(rows, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    })
+
+# =======================
+# 2b) Batch assign / escalate / close (same roles as the single routes;
+#     declared before /{complaint_id}/... so "batch" is not taken as an id)
+# =======================
+@router.post("/batch/assign", response_model=BatchResult, dependencies=[Depends(roles_required(["CM"]))])
+async def batch_assign(payload: BatchAssignRequest, current_user: User = Depends(get_current_user)):
+    """
+    Assign up to 1000 complaints in one request. Each goes to the least busy
+    worker with capacity left; per-complaint results are returned.
+    """
+    return JSONBytesResponse(await batch_assign_complaints_controller(
+        payload.complaint_ids,
+        assigned_by=current_user.id,
+        worker_user_ids=payload.worker_user_ids,
+        group=payload.group,
+        sla_minutes=payload.sla_minutes,
+    ))
+
+
+@router.post("/batch/escalate", response_model=BatchResult, dependencies=[Depends(roles_required(["AM","CM","SDO"]))])
+async def batch_escalate(payload: BatchEscalateRequest):
+    return JSONBytesResponse(await batch_escalate_complaints_controller(payload.complaint_ids, reason=payload.reason))
+
+
+@router.post("/batch/manager-approve", response_model=BatchResult, dependencies=[Depends(roles_required(["GM","Manager", "SDO"]))])
+async def batch_manager_approve(payload: BatchCloseRequest, current_user: User = Depends(get_current_user)):
+    return JSONBytesResponse(await batch_close_complaints_controller(
+        payload.complaint_ids, manager_id=current_user.id, final_note=payload.note
+    ))
+
 
 # =======================
 # 3) Assign complaint to worker (CM only)
@@ -64,27 +306,28 @@ async def assign_complaint(
     Also shows all available workers with their workloads.
     """
 
-    # --- Step 1: Fetch all workers and calculate their workload ---
+    # --- Step 1: Fetch all workers with their workload (kept on Worker.active_tasks) ---
     all_workers = await Worker.find_all().to_list()
     workers_info = []
 
     for worker in all_workers:
-       active_count = await get_active_assignments_count(str(worker.id))
        workers_info.append({
         "id": str(worker.id),
         "name": getattr(worker, "name", ""),
         "email": getattr(worker, "email", ""),
         "group": getattr(worker, "group", "Worker"),
-        "available": True,       # always show in dropdown
-        "active_tasks": active_count,  # show how many tasks assigned
+        "available": worker_has_capacity(worker),  # every worker is listed; full ones are marked
+        "active_tasks": worker.active_tasks,  # show how many tasks assigned
     })
 
 
-    # --- Step 2: Auto-select least busy worker if none is given ---
+    # --- Step 2: Auto-select least busy worker with capacity if none is given ---
     worker_user_id = payload.worker_user_id
     if not worker_user_id:
-        sorted_workers = sorted(workers_info, key=lambda x: x["active_tasks"])
-        worker_user_id = sorted_workers[0]["id"] if sorted_workers else None
+        candidates = [w for w in workers_info if w["available"]]
+        if not candidates:
+            raise HTTPException(status_code=409, detail="No worker has capacity left")
+        worker_user_id = min(candidates, key=lambda x: x["active_tasks"])["id"]
 
 
     # --- Step 3: Perform assignment using existing controller ---
@@ -97,11 +340,11 @@ async def assign_complaint(
     )
 
     # --- Step 4: Return complaint + all workers info ---
-    return {
+    return JSONBytesResponse({
         "message": "Complaint assigned successfully",
         "complaint": complaint_data,
         "available_workers": workers_info
-    }
+    })
 
 
 # =======================
@@ -155,30 +398,21 @@ async def submit_proof(
     """
     Submit proof files (images/docs) for a complaint.
     """
-    upload_folder = f"uploads/{complaint_id}"
-    os.makedirs(upload_folder, exist_ok=True)
-
-    proof_files = []
-    for file in files:
-        if file.content_type not in ["image/jpeg", "image/png", "application/pdf"]:
-            raise HTTPException(status_code=400, detail="Invalid file type")
-        unique_filename = f"{uuid.uuid4()}_{file.filename}"
-        file_path = os.path.join(upload_folder, unique_filename)
-
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-
-        proof_files.append({
-            "file_name": file.filename,
-            "file_url": f"/uploads/{complaint_id}/{unique_filename}"
-        })
-
-    return await submit_proof_controller(
-        complaint_id=complaint_id,
-        submitter_id=str(current_user.id),  # pass current user's ID
-        proof_files=proof_files,
-        role=current_user.role  # pass user's role, e.g., "CM"
-    )
+    proof_files = await save_uploads(files, complaint_id, allowed_types=PROOF_CONTENT_TYPES)
+
+    try:
+        complaint_data = await submit_proof_controller(
+            complaint_id=complaint_id,
+            submitter_id=str(current_user.id),  # pass current user's ID
+            proof_files=proof_files,
+            role=current_user.role  # pass user's role, e.g., "CM"
+        )
+    except BaseException:
+        # the files were never attached; drop their blob references
+        await release_blobs(f.sha256 for f in proof_files)
+        raise
+    schedule_derivatives(proof_files)
+    return JSONBytesResponse(complaint_data)
 
 
 # =======================
@@ -190,12 +424,12 @@ async def verify_proof(
     action_payload: VerifyActionRequest,
     current_user: User = Depends(get_current_user)
 ):
-    return await verify_proof_controller(
+    return JSONBytesResponse(await verify_proof_controller(
         complaint_id,
         je_id=current_user.id,
         action=action_payload.action,
         note=action_payload.note
-    )
+    ))
 
 
 # =======================
@@ -207,11 +441,11 @@ async def manager_approve_close(
     payload: ManagerApproveRequest,
     current_user: User = Depends(get_current_user)
 ):
-    return await manager_approve_close_controller(
+    return JSONBytesResponse(await manager_approve_close_controller(
         complaint_id,
         manager_id=current_user.id,
         final_note=payload.note
-    )
+    ))
 
 
 # =======================
@@ -222,18 +456,22 @@ async def escalate_complaint(
     complaint_id: str,
     payload: EscalateRequest
 ):
-    return await escalate_complaint_controller(
+    return JSONBytesResponse(await escalate_complaint_controller(
         complaint_id,
         reason=payload.reason
-    )
+    ))
 
 
+# ------------------ Wrong duplicate match: make the report a complaint of its own ------------------
+@router.post("/{complaint_id}/not-duplicate", response_model=ComplaintResponse, dependencies=[Depends(roles_required(["AM","CM","SDO"]))])
+async def unlink_duplicate(complaint_id: str):
+    return JSONBytesResponse(await unlink_duplicate_controller(complaint_id))
 
 
 # ------------------ Forward to JE (CM only) ------------------
 @router.post("/{complaint_id}/forward-to-je", dependencies=[Depends(roles_required(["CM"]))])
 async def forward_to_je(complaint_id: str, je_id: str, current_user: User = Depends(get_current_user)):
-    return await forward_to_je_controller(complaint_id, cm_id=current_user.id, je_id=je_id)
+    return JSONBytesResponse(await forward_to_je_controller(complaint_id, cm_id=current_user.id, je_id=je_id))
 
 # ------------------ Create Contractor (JE only) ------------------
 @router.post("/create-contractor", dependencies=[Depends(roles_required(["JE"]))])
@@ -243,7 +481,7 @@ async def create_contractor(payload: ContractorCreate, current_user: User = Depe
 # ------------------ Assign Contractor (JE only) ------------------
 @router.post("/{complaint_id}/assign-contractor", dependencies=[Depends(roles_required(["JE"]))])
 async def assign_contractor(complaint_id: str, contractor_id: str, current_user: User = Depends(get_current_user)):
-    return await assign_contractor_controller(complaint_id, contractor_id, je_id=current_user.id)
+    return JSONBytesResponse(await assign_contractor_controller(complaint_id, contractor_id, je_id=current_user.id))
 
 # ------------------ Contractor submits proof ------------------
 @router.post("/{complaint_id}/je-submit-proof", dependencies=[Depends(roles_required(["JE"]))])
@@ -252,32 +490,34 @@ async def je_submit_proof(
     files: List[UploadFile] = File(...),
     current_user: User = Depends(get_current_user)
 ):
-    upload_folder = f"uploads/{complaint_id}"
-    os.makedirs(upload_folder, exist_ok=True)
-
-    proof_files = []
-    for f in files:
-        unique_filename = f"{uuid.uuid4()}_{f.filename}"
-        file_path = os.path.join(upload_folder, unique_filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(f.file, buffer)
-
-        proof_files.append(
-            ProofFile(file_name=f.filename, file_url=f"/uploads/{complaint_id}/{unique_filename}")
-        )
+    proof_files = await save_uploads(files, complaint_id)
 
     # Call controller with role="JE"
-    return await submit_proof_controller(
-        complaint_id=complaint_id,
-        submitter_id=current_user.id,
-        proof_files=proof_files,
-        role="JE"
-    )
+    try:
+        complaint_data = await submit_proof_controller(
+            complaint_id=complaint_id,
+            submitter_id=current_user.id,
+            proof_files=proof_files,
+            role="JE"
+        )
+    except BaseException:
+        await release_blobs(f.sha256 for f in proof_files)
+        raise
+    schedule_derivatives(proof_files)
+    return JSONBytesResponse(complaint_data)
 
 
 
 # ------------------ JE verifies contractor work ------------------
 @router.post("/{complaint_id}/je-verify-contractor", dependencies=[Depends(roles_required(["JE"]))])
 async def je_verify_contractor(complaint_id: str, payload: VerifyActionRequest, current_user: User = Depends(get_current_user)):
-    return await je_verify_contractor_controller(complaint_id, je_id=current_user.id, action=payload.action, note=payload.note)
+    return JSONBytesResponse(await je_verify_contractor_controller(complaint_id, je_id=current_user.id, action=payload.action, note=payload.note))
 
+
+
+# =======================
+# Complaint detail (keep last: the catch-all path would shadow fixed GET routes)
+# =======================
+@router.get("/{complaint_id}", response_model=ComplaintResponse)
+async def get_complaint(complaint_id: str):
+    return JSONBytesResponse(await get_complaint_by_id_controller(complaint_id))
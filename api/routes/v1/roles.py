@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from api.db.models.role_permission import RolePermission, Permission
-from api.core.permissions import permission_required
+from api.core.permissions import permission_required, invalidate_permissions
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
@@ -17,6 +17,7 @@ async def create_role_controller(payload: "RoleCreateRequest") -> "RoleResponse"
     # Create role in DB
     rp = RolePermission(role=role_name, permissions=payload.permissions)
     await rp.insert()  # MongoDB assigns rp.id automatically
+    await invalidate_permissions()
 
     # Return RoleResponse including id
     return RoleResponse(
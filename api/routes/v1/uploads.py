@@ -0,0 +1,161 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from bson import ObjectId
+import os, re
+
+from api.db.models.user import User
+from api.db.models.complaint import Complaint
+from api.core.deps import get_current_user
+from api.core.permissions import has_permission
+from api.core.uploads import UPLOAD_ROOT, DERIVATIVE_SIZES, blob_path, derivative_path
+from api.core.derivatives import ensure_derivatives
+
+# served at the unversioned /uploads/... paths stored in ProofFile.file_url
+router = APIRouter(prefix="/uploads", tags=["Uploads"])
+
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# roles that oversee every complaint; anyone else must be linked to the complaint
+FILE_VIEWER_ROLES = {"ADMIN", "GM", "MANAGER", "SDO", "AM"}
+
+# blobs never change under a URL, so clients and proxies may keep them for good;
+# "private" because each response depends on the caller being authorized
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+LEGACY_CACHE_CONTROL = "private, max-age=3600"
+
+# Optional internal location of a front proxy (e.g. nginx `internal;` alias of
+# UPLOAD_DIR). When set, the file body is handed off with X-Accel-Redirect.
+ACCEL_REDIRECT_PREFIX = os.getenv("UPLOADS_ACCEL_REDIRECT", "").rstrip("/")
+
+_FILE_OWNER_PROJECTION = {
+    "user_id": 1,
+    "forwarded_to_je": 1,
+    "assigned_by_je": 1,
+    "verified_by_je": 1,
+    "assigned_contractor_id": 1,
+    "assignments.assigned_user_id": 1,
+    "assignments.assigned_by": 1,
+    "assignments.worker_id": 1,
+    "assignments.proof_files": 1,
+    "evidence_files": 1,
+}
+
+
+def _legacy_path(complaint_id: str, name: str) -> str:
+    # files stored before the blob store: uploads/<complaint_id>/<uuid>_<name>
+    return os.path.join(UPLOAD_ROOT, os.path.basename(complaint_id), os.path.basename(name))
+
+
+def _find_file(doc: dict, file_url: str) -> Optional[dict]:
+    for f in doc.get("evidence_files") or []:
+        if f.get("file_url") == file_url:
+            return f
+    for a in doc.get("assignments") or []:
+        for f in a.get("proof_files") or []:
+            if f.get("file_url") == file_url:
+                return f
+    return None
+
+
+def _is_linked(doc: dict, user_id: str) -> bool:
+    linked = {
+        doc.get("user_id"), doc.get("forwarded_to_je"), doc.get("assigned_by_je"),
+        doc.get("verified_by_je"), doc.get("assigned_contractor_id"),
+    }
+    for a in doc.get("assignments") or []:
+        linked.update((a.get("assigned_user_id"), a.get("assigned_by"), a.get("worker_id")))
+    return user_id in {str(v) for v in linked if v}
+
+
+async def _authorize(complaint_id: str, file_url: str, user: User) -> dict:
+    """Return the stored file entry if it belongs to the complaint and the user may see it."""
+    if not ObjectId.is_valid(complaint_id):
+        raise HTTPException(status_code=404, detail="File not found")
+    doc = await Complaint.get_pymongo_collection().find_one(
+        {
+            "_id": ObjectId(complaint_id),
+            "$or": [{"evidence_files.file_url": file_url}, {"assignments.proof_files.file_url": file_url}],
+        },
+        _FILE_OWNER_PROJECTION,
+    )
+    if not doc:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not (
+        user.role.upper() in FILE_VIEWER_ROLES
+        or _is_linked(doc, str(user.id))
+        or await has_permission(user, "complaint", "read")
+    ):
+        raise HTTPException(status_code=403, detail="Not allowed to view this file")
+    return _find_file(doc, file_url) or {}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@router.get("/{complaint_id}/{name}")
+async def get_upload(
+    request: Request,
+    complaint_id: str,
+    name: str,
+    variant: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Serve a proof/evidence file of a complaint. Content-addressed files get a
+    strong ETag (their SHA-256), answer If-None-Match with 304 and are
+    cacheable forever; all files support Range requests.
+    """
+    if variant is not None and variant not in DERIVATIVE_SIZES:
+        raise HTTPException(status_code=400, detail="Unknown variant")
+
+    entry = await _authorize(complaint_id, f"/uploads/{complaint_id}/{name}", current_user)
+    media_type = entry.get("file_type")
+    headers = {}
+
+    if not SHA256_RE.match(name):
+        path = _legacy_path(complaint_id, name)
+        headers["Cache-Control"] = LEGACY_CACHE_CONTROL
+    else:
+        path = blob_path(name)
+        etag = f'"{name}"'
+        if variant is not None:
+            try:
+                await ensure_derivatives(name, [variant])
+                path = derivative_path(name, variant)
+                etag = f'"{name}-{variant}"'
+                media_type = "image/jpeg"
+            except Exception:
+                pass  # not a renderable image; serve the original
+        headers["ETag"] = etag
+        headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if ACCEL_REDIRECT_PREFIX:
+        relative = os.path.relpath(path, UPLOAD_ROOT).replace(os.sep, "/")
+        headers["X-Accel-Redirect"] = f"{ACCEL_REDIRECT_PREFIX}/{relative}"
+        return Response(headers=headers, media_type=media_type)
+
+    # Starlette handles Range/If-Range and uses the ASGI pathsend extension
+    # (sendfile in the server) when it is available
+    return FileResponse(
+        path,
+        headers=headers,
+        media_type=media_type,
+        filename=entry.get("file_name"),
+        content_disposition_type="inline",
+        stat_result=stat_result,
+    )
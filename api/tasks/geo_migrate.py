@@ -0,0 +1,71 @@
+# api/tasks/geo_migrate.py
+import asyncio
+from pymongo import UpdateOne
+from api.core.geohash import encode as encode_geohash
+from api.db.models.complaint import Complaint
+
+MIGRATE_BATCH_SIZE = 1000
+
+# legacy {lat, lng} -> GeoJSON Point, computed server-side
+_TO_POINT = [{"$set": {"location": {
+    "type": "Point",
+    "coordinates": [{"$toDouble": "$location.lng"}, {"$toDouble": "$location.lat"}],
+}}}]
+
+
+async def migrate_locations(batch_size: int = MIGRATE_BATCH_SIZE) -> int:
+    """
+    Rewrite complaint locations stored as {lat, lng} into GeoJSON Points,
+    walking _id order one batch at a time so each write stays small and the
+    scan never restarts. Safe to re-run; returns the number of documents changed.
+
+    The location_status 2dsphere index reads {lat, lng} as a legacy pair in
+    the wrong order (or rejects it), so run this before relying on geo queries
+    and restart the API afterwards if the index build was reported as failed.
+    """
+    collection = Complaint.get_pymongo_collection()
+    legacy = {"location.lat": {"$exists": True}, "location.lng": {"$exists": True}}
+    migrated, last_id = 0, None
+    while True:
+        query = {**legacy, "_id": {"$gt": last_id}} if last_id else legacy
+        rows = await collection.find(query, {"_id": 1}).sort("_id", 1).limit(batch_size).to_list()
+        if not rows:
+            return migrated
+        ids = [r["_id"] for r in rows]
+        result = await collection.update_many({"_id": {"$in": ids}, **legacy}, _TO_POINT)
+        migrated += result.modified_count
+        last_id = ids[-1]
+
+
+async def backfill_geohashes(batch_size: int = MIGRATE_BATCH_SIZE) -> int:
+    """
+    Set geohash on complaints that have a GeoJSON location but none yet
+    (created before map clustering); same _id walk as migrate_locations.
+    """
+    collection = Complaint.get_pymongo_collection()
+    pending = {"location.coordinates": {"$exists": True}, "geohash": None}
+    filled, last_id = 0, None
+    while True:
+        query = {**pending, "_id": {"$gt": last_id}} if last_id else pending
+        rows = await collection.find(query, {"location.coordinates": 1}).sort("_id", 1).limit(batch_size).to_list()
+        if not rows:
+            return filled
+        ops = []
+        for row in rows:
+            lng, lat = row["location"]["coordinates"]
+            ops.append(UpdateOne({"_id": row["_id"], "geohash": None}, {"$set": {"geohash": encode_geohash(lat, lng)}}))
+        result = await collection.bulk_write(ops, ordered=False)
+        filled += result.modified_count
+        last_id = rows[-1]["_id"]
+
+
+if __name__ == "__main__":
+    # python -m api.tasks.geo_migrate
+    from api.db.mongo import init_db
+
+    async def _main():
+        await init_db()
+        print(f"📍 Migrated {await migrate_locations()} complaint location(s) to GeoJSON")
+        print(f"🗺️  Set geohash on {await backfill_geohashes()} complaint(s)")
+
+    asyncio.run(_main())
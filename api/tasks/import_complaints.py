@@ -0,0 +1,41 @@
+# api/tasks/import_complaints.py
+import argparse
+import asyncio
+import orjson
+from typing import AsyncIterator
+
+from api.controllers.import_ctrl import import_complaints, IMPORT_FORMATS, IMPORT_BATCH_SIZE
+
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+async def _file_chunks(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as fh:
+        while True:
+            chunk = await asyncio.to_thread(fh.read, READ_CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+if __name__ == "__main__":
+    # python -m api.tasks.import_complaints complaints.ndjson [--format csv] [--report report.json]
+    from api.db.mongo import init_db
+
+    parser = argparse.ArgumentParser(description="Bulk-create complaints from an NDJSON or CSV file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="defaults from the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--report", help="write the full JSON report here")
+    args = parser.parse_args()
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    async def _main():
+        await init_db()
+        report = await import_complaints(_file_chunks(args.path), fmt, batch_size=args.batch_size)
+        print(f"Imported {report['inserted']} of {report['total']} row(s), {report['failed']} failed")
+        if args.report:
+            with open(args.report, "wb") as fh:
+                fh.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+
+    asyncio.run(_main())
@@ -1,43 +1,165 @@
 # api/tasks/sla_monitor.py
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from collections import Counter
 from datetime import datetime
-from api.db.models.complaint import Complaint, AssignmentStatus, ComplaintStatus
-from api.db.models.complaint import Worker
+from typing import Dict, List
+import os
 from bson import ObjectId
+from pymongo import UpdateOne
+from api.db.models.complaint import Complaint, AssignmentStatus, ComplaintStatus, SLA_BREACH_REASON
+from api.controllers.complaint_ctrl import update_worker_load, bulk_update_worker_loads
+from api.controllers.stats_ctrl import record_sla_breaches
+from api.controllers.map_ctrl import invalidate_map_tiles
+from api.tasks.worker_load import reconcile_worker_loads
+from api.core.search_index import load_ngram_index
+from api.core.dedup import load_duplicate_index
 
-async def handle_sla_breach(complaint, assignment, idx):
-    # simple policy: mark assignment escalated and free worker; notify AM
-    assignment.status = AssignmentStatus.ESCALATED
-    assignment.escalate_reason = "SLA breached"
-    # free worker if exists
-    if assignment.worker_id:
-        try:
-            w = await Worker.get(ObjectId(assignment.worker_id))
-            if w:
-                w.available = True
-                await w.save()
-        except Exception:
-            pass
-    complaint.status = ComplaintStatus.ESCALATED
-    complaint.updated_at = datetime.utcnow()
-    await complaint.save()
+SLA_BATCH_SIZE = 500
+# exact-time escalation is done by api.tasks.sla_scheduler; this scan is the safety net
+SLA_SWEEP_MINUTES = int(os.getenv("SLA_SWEEP_MINUTES", "5"))
+# search and duplicate indexes: picks up complaints created or closed by other worker processes
+SEARCH_RELOAD_MINUTES = int(os.getenv("SEARCH_RELOAD_MINUTES", "10"))
+
+def _breach_filter(complaint_id, idx: int) -> Dict:
+    # re-check the state in the filter so a transition that landed after the scan wins
+    return {
+        "_id": complaint_id,
+        "current_assignment_index": idx,
+        "current_assignment_status": AssignmentStatus.ASSIGNED.value,
+    }
+
+def _breach_set(idx: int, now: datetime) -> Dict:
+    return {"$set": {
+        f"assignments.{idx}.status": AssignmentStatus.ESCALATED.value,
+        f"assignments.{idx}.escalate_reason": SLA_BREACH_REASON,
+        "current_assignment_status": AssignmentStatus.ESCALATED.value,
+        "status": ComplaintStatus.ESCALATED.value,
+        "updated_at": now,
+    }}
+
+async def escalate_if_due(complaint_id: str, idx: int) -> bool:
+    """
+    Escalate one complaint if assignment idx is still current, still waiting
+    on the assignee and past its deadline. Safe to call from several
+    processes: only the call that flips the status releases the worker.
+    """
+    now = datetime.utcnow()
+    query = _breach_filter(ObjectId(complaint_id), idx)
+    query["current_sla_deadline"] = {"$lte": now}
+    before = await Complaint.get_pymongo_collection().find_one_and_update(
+        query,
+        _breach_set(idx, now),
+        projection={
+            "assignments": {"$slice": [idx, 1]},
+            "status": 1, "created_at": 1, "division": 1, "complaint_category": 1, "geohash": 1,
+        },
+    )
+    if not before:
+        return False
+    await record_sla_breaches([before])
+    invalidate_map_tiles(before.get("geohash"))
+    worker_id = (before.get("assignments") or [{}])[0].get("worker_id")
+    if worker_id:
+        await update_worker_load(worker_id, -1, available=True)
     # placeholder: notify AM for manual reassign or auto-assign contractor
     # await notify_ams_sla_breach(complaint, assignment)
+    return True
+
+async def handle_sla_breach(complaint, assignment, idx):
+    # simple policy: mark assignment escalated and free worker; notify AM
+    if await escalate_if_due(str(complaint.id), idx):
+        assignment.status = AssignmentStatus.ESCALATED
+        assignment.escalate_reason = SLA_BREACH_REASON
+        complaint.status = ComplaintStatus.ESCALATED
+        complaint.current_assignment_status = AssignmentStatus.ESCALATED
 
-async def check_sla():
+async def _escalated_ids(rows: List[Dict], stamp: datetime) -> set:
+    """
+    Which of rows this sweep escalated (used only when some updates lost a
+    race). Matched on the sweep's updated_at stamp: the exact-time timer
+    writes the same escalate_reason, so the reason cannot tell them apart.
+    """
+    applied = await Complaint.get_pymongo_collection().find(
+        {"_id": {"$in": [r["_id"] for r in rows]}, "updated_at": stamp}, {"_id": 1}
+    ).to_list()
+    return {r["_id"] for r in applied}
+
+async def check_sla() -> int:
+    """
+    Escalate overdue assignments. Reads only breached complaints through the
+    sla_due index and writes escalations and worker releases in bulk, so the
+    cost follows the number of breaches, not the collection size.
+    Returns the number of complaints escalated.
+    """
+    # one stamp per sweep, at Mongo's millisecond precision, to recognise our own writes
     now = datetime.utcnow()
-    complaints = await Complaint.find_all().to_list()  # simple; optimize as needed
-    for c in complaints:
-        idx = c.current_assignment_index
-        if idx is None or not c.assignments:
-            continue
-        if idx >= len(c.assignments):
-            continue
-        assignment = c.assignments[idx]
-        if assignment.status == AssignmentStatus.ASSIGNED and assignment.sla_deadline and assignment.sla_deadline < now:
-            await handle_sla_breach(c, assignment, idx)
-
-def start_scheduler():
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    escalated = 0
+    while True:
+        rows = await Complaint.aggregate([
+            {"$match": {
+                "current_assignment_status": AssignmentStatus.ASSIGNED.value,
+                "current_sla_deadline": {"$lt": now},
+            }},
+            {"$limit": SLA_BATCH_SIZE},
+            {"$project": {
+                "current_assignment_index": 1,
+                "worker_id": {"$arrayElemAt": ["$assignments.worker_id", "$current_assignment_index"]},
+                # for the stats rollup and map tiles
+                "status": 1, "created_at": 1, "division": 1, "complaint_category": 1, "geohash": 1,
+            }},
+        ]).to_list()
+        if not rows:
+            break
+        fetched = len(rows)
+
+        result = await Complaint.get_pymongo_collection().bulk_write(
+            [UpdateOne(_breach_filter(r["_id"], r["current_assignment_index"]), _breach_set(r["current_assignment_index"], now))
+             for r in rows],
+            ordered=False,
+        )
+        if result.modified_count != len(rows):
+            applied = await _escalated_ids(rows, now)
+            rows = [r for r in rows if r["_id"] in applied]
+
+        releases = Counter(str(r["worker_id"]) for r in rows if r.get("worker_id"))
+        await bulk_update_worker_loads({w: -n for w, n in releases.items()}, available=True)
+        await record_sla_breaches(rows)
+        invalidate_map_tiles(*(r.get("geohash") for r in rows))
+        escalated += len(rows)
+
+        if fetched < SLA_BATCH_SIZE:
+            break
+    return escalated
+
+async def backfill_current_assignment_fields() -> int:
+    """One-off: populate current_assignment_status/current_sla_deadline on older documents."""
+    result = await Complaint.get_pymongo_collection().update_many(
+        {"current_assignment_index": {"$ne": None}, "current_assignment_status": {"$exists": False}},
+        [{"$set": {
+            "current_assignment_status": {"$arrayElemAt": ["$assignments.status", "$current_assignment_index"]},
+            "current_sla_deadline": {"$arrayElemAt": ["$assignments.sla_deadline", "$current_assignment_index"]},
+        }}],
+    )
+    return result.modified_count
+
+def start_scheduler() -> AsyncIOScheduler:
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(lambda: __import__('asyncio').get_event_loop().create_task(check_sla()), "interval", minutes=1)
+    scheduler.add_job(check_sla, "interval", minutes=SLA_SWEEP_MINUTES)
+    scheduler.add_job(reconcile_worker_loads, "interval", hours=1)
+    scheduler.add_job(load_ngram_index, "interval", minutes=SEARCH_RELOAD_MINUTES)
+    scheduler.add_job(load_duplicate_index, "interval", minutes=SEARCH_RELOAD_MINUTES)
     scheduler.start()
+    return scheduler
+
+if __name__ == "__main__":
+    # python -m api.tasks.sla_monitor   (backfills denormalized fields, then runs one scan)
+    import asyncio
+    from api.db.mongo import init_db
+
+    async def _main():
+        await init_db()
+        print(f"Backfilled {await backfill_current_assignment_fields()} complaint(s)")
+        print(f"Escalated {await check_sla()} complaint(s)")
+
+    asyncio.run(_main())
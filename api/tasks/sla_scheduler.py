@@ -0,0 +1,126 @@
+# api/tasks/sla_scheduler.py
+import asyncio
+import heapq
+import traceback
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from api.db.models.complaint import Complaint, AssignmentStatus
+
+OnDue = Callable[[str, int], Awaitable[bool]]
+
+
+class SlaDeadlineScheduler:
+    """
+    Min-heap of upcoming SLA deadlines that fires the breach handler at the
+    exact deadline instead of waiting for the next polling sweep.
+
+    Entries are invalidated lazily: _entries holds the live (deadline, index)
+    per complaint and heap items that no longer match it are skipped on pop.
+    Each process only knows deadlines it loaded at startup or set itself, so
+    the periodic check_sla sweep still covers assignments made elsewhere.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, str, int]] = []
+        self._entries: Dict[str, Tuple[datetime, int]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._on_due: Optional[OnDue] = None
+        self._firing: Set[asyncio.Task] = set()  # strong refs so due handlers aren't collected mid-run
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------ registration ------------------
+    def schedule(self, complaint_id: str, deadline: datetime, idx: int):
+        entry = (deadline, idx)
+        if self._entries.get(complaint_id) == entry:
+            return
+        self._entries[complaint_id] = entry
+        heapq.heappush(self._heap, (deadline, complaint_id, idx))
+        if self._heap[0][1] == complaint_id:
+            self._wakeup.set()  # new earliest deadline: re-arm the timer
+
+    def cancel(self, complaint_id: str):
+        self._entries.pop(complaint_id, None)
+
+    def track(self, complaint: Complaint):
+        """Schedule or cancel a complaint from its current assignment after a transition."""
+        idx = complaint.current_assignment_index
+        current = (
+            complaint.assignments[idx]
+            if idx is not None and 0 <= idx < len(complaint.assignments or [])
+            else None
+        )
+        if current and current.status == AssignmentStatus.ASSIGNED and current.sla_deadline:
+            self.schedule(str(complaint.id), current.sla_deadline, idx)
+        else:
+            self.cancel(str(complaint.id))
+
+    async def load(self):
+        """Fill the heap with every pending deadline (uses the sla_due index)."""
+        rows = await Complaint.aggregate([
+            {"$match": {
+                "current_assignment_status": AssignmentStatus.ASSIGNED.value,
+                "current_sla_deadline": {"$ne": None},
+            }},
+            {"$project": {"current_assignment_index": 1, "current_sla_deadline": 1}},
+        ]).to_list()
+        for row in rows:
+            self.schedule(str(row["_id"]), row["current_sla_deadline"], row["current_assignment_index"])
+        print(f"⏱️  SLA scheduler loaded {len(rows)} deadline(s)")
+
+    # ------------------ timer loop ------------------
+    def start(self, on_due: OnDue):
+        self._on_due = on_due
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._firing):
+            task.cancel()
+        await asyncio.gather(*self._firing, return_exceptions=True)
+        self._firing.clear()
+
+    def _is_live(self, item: Tuple[datetime, str, int]) -> bool:
+        deadline, complaint_id, idx = item
+        return self._entries.get(complaint_id) == (deadline, idx)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            while self._heap and not self._is_live(self._heap[0]):
+                heapq.heappop(self._heap)
+
+            timeout = None
+            if self._heap:
+                deadline, complaint_id, idx = self._heap[0]
+                timeout = (deadline - datetime.utcnow()).total_seconds()
+                if timeout <= 0:
+                    heapq.heappop(self._heap)
+                    self._entries.pop(complaint_id, None)
+                    task = asyncio.get_event_loop().create_task(self._fire(complaint_id, idx))
+                    self._firing.add(task)
+                    task.add_done_callback(self._firing.discard)
+                    continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, complaint_id: str, idx: int):
+        try:
+            await self._on_due(complaint_id, idx)
+        except Exception:
+            traceback.print_exc()
+
+
+sla_scheduler = SlaDeadlineScheduler()
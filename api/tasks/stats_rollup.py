@@ -0,0 +1,75 @@
+# api/tasks/stats_rollup.py
+import asyncio
+from api.db.models.complaint import Complaint, ComplaintStatus, SLA_BREACH_REASON
+from api.db.models.complaint_stat import ComplaintStat
+
+
+def _rollup_pipeline() -> list:
+    current = {"$arrayElemAt": ["$assignments", "$current_assignment_index"]}
+    is_closed = {"$eq": ["$status", ComplaintStatus.CLOSED.value]}
+    closed_at = {"$ifNull": [{"$let": {"vars": {"ca": current}, "in": "$$ca.verified_at"}}, "$updated_at"]}
+    return [
+        {"$project": {
+            "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            "division": {"$ifNull": ["$division", None]},
+            "category": "$complaint_category",
+            "status": 1,
+            "breaches": {"$size": {"$filter": {
+                "input": {"$ifNull": ["$assignments", []]},
+                "cond": {"$eq": ["$$this.escalate_reason", SLA_BREACH_REASON]},
+            }}},
+            "closed": {"$cond": [is_closed, 1, 0]},
+            "close_seconds": {"$cond": [
+                is_closed, {"$divide": [{"$subtract": [closed_at, "$created_at"]}, 1000]}, 0,
+            ]},
+        }},
+        {"$group": {
+            "_id": {"day": "$day", "division": "$division", "category": "$category", "status": "$status"},
+            "count": {"$sum": 1},
+            "breaches": {"$sum": "$breaches"},
+            "closed": {"$sum": "$closed"},
+            "close_seconds": {"$sum": "$close_seconds"},
+        }},
+        {"$group": {
+            "_id": {"day": "$_id.day", "division": "$_id.division", "category": "$_id.category"},
+            "statuses": {"$push": {"k": "$_id.status", "v": "$count"}},
+            "sla_breaches": {"$sum": "$breaches"},
+            "closed": {"$sum": "$closed"},
+            "close_seconds": {"$sum": "$close_seconds"},
+        }},
+        {"$project": {
+            "_id": 0,
+            "day": "$_id.day",
+            "division": "$_id.division",
+            "category": "$_id.category",
+            "statuses": {"$arrayToObject": "$statuses"},
+            "sla_breaches": 1,
+            "closed": 1,
+            "close_seconds": 1,
+        }},
+        # replaces the collection in one step and keeps its indexes
+        {"$out": ComplaintStat.Settings.name},
+    ]
+
+
+async def rebuild_stats() -> int:
+    """
+    Recompute the dashboard rollup from the complaints collection with one
+    aggregation. Returns the number of buckets written.
+
+    Transitions recorded while the pipeline runs may be lost; run it when
+    traffic is low or accept the drift until the next rebuild.
+    """
+    await Complaint.get_pymongo_collection().aggregate(_rollup_pipeline(), allowDiskUse=True)
+    return await ComplaintStat.get_pymongo_collection().count_documents({})
+
+
+if __name__ == "__main__":
+    # python -m api.tasks.stats_rollup
+    from api.db.mongo import init_db
+
+    async def _main():
+        await init_db()
+        print(f"📊 Rebuilt {await rebuild_stats()} stats bucket(s)")
+
+    asyncio.run(_main())
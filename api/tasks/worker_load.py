@@ -0,0 +1,60 @@
+# api/tasks/worker_load.py
+import asyncio
+from typing import Dict
+from pymongo import UpdateOne
+from api.db.models.complaint import Complaint, ComplaintStatus, Worker, HELD_ASSIGNMENT_STATUSES
+
+
+async def _held_assignment_counts() -> Dict[str, int]:
+    """
+    Recount held tasks per worker: the current assignment of every complaint
+    that is still being worked on. Earlier assignments were replaced and
+    closed/escalated complaints hold nobody, whatever their stored status.
+    """
+    rows = await Complaint.aggregate([
+        {"$match": {
+            "status": {"$nin": [ComplaintStatus.CLOSED.value, ComplaintStatus.ESCALATED.value]},
+            "current_assignment_index": {"$ne": None},
+        }},
+        {"$project": {"current": {"$arrayElemAt": ["$assignments", "$current_assignment_index"]}}},
+        {"$match": {
+            "current.status": {"$in": HELD_ASSIGNMENT_STATUSES},
+            "current.worker_id": {"$type": "string"},
+        }},
+        {"$group": {"_id": "$current.worker_id", "count": {"$sum": 1}}},
+    ]).to_list()
+    return {row["_id"]: row["count"] for row in rows}
+
+
+async def reconcile_worker_loads() -> int:
+    """
+    Repair drift in Worker.active_tasks (crashes between the complaint save
+    and the counter update, manual edits). Returns the number of workers fixed.
+
+    A transition landing between the recount and the write can be overwritten;
+    the next run corrects it.
+    """
+    counts = await _held_assignment_counts()
+    workers = await Worker.aggregate([{"$project": {"active_tasks": 1}}]).to_list()
+
+    ops = []
+    for w in workers:
+        expected = counts.get(str(w["_id"]), 0)
+        if w.get("active_tasks") != expected:
+            ops.append(UpdateOne({"_id": w["_id"]}, {"$set": {"active_tasks": expected}}))
+
+    if ops:
+        await Worker.get_pymongo_collection().bulk_write(ops, ordered=False)
+        print(f"🔧 Reconciled active_tasks for {len(ops)} worker(s)")
+    return len(ops)
+
+
+if __name__ == "__main__":
+    # python -m api.tasks.worker_load
+    from api.db.mongo import init_db
+
+    async def _main():
+        await init_db()
+        await reconcile_worker_loads()
+
+    asyncio.run(_main())
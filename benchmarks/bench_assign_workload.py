@@ -0,0 +1,100 @@
+"""
+Micro-benchmark: worker workload lookup used by POST /complaint/{id}/assign.
+
+Compares the old per-worker loop (one find().to_list() per worker) with what
+the route does now: one read of the workers, whose load is the active_tasks
+counter kept by the workflow transitions. Grows the worker and complaint
+counts; the counter read should stay flat. Runs against a scratch database
+next to MONGO_DB and drops it afterwards.
+
+    python -m benchmarks.bench_assign_workload
+"""
+import asyncio
+import os
+import random
+import time
+
+from pymongo import AsyncMongoClient
+from beanie import init_beanie
+
+from api.db.models.complaint import Complaint, Worker, Assignment, ComplaintStatus
+from api.tasks.worker_load import _held_assignment_counts, reconcile_worker_loads
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+BENCH_DB = os.getenv("MONGO_DB", "grievance") + "_bench"
+SIZES = [(10, 1_000), (50, 10_000), (200, 50_000)]
+REPEAT = 5
+# what the old loop treated as active
+OLD_EXCLUDED_STATUSES = [ComplaintStatus.CLOSED, ComplaintStatus.ESCALATED]
+
+
+async def _old_counts(worker_ids):
+    counts = {}
+    for wid in worker_ids:
+        docs = await Complaint.find(
+            {"assignments.worker_id": wid, "status": {"$nin": OLD_EXCLUDED_STATUSES}}
+        ).to_list()
+        counts[wid] = len(docs)
+    return counts
+
+
+async def _counter_read(worker_ids):
+    # the assign route's read: every worker with its counter
+    return {str(w.id): w.active_tasks for w in await Worker.find_all().to_list()}
+
+
+async def _seed(n_workers: int, n_complaints: int):
+    await Worker.delete_all()
+    await Complaint.delete_all()
+    workers = [Worker(full_name=f"w{i}", role="plumber") for i in range(n_workers)]
+    await Worker.insert_many(workers)
+    worker_ids = [str(w.id) for w in await Worker.find_all().to_list()]
+    statuses = list(ComplaintStatus)
+    batch = []
+    for i in range(n_complaints):
+        wid = random.choice(worker_ids)
+        batch.append(Complaint(
+            full_name="bench", mobile_number="9999999999", complaint_category="water",
+            complaint_subject="leak", detailed_description="x" * 200, complete_address="somewhere",
+            status=random.choice(statuses),
+            assignments=[Assignment(worker_id=wid, assigned_user_id=wid)],
+            current_assignment_index=0,
+        ))
+        if len(batch) == 1000:
+            await Complaint.insert_many(batch)
+            batch = []
+    if batch:
+        await Complaint.insert_many(batch)
+    # the transitions would have kept the counters; set them as the repair job does
+    await reconcile_worker_loads()
+    return worker_ids
+
+
+async def _time(fn, *args):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        await fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def main():
+    client = AsyncMongoClient(MONGO_URI)
+    await init_beanie(database=client[BENCH_DB], document_models=[Complaint, Worker])
+    print(f"{'workers':>8} {'complaints':>11} {'per-worker ms':>14} {'counter ms':>11}")
+    try:
+        for n_workers, n_complaints in SIZES:
+            worker_ids = await _seed(n_workers, n_complaints)
+            held = await _held_assignment_counts()
+            assert await _counter_read(worker_ids) == {w: held.get(w, 0) for w in worker_ids}
+            old_ms = await _time(_old_counts, worker_ids)
+            new_ms = await _time(_counter_read, worker_ids)
+            print(f"{n_workers:>8} {n_complaints:>11} {old_ms:>14.1f} {new_ms:>11.1f}")
+    finally:
+        await client.drop_database(BENCH_DB)
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+"""
+Benchmark: list-endpoint throughput on a 10k-complaint page.
+
+"before" is the previous GET /complaint/ response path: every full document
+through complaint.dict() + field-by-field conversion, then FastAPI's
+response_model validation against List[ComplaintResponse], JSON-mode dump
+and json.dumps.
+"after" is the current one: rows projected by LIST_PROJECTION, shaped by
+list_row_to_dict and encoded once by orjson (api.core.responses.dumps)
+together with the cursor, as get_all_complaints_controller returns them.
+
+Reading and decoding documents from Mongo is left out of both; the
+projected rows are built from the same complaints before timing.
+
+Needs no database:  python -m benchmarks.bench_complaint_serialization
+"""
+import json
+import time
+import warnings
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from api.db.models.complaint import (
+    Complaint, Assignment, ProofFile, AssignmentStatus, ComplaintStatus, GeoPoint, lat_lng,
+)
+from api.input_schema.complaint_schema import ComplaintResponse
+from api.controllers.complaint_ctrl import LIST_PROJECTION, list_row_to_dict
+from api.core.responses import dumps
+
+PAGE_SIZE = 10_000
+REPEAT = 3
+
+
+def _legacy_complaint_to_dict(complaint: Complaint) -> Dict:
+    data = complaint.dict()
+    data["id"] = str(complaint.id)
+    data["location"] = lat_lng(data.get("location"))  # the API has always answered {lat, lng}
+    for field in ["created_at", "updated_at"]:
+        if getattr(complaint, field, None):
+            data[field] = getattr(complaint, field).isoformat()
+    assignments = []
+    for a in complaint.assignments or []:
+        assignment_dict = a.dict()
+        for oid_field in ["worker_id", "assigned_by", "verified_by", "assigned_user_id"]:
+            if assignment_dict.get(oid_field):
+                assignment_dict[oid_field] = str(assignment_dict[oid_field])
+        for dt_field in ["assigned_at", "submitted_at", "verified_at", "sla_deadline"]:
+            if assignment_dict.get(dt_field):
+                assignment_dict[dt_field] = assignment_dict[dt_field].isoformat()
+        assignments.append(assignment_dict)
+    data["assignments"] = assignments
+    current_assignment = (
+        assignments[complaint.current_assignment_index]
+        if complaint.current_assignment_index is not None and assignments
+        else None
+    )
+    data["current_assignment"] = current_assignment
+    data["user_id"] = current_assignment.get("assigned_user_id") if current_assignment else None
+    return data
+
+
+def _make_page(n: int) -> List[Complaint]:
+    now = datetime.utcnow()
+    page = []
+    for i in range(n):
+        assignments = [
+            Assignment(
+                group="Worker",
+                worker_id=str(ObjectId()),
+                assigned_by=str(ObjectId()),
+                assigned_user_id=str(ObjectId()),
+                assigned_at=now,
+                status=AssignmentStatus.VERIFIED_BY_JE,
+                sla_deadline=now + timedelta(hours=4),
+                proof_files=[ProofFile(file_name=f"p{k}.png", file_url=f"/uploads/x/p{k}.png") for k in range(2)],
+                submitted_at=now,
+                verified_at=now,
+            )
+            for _ in range(3)
+        ]
+        page.append(Complaint.model_construct(
+            id=ObjectId(),
+            full_name=f"Citizen {i}",
+            mobile_number="9876543210",
+            complaint_category="water",
+            complaint_subject="Burst pipe",
+            detailed_description="Water leaking from main line near the market. " * 4,
+            location=GeoPoint(coordinates=[88.36, 22.57]),
+            complete_address="12 Market Road",
+            status=ComplaintStatus.VERIFIED_BY_JE,
+            assignments=assignments,
+            current_assignment_index=2,
+            created_at=now,
+            updated_at=now,
+        ))
+    return page
+
+
+def before(page: List[Complaint]) -> bytes:
+    adapter = TypeAdapter(List[ComplaintResponse])
+    data = [_legacy_complaint_to_dict(c) for c in page]
+    validated = adapter.validate_python(data)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+
+def _projected_row(complaint: Complaint) -> Dict:
+    """What the $project stage of the list aggregation hands back for one complaint."""
+    doc = {"_id": complaint.id, **complaint.model_dump(exclude={"id", "revision_id"})}
+    row = {k: doc.get(k) for k in LIST_PROJECTION if k != "current_assignment"}
+    row["current_assignment"] = doc["assignments"][complaint.current_assignment_index]
+    return row
+
+
+def after(rows: List[Dict]) -> bytes:
+    return dumps({"items": [list_row_to_dict(r) for r in rows], "next_cursor": "cursor"})
+
+
+def _best(fn: Callable, make_input: Callable) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        data = make_input()  # list_row_to_dict reshapes rows in place
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    warnings.filterwarnings("ignore", category=DeprecationWarning)  # legacy .dict() calls
+    page = _make_page(PAGE_SIZE)
+
+    def rows():
+        return [_projected_row(c) for c in page]
+
+    first = json.loads(after(rows()))["items"][0]
+    assert first["current_assignment"]["worker_id"] == page[0].assignments[2].worker_id
+    assert first["location"] == {"lat": 22.57, "lng": 88.36}
+    for name, fn, make_input in (("before", before, lambda: page), ("after", after, rows)):
+        seconds = _best(fn, make_input)
+        print(f"{name:>7}: {seconds * 1000:8.1f} ms/page  {PAGE_SIZE / seconds:10.0f} complaints/s")
+
+
+if __name__ == "__main__":
+    main()
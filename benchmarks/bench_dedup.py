@@ -0,0 +1,74 @@
+"""
+Benchmark: duplicate detection cost per new complaint at intake.
+
+Fills the in-process DuplicateIndex with synthetic open complaints spread
+over a city, then times find() for fresh reports and for reworded copies
+of indexed ones (which should match).
+
+Needs no database:  python -m benchmarks.bench_dedup
+"""
+import random
+import time
+
+from api.core.dedup import DuplicateIndex
+
+DOCS = 50_000
+PROBES = 2_000
+CATEGORIES = ["water", "electricity", "sewage", "roads", "streetlight"]
+COMMON = (
+    "pipe burst leaking water supply no pressure transformer sparking wire fallen pole "
+    "streetlight not working pothole road damaged drain blocked overflow sewage smell "
+    "meter reading wrong bill high voltage fluctuation since morning near market school"
+).split()
+# landmarks, names and other words that differ between unrelated reports
+RARE = ["".join(random.Random(i).choices("abcdefghijklmnoprstuvy", k=random.Random(-i).randint(4, 9))) for i in range(5000)]
+
+
+def _report(rng: random.Random):
+    return {
+        "complaint_category": rng.choice(CATEGORIES),
+        "complaint_subject": " ".join(rng.sample(COMMON, 4)),
+        "detailed_description": " ".join(rng.choices(COMMON, k=15) + rng.choices(RARE, k=15)),
+        "complete_address": f"house {rng.randint(1, 999)}, sector {rng.randint(1, 60)}",
+        "location": {"type": "Point", "coordinates": [77.5 + rng.random() * 0.3, 12.8 + rng.random() * 0.3]},
+    }
+
+
+def _reworded(doc):
+    words = doc["detailed_description"].split()
+    words[3], words[7] = words[7], words[3]
+    words[10] = words[10][:-1]  # typo
+    lng, lat = doc["location"]["coordinates"]
+    return {
+        **doc,
+        "detailed_description": " ".join(words) + " please help",
+        "location": {"type": "Point", "coordinates": [lng + 0.0005, lat]},
+    }
+
+
+def _time(index, docs):
+    matched = 0
+    start = time.perf_counter()
+    for d in docs:
+        if index.find(d["complaint_category"], d["location"], d["complaint_subject"],
+                      d["detailed_description"], d["complete_address"]):
+            matched += 1
+    return (time.perf_counter() - start) / len(docs), matched
+
+
+def main():
+    rng = random.Random(7)
+    index = DuplicateIndex(max_docs=DOCS)
+    docs = [_report(rng) for _ in range(DOCS)]
+    for i, d in enumerate(docs):
+        index.add(f"{i:024x}", d)
+
+    fresh = [_report(rng) for _ in range(PROBES)]
+    copies = [_reworded(d) for d in rng.sample(docs, PROBES)]
+    for name, probes in (("fresh", fresh), ("reworded", copies)):
+        per_call, matched = _time(index, probes)
+        print(f"{name:>9}: {per_call * 1e6:8.1f} us/complaint, {matched}/{len(probes)} matched")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: per-request token verification cost.
+
+"jose" and "hs256" are full verifications (base64, JSON, HMAC, claim
+checks) with each JWT_BACKEND. "cached" is decode_access_token on a token
+already verified, which is what a dashboard polling with the same token
+pays per request.
+
+Needs no database:  python -m benchmarks.bench_jwt_decode
+"""
+import time
+
+from jose import jwt as jose_jwt
+
+from api.core import auth
+
+ROUNDS = 20_000
+
+
+def _per_call(fn, token) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(token)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def main():
+    token = auth.create_access_token({"sub": "650000000000000000000000", "role": "CM"})
+
+    cases = [
+        ("jose", lambda t: jose_jwt.decode(t, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])),
+        ("hs256", auth._decode_hs256),
+    ]
+    auth.token_cache.clear()
+    auth.decode_access_token(token)
+    cases.append(("cached", auth.decode_access_token))
+
+    for name, fn in cases:
+        assert fn(token)["sub"] == "650000000000000000000000"
+        print(f"{name:>7}: {_per_call(fn, token) * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
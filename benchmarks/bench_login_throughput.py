@@ -0,0 +1,68 @@
+"""
+Benchmark: a burst of concurrent password logins.
+
+"inline" verifies on the event loop, as login_official used to. "threads"
+and "processes" go through api.core.passwords (thread pool, or the opt-in
+process pool). For each mode it reports login throughput and the worst
+event-loop stall seen by a 10 ms heartbeat, which is the delay every other
+request would have suffered during the burst.
+
+Needs no database:  BCRYPT_ROUNDS=10 python -m benchmarks.bench_login_throughput
+"""
+import asyncio
+import time
+
+from api.core import passwords
+from api.core.auth import BCRYPT_ROUNDS, hash_password, verify_password
+
+LOGINS = 32
+HEARTBEAT_SECONDS = 0.01
+
+
+async def _heartbeat(stop: asyncio.Event, worst: list):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        worst[0] = max(worst[0], loop.time() - start - HEARTBEAT_SECONDS)
+
+
+async def _inline_login(password: str, hashed: str) -> bool:
+    return verify_password(password, hashed)
+
+
+async def _pooled_login(password: str, hashed: str) -> bool:
+    valid, _ = await passwords.verify_password_async(password, hashed)
+    return valid
+
+
+async def _run(login, hashed: str):
+    stop, worst = asyncio.Event(), [0.0]
+    beat = asyncio.create_task(_heartbeat(stop, worst))
+    await asyncio.sleep(HEARTBEAT_SECONDS * 2)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login("correct horse", hashed) for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    assert all(results)
+    return elapsed, worst[0]
+
+
+async def main():
+    hashed = hash_password("correct horse")
+    print(f"bcrypt rounds={BCRYPT_ROUNDS}, {LOGINS} concurrent logins, {passwords.PASSWORD_WORKERS} workers")
+
+    modes = [("inline", _inline_login, None), ("threads", _pooled_login, False), ("processes", _pooled_login, True)]
+    for name, login, use_processes in modes:
+        if use_processes is not None:
+            passwords.shutdown_password_pool()
+            passwords.PASSWORD_USE_PROCESSES = use_processes
+            await _pooled_login("warm up", hashed)  # start the workers outside the timing
+        elapsed, stall = await _run(login, hashed)
+        print(f"{name:>9}: {LOGINS / elapsed:7.1f} logins/s  worst loop stall {stall * 1000:8.1f} ms")
+    passwords.shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""
+Benchmark: a send-otp flood against the in-memory OTP store.
+
+Sends one OTP to each of FLOOD_PHONES distinct numbers (more than the
+store's cap), then hammers a single number. Checks that the store never
+holds more than its cap, that the single number is throttled after its
+first send, and that verification of a recent OTP still works.
+
+Needs no database:  python -m benchmarks.bench_otp_flood
+"""
+import asyncio
+import time
+
+from api.core.otp_store import MemoryOtpStore, OtpThrottled, OTP_OK
+
+MAX_ENTRIES = 10_000
+FLOOD_PHONES = 200_000
+SAME_PHONE_SENDS = 10_000
+
+
+async def main():
+    store = MemoryOtpStore(max_entries=MAX_ENTRIES)
+
+    start = time.perf_counter()
+    peak = 0
+    for i in range(FLOOD_PHONES):
+        await store.issue(f"9{i:09d}", "123456")
+        peak = max(peak, len(store))
+    elapsed = time.perf_counter() - start
+    assert peak <= MAX_ENTRIES, peak
+    print(f"distinct phones: {FLOOD_PHONES / elapsed:10.0f} sends/s  peak entries {peak} (cap {MAX_ENTRIES})")
+
+    throttled = 0
+    start = time.perf_counter()
+    for _ in range(SAME_PHONE_SENDS):
+        try:
+            await store.issue("9999999999", "654321")
+        except OtpThrottled:
+            throttled += 1
+    elapsed = time.perf_counter() - start
+    assert throttled == SAME_PHONE_SENDS - 1, throttled
+    print(f"     same phone: {SAME_PHONE_SENDS / elapsed:10.0f} sends/s  throttled {throttled}/{SAME_PHONE_SENDS}")
+
+    assert await store.consume("9999999999", "654321") == OTP_OK
+    assert await store.consume("9999999999", "654321") != OTP_OK
+    print(f"   final entries: {len(store)}  heap items: {len(store._heap)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
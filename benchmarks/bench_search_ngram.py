@@ -0,0 +1,73 @@
+"""
+Benchmark: the in-process trigram index behind GET /complaint/search.
+
+Fills an NgramIndex with SEARCH_NGRAM_MAX_DOCS synthetic open complaints and
+reports per-query latency (median and p99) for word prefixes, typos and
+queries made only of very common words, plus the time a full rebuild
+takes in the reload's worker thread.
+
+The Mongo paths of the endpoint (exact id/phone lookups, the weighted text
+index and the page fetch) need a database and are not measured here.
+
+Needs no database:  python -m benchmarks.bench_search_ngram
+"""
+import random
+import statistics
+import time
+
+from api.core.search_index import SEARCH_NGRAM_MAX_DOCS, _build_index
+
+PROBES = 2_000
+COMMON = (
+    "pipe burst leaking water supply no pressure transformer sparking wire fallen pole "
+    "streetlight not working pothole road damaged drain blocked overflow sewage smell"
+).split()
+NAMES = ["".join(random.Random(i).choices("abcdeghiklmnoprstuvy", k=random.Random(-i).randint(4, 8))) for i in range(20_000)]
+
+
+def _row(i: int, rng: random.Random):
+    return {
+        "_id": f"{i:024x}",
+        "complaint_subject": " ".join(rng.sample(COMMON, 3)),
+        "full_name": f"{rng.choice(NAMES)} {rng.choice(NAMES)}",
+        "complete_address": f"house {rng.randint(1, 999)}, {rng.choice(NAMES)} nagar",
+        "detailed_description": " ".join(rng.choices(COMMON, k=10) + rng.choices(NAMES, k=5)),
+    }
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(word))
+    return word[:i] + word[i + 1:]
+
+
+def _latencies(index, queries):
+    out = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q)
+        out.append(time.perf_counter() - start)
+    return out
+
+
+def main():
+    rng = random.Random(11)
+    rows = [_row(i, rng) for i in range(SEARCH_NGRAM_MAX_DOCS)]
+
+    start = time.perf_counter()
+    index = _build_index(rows, SEARCH_NGRAM_MAX_DOCS)
+    print(f"  rebuild: {(time.perf_counter() - start) * 1000:8.1f} ms for {len(index)} complaints")
+
+    names = [r["full_name"].split()[0] for r in rng.sample(rows, PROBES)]
+    workloads = {
+        "prefix": [n[:4] for n in names],
+        "typo": [_typo(n, rng) for n in names],
+        "common": [" ".join(rng.sample(COMMON, 2)) for _ in range(PROBES)],
+    }
+    for name, queries in workloads.items():
+        lat = sorted(_latencies(index, queries))
+        p50, p99 = statistics.median(lat), lat[int(len(lat) * 0.99)]
+        print(f"{name:>9}: p50 {p50 * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
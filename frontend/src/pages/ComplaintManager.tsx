@@ -4,9 +4,11 @@ import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { AdminRoleBadge } from "@/components/dashboard/AdminRoleBadge";
 import { useState } from "react";
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import {
-  getComplaints,
+  getComplaint,
+  getComplaintsPage,
+  getComplaintStats,
   assignComplaint,
   AssignComplaintPayload,
   Worker,
@@ -47,15 +49,39 @@ const ComplaintManager = () => {
   const [remarks, setRemarks] = useState<string>("");
   const [newWorkerName, setNewWorkerName] = useState("");
   const [newWorkerRole, setNewWorkerRole] = useState("");
-  const [viewingComplaint, setViewingComplaint] = useState<any | null>(null);
+  const [viewingComplaintId, setViewingComplaintId] = useState<string | null>(null);
   const [availableWorkersMap, setAvailableWorkersMap] = useState<Record<string, Worker[]>>({});
   
 
 
-  // Fetch complaints
-  const { data: complaints = [], isLoading, isError } = useQuery({
+  // Fetch complaints one cursor page at a time
+  const {
+    data: complaintPages,
+    isLoading,
+    isError,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ["complaints"],
-    queryFn: getComplaints,
+    queryFn: ({ pageParam }) => getComplaintsPage(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+  });
+  const complaints = complaintPages?.pages.flatMap((p) => p.items) ?? [];
+
+  // Card totals come from the stats rollup, not from the loaded pages
+  const { data: stats } = useQuery({
+    queryKey: ["complaint-stats"],
+    queryFn: getComplaintStats,
+  });
+  const countFor = (status: string) => stats?.by_status[status] ?? 0;
+
+  // List rows are compact; the opened complaint is loaded in full with its history
+  const { data: viewingComplaint, isLoading: isViewingLoading } = useQuery<any>({
+    queryKey: ["complaint", viewingComplaintId],
+    queryFn: () => getComplaint(viewingComplaintId!),
+    enabled: !!viewingComplaintId,
   });
 
   // Fetch workers
@@ -71,6 +97,8 @@ const ComplaintManager = () => {
     onSuccess: (data) => {
       console.log("Assign API Response:", data);
       queryClient.invalidateQueries({ queryKey: ["complaints"] });
+      queryClient.invalidateQueries({ queryKey: ["complaint-stats"] });
+      queryClient.invalidateQueries({ queryKey: ["complaint", data.complaint.id] });
 
       // Store available workers for this complaint
       setAvailableWorkersMap((prev) => ({
@@ -156,7 +184,7 @@ const ComplaintManager = () => {
     if (!complaint) return;
 
     const payload: AssignComplaintPayload = {
-      group: complaint?.group || "DefaultGroup",
+      group: complaint.current_assignment?.group || "DefaultGroup",
       worker_user_id: selectedWorker,
       remarks: remarks || "No remarks",
       sla_minutes: 240,
@@ -189,7 +217,7 @@ const ComplaintManager = () => {
               <FileText className="h-4 w-4 text-white" />
             </CardHeader>
             <CardContent>
-              <div className="text-2xl font-bold">{complaints.length}</div>
+              <div className="text-2xl font-bold">{stats?.total ?? 0}</div>
             </CardContent>
           </Card>
 
@@ -199,7 +227,7 @@ const ComplaintManager = () => {
               <Users className="h-4 w-4 text-white" />
             </CardHeader>
             <CardContent>
-              <div className="text-2xl font-bold">{complaints.filter((c: any) => c.group).length}</div>
+              <div className="text-2xl font-bold">{countFor("assigned")}</div>
             </CardContent>
           </Card>
 
@@ -209,7 +237,7 @@ const ComplaintManager = () => {
               <UserCheck className="h-4 w-4 text-white" />
             </CardHeader>
             <CardContent>
-              <div className="text-2xl font-bold">{complaints.filter((c: any) => c.assignedTo).length}</div>
+              <div className="text-2xl font-bold">{countFor("forwarded_to_je")}</div>
             </CardContent>
           </Card>
 
@@ -219,7 +247,7 @@ const ComplaintManager = () => {
               <AlertTriangle className="h-4 w-4 text-white" />
             </CardHeader>
             <CardContent>
-              <div className="text-2xl font-bold">{complaints.filter((c: any) => c.status === "escalated").length}</div>
+              <div className="text-2xl font-bold">{countFor("escalated")}</div>
             </CardContent>
           </Card>
         </div>
@@ -305,8 +333,10 @@ const ComplaintManager = () => {
                     <p className="text-xs text-muted-foreground mt-1">
                       Created: {new Date(c.created_at).toLocaleDateString()}
                     </p>
-                    {c.group && <p className="text-xs">Group: <b>{c.group}</b></p>}
-                    {c.assignedTo && <p className="text-xs">JE: <b>{c.assignedTo}</b></p>}
+                    {c.current_assignment?.group && <p className="text-xs">Group: <b>{c.current_assignment.group}</b></p>}
+                    {c.current_assignment?.worker_id && (
+                      <p className="text-xs">Assigned to: <b>{c.current_assignment.worker_id}</b> ({c.current_assignment.status})</p>
+                    )}
 
                     {/* Show assign dropdown only for selected complaint */}
                     {currentComplaintId === c.id && (
@@ -350,7 +380,7 @@ const ComplaintManager = () => {
                     )}
                   </div>
                   <div className="flex gap-2">
-                    <Button size="sm" variant="outline" onClick={() => setViewingComplaint(c)}>
+                    <Button size="sm" variant="outline" onClick={() => setViewingComplaintId(c.id)}>
                       View
                     </Button>
                     <Button
@@ -363,12 +393,23 @@ const ComplaintManager = () => {
                   </div>
                 </div>
               ))}
+              {hasNextPage && (
+                <Button
+                  variant="outline"
+                  className="w-full"
+                  onClick={() => fetchNextPage()}
+                  disabled={isFetchingNextPage}
+                >
+                  {isFetchingNextPage ? "Loading..." : "Load more"}
+                </Button>
+              )}
             </div>
           </CardContent>
         </Card>
 
         {/* Complaint Details Modal */}
-        <Modal open={!!viewingComplaint} onClose={() => setViewingComplaint(null)} title={`Complaint #${viewingComplaint?.id}`}>
+        <Modal open={!!viewingComplaintId} onClose={() => setViewingComplaintId(null)} title={`Complaint #${viewingComplaintId}`}>
+          {isViewingLoading && <p className="text-sm text-muted-foreground">Loading complaint...</p>}
           <p><b>Subject:</b> {viewingComplaint?.complaint_subject}</p>
           <p><b>Description:</b> {viewingComplaint?.detailed_description}</p>
           <p><b>Address:</b> {viewingComplaint?.complete_address}</p>
@@ -376,6 +417,18 @@ const ComplaintManager = () => {
           <p><b>Priority:</b> {viewingComplaint?.priority}</p>
           <p><b>Created At:</b> {new Date(viewingComplaint?.created_at).toLocaleString()}</p>
 
+          {viewingComplaint?.assignments?.length > 0 && (
+            <div className="mt-4 space-y-1">
+              <p><b>Assignment history:</b></p>
+              {viewingComplaint.assignments.map((a: any, idx: number) => (
+                <p key={idx} className="text-xs">
+                  {a.assigned_at ? new Date(a.assigned_at).toLocaleString() : "-"} · {a.group} · {a.status}
+                  {a.escalate_reason ? ` (${a.escalate_reason})` : ""}
+                </p>
+              ))}
+            </div>
+          )}
+
           {viewingComplaint?.current_assignment?.proof_files?.length > 0 && (
             <div className="mt-4 grid grid-cols-2 md:grid-cols-4 gap-3">
               {viewingComplaint.current_assignment.proof_files.map((file: any, idx: number) => (
@@ -42,6 +42,8 @@ export interface ComplaintPayload {
   created_at: string;
   assignments: Assignment[];
   current_assignment?: Assignment;
+  duplicate_of?: string | null; // parent complaint when this report duplicates an open one
+  duplicate_count?: number;
 }
 
 
@@ -94,8 +96,65 @@ export interface CreateWorkerPayload {
 export const createComplaint = (payload: CreateComplaintPayload) =>
   postRequest("/complaint/", payload);
 
-export const getComplaints = () =>
-  getRequest<ComplaintPayload[]>("/complaint/");
+// Compact list row: no assignment history or evidence files (see getComplaint)
+export type ComplaintListItem = Omit<ComplaintPayload, "assignments" | "evidence_files">;
+
+export interface ComplaintPage {
+  items: ComplaintListItem[];
+  next_cursor?: string | null;
+}
+
+export const getComplaintsPage = (cursor?: string | null) =>
+  getRequest<ComplaintPage>(cursor ? `/complaint/?cursor=${encodeURIComponent(cursor)}` : "/complaint/");
+
+// Full complaint with assignment history and evidence files
+export const getComplaint = (complaint_id: string) =>
+  getRequest<ComplaintPayload>(`/complaint/${complaint_id}`);
+
+export interface ComplaintSearchPage {
+  items: ComplaintListItem[];
+  page: number;
+  has_more: boolean;
+  match: "id" | "mobile" | "text" | null;
+}
+
+export const searchComplaints = (q: string, page = 1) =>
+  getRequest<ComplaintSearchPage>(`/complaint/search?q=${encodeURIComponent(q)}&page=${page}`);
+
+export interface ComplaintStats {
+  total: number;
+  by_status: Record<string, number>;
+  by_category: Record<string, number>;
+  by_division: Record<string, number>;
+  by_day: { day: string; count: number }[];
+  sla_breaches: number;
+  closed: number;
+  mean_time_to_close_seconds: number | null;
+}
+
+export const getComplaintStats = () => getRequest<ComplaintStats>("/complaint/stats");
+
+export interface MapCell {
+  geohash: string;
+  lat: number;
+  lng: number;
+  count: number;
+  by_status: Record<string, number>;
+}
+
+export interface MapClusters {
+  precision: number;
+  total: number;
+  cells: MapCell[];
+}
+
+export const getMapClusters = (
+  bounds: { south: number; west: number; north: number; east: number },
+  zoom: number
+) =>
+  getRequest<MapClusters>(
+    `/complaint/map?south=${bounds.south}&west=${bounds.west}&north=${bounds.north}&east=${bounds.east}&zoom=${zoom}`
+  );
 
 // Assign complaint response
 export const assignComplaint = (
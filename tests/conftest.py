@@ -0,0 +1,23 @@
+# tests/conftest.py
+import asyncio
+from unittest import mock
+
+import pytest
+from beanie import init_beanie
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+
+from api.db.models.complaint import Complaint, Worker
+
+
+@pytest.fixture(scope="session", autouse=True)
+def beanie_models():
+    """
+    Bind the document models without a server so they can be built in tests.
+    Nothing connects: the client is lazy and Beanie's buildInfo probe is
+    answered here; tests patch the collection calls they exercise.
+    """
+    client = AsyncMongoClient("mongodb://localhost:27017", connect=False)
+    with mock.patch.object(AsyncDatabase, "command", mock.AsyncMock(return_value={"version": "7.0.0"})):
+        asyncio.run(init_beanie(database=client["test"], document_models=[Complaint, Worker], skip_indexes=True))
+    yield
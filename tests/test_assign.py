@@ -0,0 +1,90 @@
+# tests/test_assign.py
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+import orjson
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from api.controllers import complaint_ctrl
+from api.db.models.complaint import Worker
+from api.input_schema.complaint_schema import AssignRequest, BatchAssignRequest
+from api.routes.v1 import complaint as complaint_routes
+
+
+def _worker(active_tasks: int, max_tasks=3, available=True) -> Worker:
+    return Worker(
+        id=ObjectId(), full_name="Ravi", role="plumber",
+        active_tasks=active_tasks, max_tasks=max_tasks, available=available,
+    )
+
+
+def _assign_route(workers, payload=None):
+    """Runs the assign route; returns the worker the controller was asked for."""
+    controller = mock.AsyncMock(return_value={"id": "c1"})
+    found = SimpleNamespace(to_list=mock.AsyncMock(return_value=workers))
+    with mock.patch.object(Worker, "find_all", return_value=found), \
+            mock.patch.object(complaint_routes, "assign_complaint_controller", controller):
+        response = asyncio.run(complaint_routes.assign_complaint(
+            "c1", payload or AssignRequest(), current_user=SimpleNamespace(id="cm1")
+        ))
+    return controller.call_args.kwargs["worker_user_id"], orjson.loads(response.body)
+
+
+def test_auto_select_picks_least_busy_worker_with_capacity():
+    full, off_duty, busy, idle = _worker(3), _worker(0, available=False), _worker(2), _worker(1)
+
+    chosen, body = _assign_route([full, off_duty, busy, idle])
+
+    assert chosen == str(idle.id)
+    assert [w["available"] for w in body["available_workers"]] == [False, False, True, True]
+
+
+def test_auto_select_counts_uncapped_workers():
+    uncapped = _worker(10, max_tasks=None)
+
+    chosen, _ = _assign_route([_worker(3), uncapped])
+
+    assert chosen == str(uncapped.id)
+
+
+def test_auto_select_without_capacity_is_a_conflict():
+    with pytest.raises(HTTPException) as exc:
+        _assign_route([_worker(3), _worker(0, available=False)])
+
+    assert exc.value.status_code == 409
+
+
+def test_explicit_worker_is_passed_through():
+    busy = _worker(2)
+
+    chosen, _ = _assign_route([_worker(0), busy], AssignRequest(worker_user_id=str(busy.id)))
+
+    assert chosen == str(busy.id)
+
+
+def test_controller_rejects_worker_at_max_tasks():
+    full = _worker(3)
+    with mock.patch.object(Worker, "find_one", mock.AsyncMock(return_value=full)), \
+            mock.patch.object(complaint_ctrl, "_transition", mock.AsyncMock()) as transition:
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(complaint_ctrl.assign_complaint_controller(str(ObjectId()), worker_user_id=str(full.id)))
+
+    assert exc.value.status_code == 409
+    transition.assert_not_called()
+
+
+@pytest.mark.parametrize("sla_minutes", [None, 0, -5])
+def test_assign_requests_need_a_positive_sla(sla_minutes):
+    with pytest.raises(ValidationError):
+        AssignRequest(sla_minutes=sla_minutes)
+    with pytest.raises(ValidationError):
+        BatchAssignRequest(complaint_ids=["c1"], sla_minutes=sla_minutes)
+
+
+def test_assign_requests_default_the_sla():
+    assert AssignRequest().sla_minutes == 240
+    assert BatchAssignRequest(complaint_ids=["c1"]).sla_minutes == 240
@@ -0,0 +1,172 @@
+# tests/test_auth.py
+import base64
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import orjson
+import pytest
+from jose import JWTError, jwt
+
+from api.core import auth
+from api.core.auth import _decode_hs256, decode_access_token
+
+NOW = time.time()
+
+
+def _b64(data) -> str:
+    raw = data if isinstance(data, bytes) else orjson.dumps(data)
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _token(exp_in: float = 600, key: str = auth.SECRET_KEY, algorithm: str = auth.ALGORITHM, **claims) -> str:
+    payload = {"sub": "u1", "role": "CM", "exp": int(NOW + exp_in), **claims}
+    return jwt.encode(payload, key, algorithm=algorithm)
+
+
+def _segments(token: str):
+    return token.split(".")
+
+
+@pytest.fixture(params=["hs256", "jose"])
+def verify(request):
+    """The configured verifier; both backends must accept and reject the same tokens."""
+    with mock.patch.object(auth, "JWT_BACKEND", request.param):
+        yield auth._verify_token
+
+
+@pytest.fixture
+def clock():
+    """Sets the time the HS256 verifier and the cache check exp against."""
+    now = SimpleNamespace(value=NOW)
+    with mock.patch.object(auth, "time", SimpleNamespace(time=lambda: now.value)), \
+            mock.patch.object(auth, "JWT_BACKEND", "hs256"):
+        auth.token_cache.clear()
+        yield now
+        auth.token_cache.clear()
+
+
+# ------------------ verification ------------------
+
+def test_valid_token_is_accepted(verify):
+    payload = verify(_token())
+
+    assert (payload["sub"], payload["role"]) == ("u1", "CM")
+
+
+def test_other_hmac_algorithm_is_rejected(verify):
+    with pytest.raises(JWTError):
+        verify(_token(algorithm="HS512"))
+
+
+def test_alg_none_is_rejected(verify):
+    header, payload, _ = _segments(_token())
+    for alg in ("none", "None"):
+        unsigned = f"{_b64({'alg': alg, 'typ': 'JWT'})}.{payload}."
+        with pytest.raises(JWTError):
+            verify(unsigned)
+
+
+def test_token_signed_with_another_key_is_rejected(verify):
+    with pytest.raises(JWTError):
+        verify(_token(key="not-the-secret"))
+
+
+def test_tampered_payload_is_rejected(verify):
+    header, _, signature = _segments(_token())
+    forged = _b64({"sub": "u1", "role": "GM", "exp": int(NOW + 600)})
+
+    with pytest.raises(JWTError):
+        verify(f"{header}.{forged}.{signature}")
+
+
+def test_tampered_signature_is_rejected(verify):
+    header, payload, signature = _segments(_token())
+    flipped = signature[:-2] + ("A" if signature[-2] != "A" else "B") + signature[-1]
+
+    with pytest.raises(JWTError):
+        verify(f"{header}.{payload}.{flipped}")
+
+
+def test_expired_token_is_rejected(verify):
+    with pytest.raises(JWTError):
+        verify(_token(exp_in=-5))
+
+
+def test_token_not_yet_valid_is_rejected(verify):
+    with pytest.raises(JWTError):
+        verify(_token(nbf=int(NOW + 600)))
+
+
+def test_non_numeric_exp_is_rejected():
+    header = _b64({"alg": "HS256", "typ": "JWT"})
+    payload = _b64({"sub": "u1", "exp": "tomorrow"})
+    signature = _b64(auth.hmac.new(auth._SECRET_BYTES, f"{header}.{payload}".encode(), "sha256").digest())
+
+    with pytest.raises(JWTError):
+        _decode_hs256(f"{header}.{payload}.{signature}")
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "abc",
+    "a.b",
+    "a.b.c.d",
+    "!!!.###.$$$",
+    f"{_b64(b'not json')}.{_b64({'sub': 'u1'})}.sig",
+    f"{_b64([1, 2])}.{_b64({'sub': 'u1'})}.sig",
+])
+def test_malformed_tokens_are_rejected(verify, token):
+    with pytest.raises(JWTError):
+        verify(token)
+
+
+def test_signed_payload_that_is_not_an_object_is_rejected():
+    header = _b64({"alg": "HS256", "typ": "JWT"})
+    payload = _b64([1, 2, 3])
+    signature = _b64(auth.hmac.new(auth._SECRET_BYTES, f"{header}.{payload}".encode(), "sha256").digest())
+
+    with pytest.raises(JWTError):
+        _decode_hs256(f"{header}.{payload}.{signature}")
+
+
+# ------------------ cache ------------------
+
+def test_cached_token_skips_verification(clock):
+    token = _token()
+    with mock.patch.object(auth, "_verify_token", wraps=auth._verify_token) as verify:
+        assert decode_access_token(token)["sub"] == "u1"
+        assert decode_access_token(token)["sub"] == "u1"
+
+    assert verify.call_count == 1
+
+
+def test_cached_token_is_refused_once_exp_passes(clock):
+    token = _token(exp_in=60)
+    decode_access_token(token)
+
+    clock.value = NOW + 61
+    with pytest.raises(JWTError):
+        decode_access_token(token)
+    assert len(auth.token_cache) == 0
+
+
+def test_cache_entry_does_not_outlive_exp(clock):
+    with mock.patch.object(auth.token_cache, "set", wraps=auth.token_cache.set) as cache_set:
+        decode_access_token(_token(exp_in=30))
+
+    assert cache_set.call_args.kwargs["ttl"] <= 30
+
+
+def test_rejected_tokens_are_not_cached(clock):
+    with pytest.raises(JWTError):
+        decode_access_token(_token(exp_in=-5))
+
+    assert len(auth.token_cache) == 0
+
+
+def test_caller_cannot_change_the_cached_claims(clock):
+    token = _token()
+    decode_access_token(token)["role"] = "GM"
+
+    assert decode_access_token(token)["role"] == "CM"
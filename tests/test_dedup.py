@@ -0,0 +1,218 @@
+# tests/test_dedup.py
+import asyncio
+from unittest import mock
+
+import pytest
+from bson import ObjectId
+
+from api.core import dedup
+from api.core.dedup import DuplicateIndex, SLOTS, _report_signature, similarity
+from api.db.models.complaint import Complaint, ComplaintStatus
+
+MARKET = (28.6139, 77.2090)
+SUBJECT = "Pipe burst near the market"
+DESCRIPTION = "Water has been leaking from a burst pipe for two days"
+ADDRESS = "Main Market, Sector 4"
+
+
+def _fields(category="Water", point=MARKET, subject=SUBJECT, description=DESCRIPTION, address=ADDRESS) -> dict:
+    """A complaint as the loader reads it from Mongo."""
+    return {
+        "complaint_category": category,
+        "complaint_subject": subject,
+        "detailed_description": description,
+        "complete_address": address,
+        "location": {"type": "Point", "coordinates": [point[1], point[0]]} if point else None,
+    }
+
+
+def _find(index, category="Water", point=MARKET, subject=SUBJECT, description=DESCRIPTION, address=ADDRESS):
+    location = _fields(point=point)["location"]
+    return index.find(category, location, subject, description, address)
+
+
+def _complaint(**overrides) -> Complaint:
+    fields = dict(
+        full_name="Asha Verma",
+        mobile_number="9876543210",
+        complaint_category="Water",
+        complaint_subject=SUBJECT,
+        detailed_description=DESCRIPTION,
+        complete_address=ADDRESS,
+        location={"lat": MARKET[0], "lng": MARKET[1]},
+    )
+    fields.update(overrides)
+    return Complaint(id=ObjectId(), **fields)
+
+
+def _north(metres: float):
+    """MARKET moved this many metres north."""
+    return MARKET[0] + metres / 111_195, MARKET[1]
+
+
+# ------------------ threshold ------------------
+
+def test_identical_report_matches_fully():
+    index = DuplicateIndex()
+    index.add("a", _fields())
+
+    assert _find(index) == ("a", 1.0)
+
+
+def test_score_at_the_threshold_matches_and_just_below_does_not():
+    reworded = dict(subject="Burst pipe near market", description="Pipe burst, water leaking for two days")
+    score = similarity(
+        _report_signature(SUBJECT, DESCRIPTION, ADDRESS),
+        _report_signature(reworded["subject"], reworded["description"], ADDRESS),
+    )
+    assert 0 < score < 1
+    index = DuplicateIndex()
+    index.add("a", _fields())
+
+    with mock.patch.object(dedup, "DEDUP_THRESHOLD", score):
+        assert _find(index, **reworded) == ("a", score)
+    with mock.patch.object(dedup, "DEDUP_THRESHOLD", score + 1 / SLOTS):
+        assert _find(index, **reworded) is None
+
+
+def test_unrelated_report_does_not_match():
+    index = DuplicateIndex()
+    index.add("a", _fields())
+
+    assert _find(index, subject="Street light not working", description="Dark road for a week", address="Lane 9") is None
+
+
+def test_best_of_several_matches_wins():
+    index = DuplicateIndex()
+    index.add("close", _fields(subject="Pipe burst near the bus stand"))
+    index.add("exact", _fields())
+
+    assert _find(index)[0] == "exact"
+
+
+# ------------------ gating ------------------
+
+def test_other_category_is_never_compared():
+    index = DuplicateIndex()
+    index.add("a", _fields(category="Electricity"))
+
+    assert _find(index, category="Water") is None
+
+
+def test_reports_within_the_radius_match():
+    index = DuplicateIndex()
+    index.add("a", _fields(point=_north(dedup.DEDUP_RADIUS_M - 20)))
+
+    assert _find(index)[0] == "a"
+
+
+def test_reports_beyond_the_radius_do_not_match():
+    index = DuplicateIndex()
+    index.add("a", _fields(point=_north(dedup.DEDUP_RADIUS_M + 20)))
+
+    assert _find(index) is None
+
+
+def test_match_across_a_grid_cell_boundary():
+    edge = dedup.CELL_DEG * 5714  # a cell boundary just north of MARKET
+    inside, outside = (edge - 0.0002, MARKET[1]), (edge + 0.0002, MARKET[1])
+    assert dedup._cell(inside) != dedup._cell(outside)
+    index = DuplicateIndex()
+    index.add("a", _fields(point=inside))
+
+    assert _find(index, point=outside)[0] == "a"
+
+
+def test_reports_without_location_only_meet_each_other():
+    index = DuplicateIndex()
+    index.add("placed", _fields())
+    index.add("unplaced", _fields(point=None))
+
+    assert _find(index, point=None)[0] == "unplaced"
+
+
+# ------------------ update / remove ------------------
+
+def test_remove_drops_every_bucket():
+    index = DuplicateIndex()
+    index.add("a", _fields())
+    index.remove("a")
+
+    assert len(index) == 0
+    assert index._buckets == {}
+    assert _find(index) is None
+    index.remove("a")  # removing twice is harmless
+
+
+def test_re_adding_replaces_the_old_text():
+    index = DuplicateIndex()
+    index.add("a", _fields())
+    index.add("a", _fields(subject="Street light not working", description="Dark road", address="Lane 9"))
+
+    assert len(index) == 1
+    assert _find(index) is None
+
+
+@pytest.mark.parametrize("status", [ComplaintStatus.CLOSED, ComplaintStatus.REJECTED])
+def test_update_drops_finished_complaints(status):
+    index = DuplicateIndex()
+    complaint = _complaint()
+    index.update(complaint)
+    assert index.find_for(_complaint())[0] == str(complaint.id)
+
+    complaint.status = status
+    index.update(complaint)
+
+    assert len(index) == 0
+
+
+def test_update_drops_complaints_marked_as_duplicates():
+    index = DuplicateIndex()
+    complaint = _complaint()
+    index.update(complaint)
+
+    complaint.duplicate_of = str(ObjectId())
+    index.update(complaint)
+
+    assert index.find_for(_complaint()) is None
+
+
+def test_cap_evicts_the_oldest():
+    index = DuplicateIndex(max_docs=2)
+    for doc_id in ("a", "b", "c"):
+        index.add(doc_id, _fields())
+
+    assert list(index._entries) == ["b", "c"]
+    assert all("a" not in ids for cells in index._buckets.values() for ids in cells.values())
+
+
+# ------------------ reload ------------------
+
+def _rows(*ids):
+    return [{"_id": doc_id, **_fields()} for doc_id in ids]
+
+
+def test_reload_keeps_writes_made_while_building():
+    index = DuplicateIndex()
+    index.add("stale", _fields())
+    collection = mock.MagicMock()
+    # newest first, as the query sorts them
+    collection.find.return_value.sort.return_value.limit.return_value.to_list = mock.AsyncMock(
+        return_value=_rows("kept", "closed")
+    )
+
+    async def build(fn, *args):
+        index.add("created", _fields(subject="Sewage overflow", description="Drain overflowing", address="Lane 9"))
+        index.remove("closed")
+        return fn(*args)
+
+    with mock.patch.object(dedup, "duplicate_index", index), \
+            mock.patch.object(dedup, "run_in_threadpool", build), \
+            mock.patch.object(Complaint, "get_pymongo_collection", return_value=collection):
+        assert asyncio.run(dedup.load_duplicate_index()) == 2
+
+    assert list(index._entries) == ["kept", "created"]
+    assert index._journal is None
+    query = collection.find.call_args.args[0]
+    assert query["status"] == {"$nin": ["closed", "rejected"]}
+    assert query["duplicate_of"] is None
@@ -0,0 +1,210 @@
+# tests/test_duplicates.py
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from api.controllers import complaint_ctrl
+from api.core.dedup import duplicate_index
+from api.db.models.complaint import Assignment, AssignmentStatus, Complaint, ComplaintStatus
+
+
+def _complaint(**overrides) -> Complaint:
+    fields = dict(
+        full_name="Asha Verma",
+        mobile_number="9876543210",
+        complaint_category="Water",
+        complaint_subject="Pipe burst near the market",
+        detailed_description="Water has been leaking from a burst pipe for two days",
+        complete_address="Main Market, Sector 4",
+        location={"lat": 28.6139, "lng": 77.2090},
+    )
+    fields.update(overrides)
+    return Complaint(id=ObjectId(), **fields)
+
+
+def _raw(complaint: Complaint) -> dict:
+    """The complaint as find_one_and_update would return it."""
+    return {"_id": complaint.id, **complaint.model_dump(exclude={"id", "revision_id"})}
+
+
+def _collection() -> mock.MagicMock:
+    collection = mock.MagicMock()
+    collection.update_one = mock.AsyncMock(return_value=SimpleNamespace(matched_count=1))
+    collection.update_many = mock.AsyncMock(return_value=SimpleNamespace(modified_count=0))
+    collection.find_one = mock.AsyncMock(return_value=None)
+    collection.find_one_and_update = mock.AsyncMock(return_value=None)
+    collection.find.return_value.to_list = mock.AsyncMock(return_value=[])
+    return collection
+
+
+def _found(*complaints: Complaint) -> SimpleNamespace:
+    """Stand-in for the FindMany returned by Complaint.find."""
+    return SimpleNamespace(to_list=mock.AsyncMock(return_value=list(complaints)))
+
+
+@pytest.fixture
+def collection():
+    collection = _collection()
+    with mock.patch.object(Complaint, "get_pymongo_collection", return_value=collection):
+        yield collection
+
+
+@pytest.fixture
+def stats():
+    with mock.patch.object(complaint_ctrl, "record_transition", mock.AsyncMock()) as single, \
+            mock.patch.object(complaint_ctrl, "record_transitions", mock.AsyncMock()) as many:
+        yield SimpleNamespace(single=single, many=many)
+
+
+@pytest.fixture
+def parent():
+    parent = _complaint(
+        status=ComplaintStatus.VERIFIED_BY_JE,
+        duplicate_count=1,
+        assignments=[Assignment(worker_id="w1", status=AssignmentStatus.VERIFIED_BY_JE)],
+        current_assignment_index=0,
+    )
+    duplicate_index.update(parent)
+    yield parent
+    duplicate_index.remove(str(parent.id))
+
+
+# ------------------ link ------------------
+
+def test_link_points_report_at_open_parent(collection, parent):
+    report = _complaint(complaint_subject="Burst pipe near market")
+
+    asyncio.run(complaint_ctrl._link_duplicate(report))
+
+    assert report.duplicate_of == str(parent.id)
+    query, update = collection.update_one.call_args.args
+    # a parent closed or rejected in another process is not linked to
+    assert query == {"_id": parent.id, "duplicate_of": None, **complaint_ctrl.OPEN_FILTER}
+    assert update == {"$inc": {"duplicate_count": 1}}
+
+
+def test_link_drops_parent_that_closed_elsewhere(collection, parent):
+    collection.update_one.return_value = SimpleNamespace(matched_count=0)
+    report = _complaint()
+
+    asyncio.run(complaint_ctrl._link_duplicate(report))
+
+    assert report.duplicate_of is None
+    assert duplicate_index.find_for(report) is None
+
+
+def test_link_ignores_unrelated_report(collection, parent):
+    report = _complaint(
+        complaint_category="Electricity",
+        complaint_subject="Street light not working",
+        detailed_description="The light outside house 12 has been off for a week",
+    )
+
+    asyncio.run(complaint_ctrl._link_duplicate(report))
+
+    assert report.duplicate_of is None
+    collection.update_one.assert_not_called()
+
+
+# ------------------ unlink ------------------
+
+def test_unlink_detaches_report_and_decrements_parent(collection, stats, parent):
+    report = _complaint(duplicate_of=str(parent.id))
+    collection.find_one_and_update.return_value = _raw(report)
+
+    result = asyncio.run(complaint_ctrl.unlink_duplicate_controller(str(report.id)))
+
+    assert result["duplicate_of"] is None
+    query = collection.find_one_and_update.call_args.args[0]
+    assert query == {"_id": report.id, "duplicate_of": {"$type": "string"}}
+    collection.update_one.assert_awaited_once_with({"_id": parent.id}, {"$inc": {"duplicate_count": -1}})
+
+
+def test_unlink_rejects_report_that_is_not_a_duplicate(collection, stats):
+    report = _complaint()
+    with mock.patch.object(Complaint, "get", mock.AsyncMock(return_value=report)):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(complaint_ctrl.unlink_duplicate_controller(str(report.id)))
+
+    assert exc.value.status_code == 400
+    collection.update_one.assert_not_called()
+
+
+# ------------------ cascade ------------------
+
+def test_closing_parent_closes_its_duplicates(collection, stats, parent):
+    report = _complaint(duplicate_of=str(parent.id))
+    collection.find_one_and_update.return_value = _raw(parent)
+    collection.update_many.return_value = SimpleNamespace(modified_count=1)
+
+    with mock.patch.object(Complaint, "find", return_value=_found(report)) as find:
+        result = asyncio.run(complaint_ctrl.manager_approve_close_controller(str(parent.id), "gm1"))
+
+    assert result["status"] == ComplaintStatus.CLOSED
+    assert find.call_args.args[0] == {"duplicate_of": {"$in": [str(parent.id)]}, **complaint_ctrl.OPEN_FILTER}
+    query, update = collection.update_many.call_args.args
+    assert query["_id"] == {"$in": [report.id]}
+    assert query["duplicate_of"] == {"$in": [str(parent.id)]}
+    assert update["$set"]["status"] == ComplaintStatus.CLOSED.value
+
+    (pairs,) = stats.many.call_args.args
+    [(before, after)] = pairs
+    assert before.status == ComplaintStatus.PENDING
+    assert after.status == ComplaintStatus.CLOSED
+    assert after.duplicate_of == str(parent.id)  # the link stays visible
+
+
+def test_rejected_parent_passes_rejected_on(collection, stats):
+    parent_id = str(ObjectId())
+    report = _complaint(duplicate_of=parent_id)
+    collection.update_many.return_value = SimpleNamespace(modified_count=1)
+
+    with mock.patch.object(Complaint, "find", return_value=_found(report)):
+        closed = asyncio.run(complaint_ctrl._close_duplicates({parent_id: "rejected"}))
+
+    assert closed[str(report.id)].status == ComplaintStatus.REJECTED
+    assert collection.update_many.call_args.args[1]["$set"]["status"] == "rejected"
+
+
+def test_cascade_skips_duplicates_unlinked_concurrently(collection, stats):
+    parent_id = str(ObjectId())
+    kept, unlinked = _complaint(duplicate_of=parent_id), _complaint(duplicate_of=parent_id)
+    collection.update_many.return_value = SimpleNamespace(modified_count=1)
+    collection.find.return_value.to_list = mock.AsyncMock(return_value=[{"_id": kept.id}])
+
+    with mock.patch.object(Complaint, "find", return_value=_found(kept, unlinked)):
+        closed = asyncio.run(complaint_ctrl._close_duplicates({parent_id: ComplaintStatus.CLOSED}))
+
+    assert list(closed) == [str(kept.id)]
+    (pairs,) = stats.many.call_args.args
+    assert [before.id for before, _ in pairs] == [kept.id]
+
+
+def test_non_terminal_transition_leaves_duplicates_alone(collection, stats, parent):
+    parent.status = ComplaintStatus.SUBMITTED_BY_CM
+    parent.assignments[0].status = AssignmentStatus.SUBMITTED_BY_CM
+    collection.find_one_and_update.return_value = _raw(parent)
+
+    with mock.patch.object(Complaint, "find") as find:
+        asyncio.run(complaint_ctrl.verify_proof_controller(str(parent.id), "je1", "approve"))
+
+    find.assert_not_called()
+    collection.update_many.assert_not_called()
+
+
+def test_batch_close_closes_duplicates(collection, stats, parent):
+    report = _complaint(duplicate_of=str(parent.id))
+    collection.bulk_write = mock.AsyncMock(return_value=SimpleNamespace(matched_count=1))
+    collection.update_many.return_value = SimpleNamespace(modified_count=1)
+
+    with mock.patch.object(Complaint, "find", side_effect=[_found(parent), _found(report)]), \
+            mock.patch.object(complaint_ctrl, "bulk_update_worker_loads", mock.AsyncMock()):
+        result = asyncio.run(complaint_ctrl.batch_close_complaints_controller([str(parent.id)], "gm1"))
+
+    assert result["succeeded"] == 1
+    closed_pairs = stats.many.call_args_list[-1].args[0]
+    assert [(b.id, a.status) for b, a in closed_pairs] == [(report.id, ComplaintStatus.CLOSED)]
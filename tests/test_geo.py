@@ -0,0 +1,206 @@
+# tests/test_geo.py
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from api.controllers import complaint_ctrl
+from api.controllers.complaint_ctrl import (
+    EARTH_RADIUS_M, POLYGON_MAX_POINTS, complaint_to_dict, list_row_to_dict,
+    parse_polygon, polygon_within, radius_within,
+)
+from api.core.geohash import encode as encode_geohash
+from api.db.models.complaint import Complaint, GeoPoint, lat_lng
+from api.input_schema.complaint_schema import Location
+from api.tasks import geo_migrate
+
+LAT, LNG = 28.6139, 77.2090
+
+
+def _complaint(**overrides) -> Complaint:
+    fields = dict(
+        full_name="Asha Verma",
+        mobile_number="9876543210",
+        complaint_category="Water",
+        complaint_subject="Pipe burst",
+        detailed_description="Leaking for two days",
+        complete_address="Main Market, Sector 4",
+        location={"lat": LAT, "lng": LNG},
+    )
+    fields.update(overrides)
+    return Complaint(id=ObjectId(), **fields)
+
+
+# ------------------ GeoPoint ------------------
+
+def test_lat_lng_becomes_geojson_in_lng_lat_order():
+    point = GeoPoint.model_validate({"lat": LAT, "lng": LNG})
+
+    assert point.model_dump() == {"type": "Point", "coordinates": [LNG, LAT]}
+
+
+def test_numeric_strings_are_accepted():
+    assert GeoPoint.model_validate({"lat": "28.5", "lng": "77.25"}).coordinates == [77.25, 28.5]
+
+
+def test_geojson_passes_through():
+    assert GeoPoint.model_validate({"type": "Point", "coordinates": [LNG, LAT]}).coordinates == [LNG, LAT]
+
+
+@pytest.mark.parametrize("value", [
+    {"lat": 90.5, "lng": 0},
+    {"lat": 0, "lng": -180.5},
+    {"type": "Point", "coordinates": [181, 0]},
+    {"type": "Point", "coordinates": [0, 91]},
+    {"type": "Point", "coordinates": [LNG]},
+    {"type": "Point", "coordinates": [LNG, LAT, 10]},
+    {"lat": float("nan"), "lng": 0},
+])
+def test_invalid_points_are_rejected(value):
+    with pytest.raises(ValidationError):
+        GeoPoint.model_validate(value)
+
+
+def test_edges_of_the_range_are_valid():
+    assert GeoPoint.model_validate({"lat": -90, "lng": 180}).coordinates == [180, -90]
+
+
+@pytest.mark.parametrize("value", [{"lat": 91, "lng": 0}, {"lat": 0, "lng": 181}])
+def test_api_location_is_range_checked(value):
+    with pytest.raises(ValidationError):
+        Location(**value)
+
+
+# ------------------ round trip ------------------
+
+def test_complaint_round_trips_lat_lng():
+    complaint = _complaint()
+
+    assert complaint.location.coordinates == [LNG, LAT]
+    assert complaint.geohash == encode_geohash(LAT, LNG)
+    assert complaint_to_dict(complaint)["location"] == {"lat": LAT, "lng": LNG}
+
+
+def test_legacy_document_loads_as_geojson():
+    stored = {"_id": ObjectId(), **_complaint().model_dump(exclude={"id", "revision_id", "geohash"})}
+    stored["location"] = {"lat": LAT, "lng": LNG}
+
+    complaint = Complaint.model_validate(stored)
+
+    assert complaint.location.coordinates == [LNG, LAT]
+    assert complaint.geohash == encode_geohash(LAT, LNG)
+
+
+def test_list_rows_read_both_stored_shapes():
+    geojson = list_row_to_dict({"_id": ObjectId(), "location": {"type": "Point", "coordinates": [LNG, LAT]}})
+    legacy = list_row_to_dict({"_id": ObjectId(), "location": {"lat": LAT, "lng": LNG}})
+
+    assert geojson["location"] == legacy["location"] == {"lat": LAT, "lng": LNG}
+    assert lat_lng(None) is None
+
+
+# ------------------ migration ------------------
+
+def _migration_collection(*batches):
+    collection = mock.MagicMock()
+    collection.find.return_value.sort.return_value.limit.return_value.to_list = mock.AsyncMock(
+        side_effect=[list(b) for b in batches] + [[]]
+    )
+    collection.update_many = mock.AsyncMock(side_effect=lambda q, u: SimpleNamespace(modified_count=len(q["_id"]["$in"])))
+    collection.bulk_write = mock.AsyncMock(side_effect=lambda ops, ordered: SimpleNamespace(modified_count=len(ops)))
+    return collection
+
+
+def test_migration_rewrites_in_lng_lat_order():
+    (stage,) = geo_migrate._TO_POINT
+    coordinates = stage["$set"]["location"]["coordinates"]
+
+    assert coordinates == [{"$toDouble": "$location.lng"}, {"$toDouble": "$location.lat"}]
+
+
+def test_migration_walks_id_order_in_batches():
+    first, second = [{"_id": ObjectId()} for _ in range(2)], [{"_id": ObjectId()}]
+    collection = _migration_collection(first, second)
+
+    with mock.patch.object(Complaint, "get_pymongo_collection", return_value=collection):
+        assert asyncio.run(geo_migrate.migrate_locations(batch_size=2)) == 3
+
+    queries = [c.args[0] for c in collection.find.call_args_list]
+    assert "_id" not in queries[0]
+    assert queries[1]["_id"] == {"$gt": first[-1]["_id"]}
+    # only documents still in the legacy shape are rewritten
+    query, update = collection.update_many.call_args_list[0].args
+    assert query["location.lat"] == {"$exists": True} and update == geo_migrate._TO_POINT
+
+
+def test_geohash_backfill_reads_lng_lat():
+    row = {"_id": ObjectId(), "location": {"coordinates": [LNG, LAT]}}
+    collection = _migration_collection([row])
+
+    with mock.patch.object(Complaint, "get_pymongo_collection", return_value=collection):
+        assert asyncio.run(geo_migrate.backfill_geohashes()) == 1
+
+    [op] = collection.bulk_write.call_args.args[0]
+    assert op._doc == {"$set": {"geohash": encode_geohash(LAT, LNG)}}
+
+
+# ------------------ polygon / radius ------------------
+
+def test_polygon_is_parsed_as_lat_lng_pairs():
+    assert parse_polygon("28.6,77.2; 28.7,77.2; 28.7,77.3;") == [(28.6, 77.2), (28.7, 77.2), (28.7, 77.3)]
+
+
+def test_unclosed_ring_is_closed_in_lng_lat_order():
+    ring = polygon_within(parse_polygon("28.6,77.2;28.7,77.2;28.7,77.3"))["$geometry"]["coordinates"][0]
+
+    assert ring == [[77.2, 28.6], [77.2, 28.7], [77.3, 28.7], [77.2, 28.6]]
+
+
+def test_closed_ring_is_not_closed_twice():
+    points = parse_polygon("28.6,77.2;28.7,77.2;28.7,77.3;28.6,77.2")
+    ring = polygon_within(points)["$geometry"]["coordinates"][0]
+
+    assert len(points) == 3
+    assert ring[0] == ring[-1] and len(ring) == 4
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "28.6,77.2",
+    "28.6,77.2;28.7,77.2",
+    "28.6,77.2;28.7,77.2;28.6,77.2",  # closed, but only two corners
+    ";".join(f"{i / 1000},77.2" for i in range(POLYGON_MAX_POINTS + 1)),
+])
+def test_polygon_vertex_count_is_checked(text):
+    with pytest.raises(HTTPException) as exc:
+        parse_polygon(text)
+
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("text", [
+    "28.6;77.2;28.7",
+    "28.6,77.2,5;28.7,77.2;28.7,77.3",
+    "north,east;28.7,77.2;28.7,77.3",
+    "91,77.2;28.7,77.2;28.7,77.3",
+    "28.6,181;28.7,77.2;28.7,77.3",
+])
+def test_malformed_or_out_of_range_polygon_is_rejected(text):
+    with pytest.raises(HTTPException) as exc:
+        parse_polygon(text)
+
+    assert exc.value.status_code == 400
+
+
+def test_radius_is_a_center_sphere_in_radians():
+    assert radius_within(LAT, LNG, 1000) == {"$centerSphere": [[LNG, LAT], 1000 / EARTH_RADIUS_M]}
+
+
+def test_within_filter_goes_on_the_location():
+    within = radius_within(LAT, LNG, 500)
+
+    assert complaint_ctrl.build_complaint_filter(within=within)["location"] == {"$geoWithin": within}
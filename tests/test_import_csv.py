@@ -0,0 +1,162 @@
+# tests/test_import_csv.py
+import asyncio
+import csv
+import io
+from unittest import mock
+
+import pytest
+
+from api.controllers import import_ctrl
+from api.controllers.import_ctrl import _csv_records, _quote_open_after, _rows
+
+HEADER = "full_name,complaint_subject,detailed_description"
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _parse(text: str, chunk_size: int = 7):
+    """(row number, row, error) for every record, fed in small chunks."""
+    async def collect():
+        return [item async for item in _rows(_chunks(text.encode(), chunk_size), "csv")]
+    return asyncio.run(collect())
+
+
+def _records(lines):
+    async def feed():
+        for line in lines:
+            yield line
+
+    async def collect():
+        return [item async for item in _csv_records(feed())]
+    return asyncio.run(collect())
+
+
+# ------------------ quote tracking ------------------
+
+@pytest.mark.parametrize("line, in_quotes, expected", [
+    ('a,b,c', False, False),
+    ('a,"b', False, True),             # quoted field left open
+    ('a,"b,c"', False, False),
+    ('a,"say ""hi""",c', False, False),  # doubled quotes are literal
+    ('a,"say ""hi', False, True),
+    ('""', False, False),              # empty quoted field
+    ('a,b"c', False, False),           # a quote inside an unquoted field is literal
+    ('still inside', True, True),
+    ('end" ,x', True, False),
+    ('"" more', True, True),           # a doubled quote does not close the field
+    ('"', True, False),
+])
+def test_quote_open_after(line, in_quotes, expected):
+    assert _quote_open_after(line, in_quotes) is expected
+
+
+@pytest.mark.parametrize("text", [
+    'a,"multi\nline\nvalue",c\n',
+    'a,"say ""hi""\nthere",c\n',
+    '"","",""\n',
+    'x,"a,b",y\n"open\n""still""\nclosed",z,w\n',
+])
+def test_record_split_agrees_with_csv_reader(text):
+    expected = list(csv.reader(io.StringIO(text)))
+
+    records = [record for record, error in _records(text.split("\n")[:-1]) if error is None]
+
+    assert [next(csv.reader([line + "\n" for line in record])) for record in records] == expected
+
+
+# ------------------ records ------------------
+
+def test_quoted_newlines_stay_in_the_field():
+    rows = _parse(f'{HEADER}\nAsha,"Pipe burst","first line\nsecond line"\nRavi,Leak,short\n')
+
+    assert [(n, r["detailed_description"]) for n, r, _ in rows] == [(1, "first line\nsecond line"), (2, "short")]
+
+
+def test_doubled_quotes_are_literal():
+    [(_, row, error)] = _parse(f'{HEADER}\nAsha,"The ""main"" pipe","said ""urgent"",\nthen left"\n')
+
+    assert error is None
+    assert row["complaint_subject"] == 'The "main" pipe'
+    assert row["detailed_description"] == 'said "urgent",\nthen left'
+
+
+def test_crlf_line_endings():
+    text = f'{HEADER}\r\nAsha,Pipe,"one\r\ntwo"\r\nRavi,Leak,short\r\n'
+
+    rows = _parse(text)
+
+    assert [r["full_name"] for _, r, _ in rows] == ["Asha", "Ravi"]
+    assert rows[0][1]["detailed_description"] == "one\r\ntwo"
+    assert rows[1][1]["detailed_description"] == "short"
+
+
+def test_blank_lines_are_skipped():
+    rows = _parse(f'{HEADER}\n\nAsha,Pipe,burst\n\n')
+
+    assert [(n, error) for n, _, error in rows] == [(1, None)]
+
+
+def test_row_with_missing_column_is_an_error():
+    rows = _parse(f'{HEADER}\nAsha,Pipe\nRavi,Leak,short\n')
+
+    assert rows[0] == (1, None, "expected 3 columns, got 2")
+    assert rows[1][2] is None
+
+
+def test_row_with_extra_column_is_an_error():
+    rows = _parse(f'{HEADER}\nAsha,Pipe,burst,extra\n')
+
+    assert rows == [(1, None, "expected 3 columns, got 4")]
+
+
+def test_trailing_unterminated_quote_is_reported():
+    rows = _parse(f'{HEADER}\nAsha,Pipe,burst\nRavi,Leak,"never closed\nand more\n')
+
+    assert rows[0][2] is None
+    assert rows[1] == (2, None, "unterminated quoted field")
+
+
+# ------------------ size cap ------------------
+
+@pytest.fixture
+def small_cap():
+    with mock.patch.object(import_ctrl, "IMPORT_MAX_RECORD_CHARS", 40):
+        yield
+
+
+def test_oversize_single_line_is_dropped(small_cap):
+    rows = _parse(f'full_name,complaint_subject\nAsha,{"x" * 60}\nRavi,ok\n')
+
+    assert rows[0] == (1, None, "row exceeds 40 characters")
+    assert rows[1] == (2, {"full_name": "Ravi", "complaint_subject": "ok"}, None)
+
+
+def test_oversize_quoted_record_is_dropped_to_its_closing_quote(small_cap):
+    header = "full_name,complaint_subject"
+    lines = "\n".join(["short", "y" * 30, "z" * 30, "still inside"])
+    rows = _parse(f'{header}\nAsha,"{lines}"\nRavi,ok\n')
+
+    # one error for the whole record, then parsing resumes after its closing quote
+    assert rows == [
+        (1, None, "row exceeds 40 characters"),
+        (2, {"full_name": "Ravi", "complaint_subject": "ok"}, None),
+    ]
+
+
+def test_oversize_line_inside_quotes_resumes_at_the_next_line(small_cap):
+    header = "full_name,complaint_subject"
+    rows = _parse(f'{header}\nAsha,"{"x" * 80}"\nRavi,ok\n', chunk_size=5)
+
+    assert rows == [
+        (1, None, "row exceeds 40 characters"),
+        (2, {"full_name": "Ravi", "complaint_subject": "ok"}, None),
+    ]
+
+
+def test_oversize_header_stops_the_import(small_cap):
+    rows = _parse(",".join(["column"] * 10) + "\nAsha,ok\n")
+
+    assert rows == [(0, None, "header: row exceeds 40 characters")]
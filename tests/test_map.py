@@ -0,0 +1,198 @@
+# tests/test_map.py
+import asyncio
+import re
+from collections import Counter
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from api.controllers import map_ctrl
+from api.core import geohash
+from api.db.models.complaint import Complaint
+
+LAT, LNG = 28.6139, 77.2090
+
+
+# ------------------ geohash ------------------
+
+@pytest.mark.parametrize("lat, lng, precision, expected", [
+    (57.64911, 10.40744, 11, "u4pruydqqvj"),
+    (42.605, -5.603, 5, "ezs42"),
+    (37.7749, -122.4194, 9, "9q8yyk8yt"),
+    (0, 0, 5, "s0000"),
+    (-90, -180, 5, "00000"),
+    (90, 180, 5, "zzzzz"),
+])
+def test_encode_known_vectors(lat, lng, precision, expected):
+    assert geohash.encode(lat, lng, precision) == expected
+
+
+def test_prefixes_are_the_coarser_cells():
+    full = geohash.encode(LAT, LNG)
+
+    assert len(full) == geohash.GEOHASH_PRECISION
+    assert all(geohash.encode(LAT, LNG, n) == full[:n] for n in range(1, len(full)))
+
+
+@pytest.mark.parametrize("precision", [1, 4, 6, 9])
+def test_bounds_hold_the_point_and_match_the_cell_size(precision):
+    south, west, north, east = geohash.bounds(geohash.encode(LAT, LNG, precision))
+
+    assert south <= LAT < north and west <= LNG < east
+    assert (north - south, east - west) == pytest.approx(geohash.cell_size(precision))
+    assert geohash.encode(*geohash.center(geohash.encode(LAT, LNG, precision)), precision) == geohash.encode(LAT, LNG, precision)
+
+
+def _boundary_box(precision: int, margin: float):
+    """A box straddling the east edge of the precision-`precision` cell of (LAT, LNG)."""
+    south, _, north, east = geohash.bounds(geohash.encode(LAT, LNG, precision))
+    mid = (south + north) / 2
+    return mid - margin, east - margin, mid + margin, east + margin
+
+
+def test_cover_spans_a_cell_boundary():
+    box = _boundary_box(4, 0.01)
+
+    cells = geohash.cover(*box, 4)
+
+    assert cells == [geohash.encode(box[0], box[1], 4), geohash.encode(box[0], box[3], 4)]
+    assert len(cells) <= geohash.cover_count(*box, 4)
+
+
+def test_cover_count_bounds_cover():
+    box = (LAT - 0.3, LNG - 0.4, LAT + 0.2, LNG + 0.5)
+    for precision in range(1, 6):
+        assert len(geohash.cover(*box, precision)) <= geohash.cover_count(*box, precision)
+
+
+# ------------------ precision ------------------
+
+def test_zoom_sets_precision_up_to_the_max():
+    box = _boundary_box(6, 0.001)
+
+    assert map_ctrl.zoom_precision(3, *box) == 2
+    assert map_ctrl.zoom_precision(30, *box) == map_ctrl.MAP_MAX_PRECISION
+
+
+def test_large_box_is_coarsened_to_the_cell_cap():
+    box = (LAT - 2, LNG - 2, LAT + 2, LNG + 2)
+    wanted = map_ctrl.zoom_precision(18, LAT, LNG, LAT, LNG)
+
+    with mock.patch.object(map_ctrl, "MAP_MAX_CELLS", 64):
+        precision = map_ctrl.zoom_precision(18, *box)
+
+    assert precision < wanted
+    assert geohash.cover_count(*box, precision) <= 64
+    assert geohash.cover_count(*box, precision + 1) > 64
+
+
+# ------------------ tiles ------------------
+
+class _Complaints:
+    """Complaint.aggregate over stored (geohash, status) pairs, as the tile pipeline runs it."""
+
+    def __init__(self, *docs):
+        self.docs = list(docs)
+        self.queries = []
+
+    def aggregate(self, pipeline):
+        match, group = pipeline[0]["$match"], pipeline[1]["$group"]
+        self.queries.append(match)
+        prefixes = match["geohash"]["$in"]
+        precision = group["_id"]["cell"]["$substrBytes"][2]
+        counts = Counter(
+            (value[:precision], status) for value, status in self.docs
+            if any(p.match(value) for p in prefixes)
+        )
+        rows = [{"_id": {"cell": cell, "status": status}, "count": n} for (cell, status), n in counts.items()]
+        return SimpleNamespace(to_list=mock.AsyncMock(return_value=rows))
+
+    def tiles_loaded(self):
+        return [sorted(p.pattern[1:] for p in q["geohash"]["$in"]) for q in self.queries]
+
+
+@pytest.fixture
+def complaints():
+    box = _boundary_box(4, 0.01)
+    west_point, east_point = (box[0] + 0.001, box[1] + 0.001), (box[0] + 0.001, box[3] - 0.001)
+    store = _Complaints(
+        (geohash.encode(*west_point), "pending"),
+        (geohash.encode(*west_point), "assigned"),
+        (geohash.encode(*east_point), "pending"),
+        (geohash.encode(LAT + 1, LNG + 1), "pending"),  # outside the box
+    )
+    store.box, store.west_point, store.east_point = box, west_point, east_point
+    map_ctrl.tile_cache.clear()
+    with mock.patch.object(Complaint, "aggregate", side_effect=store.aggregate):
+        yield store
+    map_ctrl.tile_cache.clear()
+
+
+def _clusters(store):
+    # zoom 13 -> cells of precision 6 in tiles of precision 4
+    return asyncio.run(map_ctrl.get_map_clusters_controller(*store.box, zoom=13))
+
+
+def test_tiles_are_loaded_by_geohash_prefix(complaints):
+    result = _clusters(complaints)
+
+    west_tile, east_tile = (geohash.encode(*p, 4) for p in (complaints.west_point, complaints.east_point))
+    assert west_tile != east_tile
+    assert complaints.tiles_loaded() == [sorted([west_tile, east_tile])]
+    assert all(isinstance(p, re.Pattern) and p.pattern.startswith("^") for p in complaints.queries[0]["geohash"]["$in"])
+    assert result["precision"] == 6
+    assert result["total"] == 3
+    assert {c["geohash"]: c["by_status"] for c in result["cells"]} == {
+        geohash.encode(*complaints.west_point, 6): {"pending": 1, "assigned": 1},
+        geohash.encode(*complaints.east_point, 6): {"pending": 1},
+    }
+
+
+def test_cached_tiles_are_not_aggregated_again(complaints):
+    first = _clusters(complaints)
+    second = _clusters(complaints)
+
+    assert len(complaints.queries) == 1
+    assert second == first
+
+
+def test_transition_drops_only_the_tiles_it_touches(complaints):
+    _clusters(complaints)
+    east_hash = geohash.encode(*complaints.east_point)
+    complaints.docs.append((east_hash, "closed"))
+
+    map_ctrl.invalidate_map_tiles(None, east_hash)
+    result = _clusters(complaints)
+
+    assert complaints.tiles_loaded()[-1] == [east_hash[:4]]
+    assert result["total"] == 4
+
+
+def test_other_filters_are_cached_separately(complaints):
+    _clusters(complaints)
+    asyncio.run(map_ctrl.get_map_clusters_controller(*complaints.box, zoom=13, category="Water"))
+
+    assert len(complaints.queries) == 2
+    assert complaints.queries[1]["complaint_category"] == "Water"
+
+
+def test_result_aggregated_during_a_transition_is_not_cached(complaints):
+    aggregate = complaints.aggregate
+
+    def racing(pipeline):
+        map_ctrl.invalidate_map_tiles(geohash.encode(LAT + 1, LNG + 1))  # any write bumps the generation
+        return aggregate(pipeline)
+
+    with mock.patch.object(Complaint, "aggregate", side_effect=racing):
+        assert _clusters(complaints)["total"] == 3
+    _clusters(complaints)
+
+    assert len(complaints.queries) == 2
+
+
+def test_inverted_box_is_rejected(complaints):
+    with pytest.raises(map_ctrl.HTTPException) as exc:
+        asyncio.run(map_ctrl.get_map_clusters_controller(LAT + 1, LNG, LAT, LNG + 1, zoom=10))
+
+    assert exc.value.status_code == 400
@@ -0,0 +1,372 @@
+# tests/test_otp_store.py
+import asyncio
+from datetime import datetime, timedelta
+from unittest import mock
+
+import orjson
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from api.controllers import auth_ctrl
+from api.core import otp_store
+from api.core.otp_store import (
+    OTP_EXPIRED, OTP_INVALID, OTP_MISSING, OTP_OK,
+    MemoryOtpStore, MongoOtpStore, OtpStore, OtpThrottled,
+)
+from api.db.models.otp import OtpCode
+
+START = datetime(2026, 1, 1, 9, 0, 0)
+
+
+class _Clock:
+    """Stands in for the module's datetime so tests move time by hand."""
+
+    def __init__(self):
+        self.now = START
+
+    def utcnow(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def clock():
+    clock = _Clock()
+    with mock.patch.object(otp_store, "datetime", clock):
+        yield clock
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_store_without_backend_methods_cannot_be_built():
+    class Incomplete(OtpStore):
+        async def issue(self, phone: str, otp: str) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+# ------------------ expiry ------------------
+
+def test_code_is_valid_until_expiry(clock):
+    store = MemoryOtpStore()
+    _run(store.issue("9000000001", "123456"))
+
+    clock.advance(otp_store.OTP_EXPIRY_SECONDS - 1)
+    assert _run(store.consume("9000000001", "123456")) == OTP_OK
+
+
+def test_expired_code_is_rejected_and_burned(clock):
+    store = MemoryOtpStore()
+    _run(store.issue("9000000001", "123456"))
+
+    clock.advance(otp_store.OTP_EXPIRY_SECONDS + 1)
+    assert _run(store.consume("9000000001", "123456")) == OTP_EXPIRED
+    assert _run(store.consume("9000000001", "123456")) == OTP_MISSING
+
+
+def test_sweep_drops_records_once_the_window_lapses(clock):
+    store = MemoryOtpStore()
+    _run(store.issue("9000000001", "123456"))
+
+    clock.advance(otp_store.OTP_EXPIRY_SECONDS + 1)
+    assert store.sweep() == 0  # the throttle window still needs the record
+    clock.advance(otp_store.OTP_SEND_WINDOW_SECONDS)
+    assert store.sweep() == 1
+    assert len(store) == 0
+
+
+# ------------------ single use ------------------
+
+def test_code_can_be_used_once(clock):
+    store = MemoryOtpStore()
+    _run(store.issue("9000000001", "123456"))
+
+    assert _run(store.consume("9000000001", "123456")) == OTP_OK
+    assert _run(store.consume("9000000001", "123456")) == OTP_MISSING
+
+
+def test_wrong_code_does_not_burn_the_right_one(clock):
+    store = MemoryOtpStore()
+    _run(store.issue("9000000001", "123456"))
+
+    assert _run(store.consume("9000000001", "000000")) == OTP_INVALID
+    assert _run(store.consume("9000000001", "123456")) == OTP_OK
+
+
+def test_unknown_phone_is_missing(clock):
+    assert _run(MemoryOtpStore().consume("9000000001", "123456")) == OTP_MISSING
+
+
+def test_new_code_replaces_the_previous_one(clock):
+    store = MemoryOtpStore()
+    _run(store.issue("9000000001", "111111"))
+    clock.advance(otp_store.OTP_RESEND_COOLDOWN_SECONDS)
+    _run(store.issue("9000000001", "222222"))
+
+    assert _run(store.consume("9000000001", "111111")) == OTP_INVALID
+    assert _run(store.consume("9000000001", "222222")) == OTP_OK
+
+
+# ------------------ resend throttle ------------------
+
+def test_resend_within_cooldown_is_throttled(clock):
+    store = MemoryOtpStore()
+    _run(store.issue("9000000001", "111111"))
+
+    clock.advance(otp_store.OTP_RESEND_COOLDOWN_SECONDS - 10)
+    with pytest.raises(OtpThrottled) as exc:
+        _run(store.issue("9000000001", "222222"))
+    assert 0 < exc.value.retry_after <= 11
+    # the throttled send left the first code in place
+    assert _run(store.consume("9000000001", "111111")) == OTP_OK
+
+
+def test_sends_per_window_are_capped(clock):
+    store = MemoryOtpStore()
+    for _ in range(otp_store.OTP_MAX_SENDS_PER_WINDOW):
+        _run(store.issue("9000000001", "123456"))
+        clock.advance(otp_store.OTP_RESEND_COOLDOWN_SECONDS)
+
+    with pytest.raises(OtpThrottled):
+        _run(store.issue("9000000001", "123456"))
+
+    # a fresh window allows sending again
+    elapsed = otp_store.OTP_MAX_SENDS_PER_WINDOW * otp_store.OTP_RESEND_COOLDOWN_SECONDS
+    clock.advance(otp_store.OTP_SEND_WINDOW_SECONDS - elapsed)
+    _run(store.issue("9000000001", "654321"))
+    assert _run(store.consume("9000000001", "654321")) == OTP_OK
+
+
+def test_throttle_is_per_phone(clock):
+    store = MemoryOtpStore()
+    _run(store.issue("9000000001", "111111"))
+    _run(store.issue("9000000002", "222222"))
+
+    assert _run(store.consume("9000000002", "222222")) == OTP_OK
+
+
+def test_using_a_code_keeps_the_throttle(clock):
+    store = MemoryOtpStore()
+    _run(store.issue("9000000001", "111111"))
+    assert _run(store.consume("9000000001", "111111")) == OTP_OK
+
+    with pytest.raises(OtpThrottled):
+        _run(store.issue("9000000001", "222222"))
+
+
+# ------------------ entry cap ------------------
+
+def test_cap_evicts_the_soonest_to_expire(clock):
+    store = MemoryOtpStore(max_entries=2)
+    for phone in ("9000000001", "9000000002", "9000000003"):
+        _run(store.issue(phone, "123456"))
+        clock.advance(1)
+
+    assert len(store) == 2
+    assert _run(store.consume("9000000001", "123456")) == OTP_MISSING
+    assert _run(store.consume("9000000003", "123456")) == OTP_OK
+
+
+def test_cap_does_not_evict_on_resend(clock):
+    store = MemoryOtpStore(max_entries=2)
+    _run(store.issue("9000000001", "111111"))
+    _run(store.issue("9000000002", "222222"))
+    clock.advance(otp_store.OTP_RESEND_COOLDOWN_SECONDS)
+
+    _run(store.issue("9000000001", "333333"))
+
+    assert len(store) == 2
+    assert _run(store.consume("9000000002", "222222")) == OTP_OK
+
+
+# ------------------ mongo backend ------------------
+
+class _Collection:
+    """
+    The otp_codes calls MongoOtpStore makes, over a list of documents:
+    equality and $gte filters, the unique phone index, and a stored copy
+    per write like the server keeps.
+    """
+
+    def __init__(self):
+        self.docs = []
+        self._ids = 0
+
+    @staticmethod
+    def _matches(doc, query):
+        for key, want in query.items():
+            have = doc.get(key)
+            if isinstance(want, dict):
+                if have is None or have < want["$gte"]:
+                    return False
+            elif have != want:
+                return False
+        return True
+
+    def _first(self, query):
+        return next((d for d in self.docs if self._matches(d, query)), None)
+
+    async def find_one(self, query):
+        doc = self._first(query)
+        return dict(doc) if doc else None
+
+    async def insert_one(self, doc):
+        if self._first({"phone": doc["phone"]}):
+            raise DuplicateKeyError("phone_unique")
+        self._ids += 1
+        self.docs.append({"_id": self._ids, **doc})
+
+    async def replace_one(self, query, doc):
+        found = self._first(query)
+        if found:
+            found.clear()
+            found.update({"_id": query["_id"], **doc})
+        return mock.Mock(matched_count=int(found is not None))
+
+    async def find_one_and_update(self, query, update, return_document):
+        found = self._first(query)
+        before = dict(found) if found else None
+        if found:
+            found.update(update["$set"])
+        return before
+
+    async def update_one(self, query, update):
+        found = self._first(query)
+        if found:
+            found.update(update["$set"])
+
+
+@pytest.fixture
+def collection():
+    collection = _Collection()
+    with mock.patch.object(OtpCode, "get_pymongo_collection", return_value=collection):
+        yield collection
+
+
+def test_otp_documents_expire_through_a_ttl_index():
+    indexes = {index.document["name"]: index.document for index in OtpCode.Settings.indexes}
+
+    assert indexes["purge_ttl"]["key"] == {"purge_at": 1}
+    assert indexes["purge_ttl"]["expireAfterSeconds"] == 0
+    assert indexes["phone_unique"]["unique"] is True
+
+
+def test_mongo_issue_stores_purge_time_for_the_ttl_monitor(clock, collection):
+    _run(MongoOtpStore().issue("9000000001", "123456"))
+
+    [doc] = collection.docs
+    assert doc["otp"] == "123456"
+    assert doc["expires_at"] == START + timedelta(seconds=otp_store.OTP_EXPIRY_SECONDS)
+    # kept until the throttle window closes, past the code's own expiry
+    assert doc["purge_at"] == START + timedelta(seconds=otp_store.OTP_SEND_WINDOW_SECONDS)
+
+
+def test_mongo_resend_replaces_the_one_document(clock, collection):
+    store = MongoOtpStore()
+    _run(store.issue("9000000001", "111111"))
+    clock.advance(otp_store.OTP_RESEND_COOLDOWN_SECONDS)
+    _run(store.issue("9000000001", "222222"))
+
+    [doc] = collection.docs
+    assert (doc["otp"], doc["sends"], doc["window_started"]) == ("222222", 2, START)
+    assert _run(store.consume("9000000001", "111111")) == OTP_INVALID
+
+
+def test_mongo_resend_within_cooldown_is_throttled(clock, collection):
+    store = MongoOtpStore()
+    _run(store.issue("9000000001", "111111"))
+
+    with pytest.raises(OtpThrottled):
+        _run(store.issue("9000000001", "222222"))
+    assert collection.docs[0]["otp"] == "111111"
+
+
+def test_mongo_concurrent_first_send_is_throttled(clock, collection):
+    store = MongoOtpStore()
+    # another worker inserted between our read and our insert
+    with mock.patch.object(collection, "find_one", mock.AsyncMock(return_value=None)):
+        _run(store.issue("9000000001", "111111"))
+        with pytest.raises(OtpThrottled):
+            _run(store.issue("9000000001", "222222"))
+
+
+def test_mongo_concurrent_resend_is_throttled(clock, collection):
+    store = MongoOtpStore()
+    _run(store.issue("9000000001", "111111"))
+    stale = dict(collection.docs[0])
+    clock.advance(otp_store.OTP_RESEND_COOLDOWN_SECONDS)
+    _run(store.issue("9000000001", "222222"))
+
+    # a worker that read the first document loses the replace
+    with mock.patch.object(collection, "find_one", mock.AsyncMock(return_value=stale)):
+        with pytest.raises(OtpThrottled):
+            _run(store.issue("9000000001", "333333"))
+    assert collection.docs[0]["otp"] == "222222"
+
+
+def test_mongo_code_can_be_used_once(clock, collection):
+    store = MongoOtpStore()
+    _run(store.issue("9000000001", "123456"))
+
+    assert _run(store.consume("9000000001", "000000")) == OTP_INVALID
+    assert _run(store.consume("9000000001", "123456")) == OTP_OK
+    assert _run(store.consume("9000000001", "123456")) == OTP_MISSING
+    # the throttle state outlives the code
+    assert collection.docs[0]["sends"] == 1
+
+
+def test_mongo_expired_code_is_rejected_and_burned(clock, collection):
+    store = MongoOtpStore()
+    _run(store.issue("9000000001", "123456"))
+
+    clock.advance(otp_store.OTP_EXPIRY_SECONDS + 1)
+    assert _run(store.consume("9000000001", "123456")) == OTP_EXPIRED
+    assert collection.docs[0]["otp"] is None
+    assert _run(store.consume("9000000001", "123456")) == OTP_MISSING
+
+
+def test_mongo_unknown_phone_is_missing(clock, collection):
+    assert _run(MongoOtpStore().consume("9000000001", "123456")) == OTP_MISSING
+
+
+# ------------------ send-otp endpoint ------------------
+
+def _send(phone):
+    response = _run(auth_ctrl.send_otp(phone))
+    return response.status_code, response.headers.get("retry-after"), orjson.loads(response.body)
+
+
+def test_send_otp_flood_is_answered_with_429(clock):
+    with mock.patch.object(auth_ctrl, "otp_store", MemoryOtpStore()):
+        status, _, body = _send("9000000001")
+        assert status == 200 and body["status"] is True
+
+        for _ in range(20):
+            status, retry_after, body = _send("9000000001")
+            assert status == 429
+            assert body["status"] is False
+            assert 0 < int(retry_after) <= otp_store.OTP_RESEND_COOLDOWN_SECONDS + 1
+
+        # the flood did not extend the cooldown or touch other phones
+        assert _send("9000000002")[0] == 200
+        clock.advance(otp_store.OTP_RESEND_COOLDOWN_SECONDS)
+        assert _send("9000000001")[0] == 200
+
+
+def test_send_otp_window_cap_reports_when_it_reopens(clock):
+    with mock.patch.object(auth_ctrl, "otp_store", MemoryOtpStore()):
+        for _ in range(otp_store.OTP_MAX_SENDS_PER_WINDOW):
+            assert _send("9000000001")[0] == 200
+            clock.advance(otp_store.OTP_RESEND_COOLDOWN_SECONDS)
+
+        status, retry_after, _ = _send("9000000001")
+
+    elapsed = otp_store.OTP_MAX_SENDS_PER_WINDOW * otp_store.OTP_RESEND_COOLDOWN_SECONDS
+    assert status == 429
+    assert int(retry_after) == otp_store.OTP_SEND_WINDOW_SECONDS - elapsed + 1
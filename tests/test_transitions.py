@@ -0,0 +1,316 @@
+# tests/test_transitions.py
+"""
+The transition engine writes each step with an update pipeline and rebuilds
+the new state in Python with _apply_in_memory. These tests run every
+workflow step through its controller, evaluate the pipeline it sent on the
+stored pre-image, and check both give the same complaint.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import bson
+import pytest
+from bson import ObjectId
+
+from api.controllers import complaint_ctrl
+from api.db.models.complaint import (
+    Assignment, AssignmentStatus, Complaint, ComplaintStatus, ProofFile, Worker,
+)
+
+NOW = datetime(2026, 3, 2, 10, 15, 30, 123456)
+
+
+# ------------------ pipeline evaluation ------------------
+# the aggregation operators _transition_pipeline uses, with Mongo's semantics
+
+def _path(value, parts):
+    for part in parts:
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _ev(expr, doc, env):
+    if isinstance(expr, str):
+        if expr.startswith("$$"):
+            name, *parts = expr[2:].split(".")
+            return _path(env[name], parts)
+        if expr.startswith("$"):
+            return _path(doc, expr[1:].split("."))
+        return expr
+    if isinstance(expr, list):
+        return [_ev(e, doc, env) for e in expr]
+    if isinstance(expr, dict) and len(expr) == 1 and next(iter(expr)).startswith("$"):
+        op, args = next(iter(expr.items()))
+        return _OPS[op](args, doc, env)
+    if isinstance(expr, dict):
+        return {k: _ev(v, doc, env) for k, v in expr.items()}
+    return expr
+
+
+def _map(args, doc, env):
+    items = _ev(args["input"], doc, env)
+    return [_ev(args["in"], doc, {**env, args["as"]: item}) for item in items]
+
+
+def _let(args, doc, env):
+    bound = {k: _ev(v, doc, env) for k, v in args["vars"].items()}
+    return _ev(args["in"], doc, {**env, **bound})
+
+
+def _elem_at(args, doc, env):
+    array, idx = _ev(args, doc, env)
+    if array is None or idx is None or not -len(array) <= idx < len(array):
+        return None
+    return array[idx]
+
+
+def _cond(args, doc, env):
+    test, then, other = args
+    return _ev(then, doc, env) if _ev(test, doc, env) else _ev(other, doc, env)
+
+
+def _merge(args, doc, env):
+    merged = {}
+    for part in _ev(args, doc, env):
+        merged.update(part or {})
+    return merged
+
+
+def _binary(fn):
+    return lambda args, doc, env: fn(*_ev(args, doc, env))
+
+
+_OPS = {
+    "$literal": lambda args, doc, env: args,
+    "$map": _map,
+    "$let": _let,
+    "$cond": _cond,
+    "$arrayElemAt": _elem_at,
+    "$mergeObjects": _merge,
+    "$range": _binary(lambda start, end: list(range(start, end))),
+    "$size": lambda args, doc, env: len(_ev(args, doc, env)),
+    "$ifNull": _binary(lambda value, default: default if value is None else value),
+    "$concatArrays": _binary(lambda *arrays: [item for array in arrays for item in array]),
+    "$subtract": _binary(lambda a, b: a - b),
+    "$eq": _binary(lambda a, b: a == b),
+    "$gte": _binary(lambda a, b: a is not None and a >= b),
+    "$lt": _binary(lambda a, b: a is not None and a < b),
+    "$in": _binary(lambda value, array: value in array),
+    "$and": lambda args, doc, env: all(_ev(a, doc, env) for a in args),
+}
+
+
+def _run_pipeline(raw: dict, pipeline) -> dict:
+    doc = dict(raw)
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        assert name == "$set"
+        # every expression of a stage sees the document as the stage found it
+        doc.update({k: _ev(v, doc, {}) for k, v in spec.items()})
+    return bson.decode(bson.encode(doc))  # stored: datetimes keep milliseconds
+
+
+def _stored(complaint: Complaint) -> dict:
+    """The complaint as find_one_and_update returns it."""
+    doc = complaint_ctrl._bson_encoder.encode(complaint.model_dump(exclude={"id", "revision_id"}))
+    return bson.decode(bson.encode({"_id": complaint.id, **doc}))
+
+
+def _same(pipeline_doc: dict, after: Complaint):
+    assert Complaint.model_validate(pipeline_doc).model_dump() == after.model_dump()
+
+
+# ------------------ fixtures ------------------
+
+def _assignment(**overrides) -> Assignment:
+    fields = dict(
+        group="Worker", worker_id="w1", assigned_user_id="w1", assigned_by="m1",
+        assigned_at=NOW - timedelta(hours=2), sla_deadline=NOW + timedelta(hours=2),
+    )
+    fields.update(overrides)
+    return Assignment(**fields)
+
+
+def _complaint(*assignments: Assignment, **overrides) -> Complaint:
+    fields = dict(
+        full_name="Asha Verma",
+        mobile_number="9876543210",
+        complaint_category="Water",
+        complaint_subject="Pipe burst near the market",
+        detailed_description="Water has been leaking from a burst pipe for two days",
+        complete_address="Main Market, Sector 4",
+        location={"lat": 28.6139, "lng": 77.2090},
+        assignments=list(assignments),
+        current_assignment_index=len(assignments) - 1 if assignments else None,
+        created_at=NOW - timedelta(days=1),
+    )
+    fields.update(overrides)
+    complaint = Complaint(id=ObjectId(), **fields)
+    complaint.sync_current_assignment()
+    return Complaint.model_validate(_stored(complaint))
+
+
+@pytest.fixture
+def engine():
+    """Runs a step against a stored complaint; returns (pipeline result, in-memory after)."""
+    collection = mock.MagicMock()
+    collection.update_one = mock.AsyncMock(return_value=SimpleNamespace(matched_count=1))
+    collection.update_many = mock.AsyncMock(return_value=SimpleNamespace(modified_count=0))
+    record = mock.AsyncMock()
+
+    def run(before: Complaint, call):
+        raw = _stored(before)
+        collection.find_one_and_update = mock.AsyncMock(return_value=raw)
+        asyncio.run(call(str(before.id)))
+        query, pipeline = collection.find_one_and_update.call_args.args
+        assert query["_id"] == before.id
+        _, after = record.call_args.args
+        return _run_pipeline(raw, pipeline), after
+
+    with mock.patch.object(Complaint, "get_pymongo_collection", return_value=collection), \
+            mock.patch.object(Complaint, "find", return_value=SimpleNamespace(to_list=mock.AsyncMock(return_value=[]))), \
+            mock.patch.object(complaint_ctrl, "record_transition", record), \
+            mock.patch.object(complaint_ctrl, "update_worker_load", mock.AsyncMock()), \
+            mock.patch.object(complaint_ctrl, "release_blobs", mock.AsyncMock()), \
+            mock.patch.object(complaint_ctrl, "sla_scheduler", mock.MagicMock()):
+        yield run
+
+
+# ------------------ each step ------------------
+
+def test_assign_first_assignment(engine):
+    before = _complaint()
+    doc, after = engine(before, lambda cid: complaint_ctrl.assign_complaint_controller(cid, assigned_by="m1"))
+
+    _same(doc, after)
+    assert after.current_assignment_index == 0
+    assert after.updated_at.microsecond % 1000 == 0  # Mongo keeps milliseconds
+
+
+def test_reassign_cancels_held_assignment(engine):
+    before = _complaint(_assignment(), status=ComplaintStatus.ASSIGNED)
+    doc, after = engine(before, lambda cid: complaint_ctrl.assign_complaint_controller(cid, assigned_by="m1"))
+
+    _same(doc, after)
+    assert [a.status for a in after.assignments] == [AssignmentStatus.CANCELLED, AssignmentStatus.ASSIGNED]
+
+
+def test_reassign_keeps_finished_assignment(engine):
+    before = _complaint(_assignment(status=AssignmentStatus.ESCALATED), status=ComplaintStatus.ESCALATED)
+    doc, after = engine(before, lambda cid: complaint_ctrl.assign_complaint_controller(cid, assigned_by="m1"))
+
+    _same(doc, after)
+    assert after.assignments[0].status == AssignmentStatus.ESCALATED
+
+
+def test_forward_to_je(engine):
+    before = _complaint(_assignment(), status=ComplaintStatus.ASSIGNED)
+    doc, after = engine(before, lambda cid: complaint_ctrl.forward_to_je_controller(cid, "cm1", "je1"))
+
+    _same(doc, after)
+    assert after.status == ComplaintStatus.FORWARDED_TO_JE
+
+
+def test_assign_contractor(engine):
+    contractor = Worker(id=ObjectId(), full_name="Ravi", role="contractor", created_by_je="je1")
+    before = _complaint(_assignment(group="JE", worker_id=None), status=ComplaintStatus.FORWARDED_TO_JE)
+
+    with mock.patch.object(Worker, "get", mock.AsyncMock(return_value=contractor)):
+        doc, after = engine(before, lambda cid: complaint_ctrl.assign_contractor_controller(cid, str(contractor.id), "je1"))
+
+    _same(doc, after)
+    assert after.current_assignment_status == AssignmentStatus.ASSIGNED_TO_CONTRACTOR
+
+
+def test_submit_proof(engine):
+    before = _complaint(_assignment(proof_files=[ProofFile(file_name="old.jpg", sha256="aa")]), status=ComplaintStatus.ASSIGNED)
+    proof = [{"file_name": "pipe.jpg", "sha256": "bb", "uploaded_at": NOW}]
+    doc, after = engine(before, lambda cid: complaint_ctrl.submit_proof_controller(cid, "cm1", proof, "CM"))
+
+    _same(doc, after)
+    assert [f.file_name for f in after.assignments[0].proof_files] == ["pipe.jpg"]
+
+
+@pytest.mark.parametrize("action", ["approve", "reject"])
+def test_verify_proof(engine, action):
+    before = _complaint(_assignment(status=AssignmentStatus.SUBMITTED_BY_CM), status=ComplaintStatus.SUBMITTED_BY_CM)
+    doc, after = engine(before, lambda cid: complaint_ctrl.verify_proof_controller(cid, "je1", action, "blurry"))
+
+    _same(doc, after)
+
+
+@pytest.mark.parametrize("action", ["approve", "reject"])
+def test_je_verify_contractor(engine, action):
+    before = _complaint(
+        _assignment(group="Contractor", status=AssignmentStatus.SUBMITTED_BY_JE),
+        status=ComplaintStatus.SUBMITTED_BY_JE,
+    )
+    doc, after = engine(before, lambda cid: complaint_ctrl.je_verify_contractor_controller(cid, "je1", action))
+
+    _same(doc, after)
+
+
+def test_close(engine):
+    before = _complaint(_assignment(status=AssignmentStatus.VERIFIED_BY_JE), status=ComplaintStatus.VERIFIED_BY_JE)
+    doc, after = engine(before, lambda cid: complaint_ctrl.manager_approve_close_controller(cid, "gm1", "done"))
+
+    _same(doc, after)
+    assert after.current_assignment_status == AssignmentStatus.VERIFIED_BY_GM
+
+
+def test_escalate_targets_the_last_assignment(engine):
+    # the current index points at the first assignment, escalation at the last
+    before = _complaint(_assignment(), _assignment(worker_id="w2"), current_assignment_index=0)
+    doc, after = engine(before, lambda cid: complaint_ctrl.escalate_complaint_controller(cid, "late"))
+
+    _same(doc, after)
+    assert after.assignments[1].escalate_reason == "late"
+
+
+def test_escalate_without_assignments(engine):
+    before = _complaint()
+    doc, after = engine(before, lambda cid: complaint_ctrl.escalate_complaint_controller(cid, "late"))
+
+    _same(doc, after)
+
+
+def test_unlink_duplicate(engine):
+    before = _complaint(duplicate_of=str(ObjectId()))
+    doc, after = engine(before, complaint_ctrl.unlink_duplicate_controller)
+
+    _same(doc, after)
+    assert after.duplicate_of is None
+
+
+def test_update_with_location(engine):
+    before = _complaint()
+    data = {"complaint_subject": "Pipe burst at the bus stand", "location": {"lat": 28.62, "lng": 77.21}}
+    doc, after = engine(before, lambda cid: complaint_ctrl.update_complaint_controller(cid, data))
+
+    _same(doc, after)
+    assert after.geohash != before.geohash
+
+
+# ------------------ batch ------------------
+
+def test_batch_step_matches_its_pipeline():
+    before = _complaint(_assignment(status=AssignmentStatus.VERIFIED_BY_JE), status=ComplaintStatus.VERIFIED_BY_JE)
+    collection = mock.MagicMock()
+    collection.bulk_write = mock.AsyncMock(return_value=SimpleNamespace(matched_count=1))
+    record = mock.AsyncMock()
+
+    with mock.patch.object(Complaint, "get_pymongo_collection", return_value=collection), \
+            mock.patch.object(Complaint, "find", side_effect=[
+                SimpleNamespace(to_list=mock.AsyncMock(return_value=[before])),
+                SimpleNamespace(to_list=mock.AsyncMock(return_value=[])),
+            ]), \
+            mock.patch.object(complaint_ctrl, "record_transitions", record), \
+            mock.patch.object(complaint_ctrl, "bulk_update_worker_loads", mock.AsyncMock()), \
+            mock.patch.object(complaint_ctrl, "sla_scheduler", mock.MagicMock()):
+        asyncio.run(complaint_ctrl.batch_close_complaints_controller([str(before.id)], "gm1", "done"))
+
+    [op] = collection.bulk_write.call_args.args[0]
+    [(_, after)] = record.call_args_list[0].args[0]
+    _same(_run_pipeline(_stored(before), op._doc), after)